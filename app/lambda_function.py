@@ -1,9 +1,13 @@
+import datetime
 from typing import Any, Dict
 
+from src.config.settings import settings
+from src.services.compaction_service import compaction_service
 from src.services.credly_badges_service import credly_badges_service
 from src.services.credly_templates_service import credly_templates_service
 from src.utils.logger import logger
 from src.utils.observability import observability
+from src.utils.time_budget import TimeBudget
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -11,16 +15,28 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Entrypoint for Credly Ingestion.
     Event payload:
     {
-        "load_type": "badges" | "templates",
+        "load_type": "badges" | "templates" | "compaction",
         "mode": "historical" | "daily",
-        "page": optional page URL for continuation (badges only)
+        "page": optional continuation returned by the previous call (badges
+            page URL, templates page number),
+        "shards": optional number of date windows to plan (badges historical),
+        "shard": optional shard descriptor returned by a planning call,
+        "time_budget_ratio": optional share of the remaining time to keep
+            pulling pages (defaults to LAMBDA_TIME_BUDGET_RATIO),
+        "table": table to compact (compaction only, default badges_emitidas),
+        "partition_date": YYYY-MM-DD partition to compact (default today)
     }
     """
     logger.info("Credly Ingestion Lambda started", extra={"event": event})
 
     load_type = event.get("load_type")
     mode = event.get("mode", "daily")
-    page = event.get("page")  # Optional page URL for continuation
+    page = event.get("page")  # Optional continuation from the previous call
+    shards = event.get("shards")
+    shard = event.get("shard")
+    time_budget_ratio = float(
+        event.get("time_budget_ratio", settings.LAMBDA_TIME_BUDGET_RATIO)
+    )
 
     if not load_type:
         raise ValueError("Missing 'load_type' in event")
@@ -29,29 +45,58 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         observability.start_segment(f"ingest_{load_type}")
 
         result = {}
-        if load_type == "badges":
+        # Without a budget (or outside Lambda) each invocation handles one page
+        time_budget = TimeBudget.from_context(context, time_budget_ratio)
+
+        if load_type == "badges" and shard:
+            result = credly_badges_service.process_shard(
+                mode, shard, page=page, time_budget=time_budget
+            )
+        elif load_type == "badges" and shards:
+            result = credly_badges_service.plan_shards(mode, int(shards))
+        elif load_type == "badges":
             # Determine if first page based on presence of page parameter
             is_first_page = page is None
             result = credly_badges_service.process(
-                mode, page=page, is_first_page=is_first_page
+                mode,
+                page=page,
+                is_first_page=is_first_page,
+                time_budget=time_budget,
+            )
+        elif load_type == "compaction":
+            partition_date = event.get("partition_date")
+            result = compaction_service.compact(
+                event.get("table", "badges_emitidas"),
+                (
+                    datetime.date.fromisoformat(partition_date)
+                    if partition_date
+                    else datetime.date.today()
+                ),
             )
         elif load_type == "templates":
-            # Templates still process all pages internally for hash validation
-            # TODO: Refactor templates to support pagination
-            result = credly_templates_service.process(mode)
+            # Templates continue by page number; the count spans the whole load
+            result = credly_templates_service.process(
+                mode, page=page, time_budget=time_budget
+            )
         else:
             raise ValueError(f"Unknown load_type: {load_type}")
 
         observability.end_segment(f"ingest_{load_type}")
 
-        return {
-            "statusCode": 200,
-            "body": {
-                "message": f"Successfully processed {load_type} in {mode} mode",
-                "records_processed": result.get("records_processed", 0),
-                "next_page": result.get("next_page"),
-            },
+        body = {
+            "message": f"Successfully processed {load_type} in {mode} mode",
+            "records_processed": result.get("records_processed", 0),
+            "next_page": result.get("next_page"),
         }
+        if "shards" in result:
+            body["shards"] = result["shards"]
+        if "duplicates_removed" in result:
+            body["duplicates_removed"] = result["duplicates_removed"]
+            body["files_before"] = result["files_before"]
+            body["files_after"] = result["files_after"]
+            body["skipped"] = result.get("skipped", False)
+
+        return {"statusCode": 200, "body": body}
 
     except Exception as e:
         logger.error(f"Ingestion failed: {str(e)}", exc_info=True)
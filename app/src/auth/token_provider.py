@@ -1,10 +1,9 @@
 import base64
+import threading
 import time
 from abc import ABC, abstractmethod
 from typing import Dict, Optional
 
-import requests
-
 from src.clients.secrets_manager import secrets_client
 from src.config.settings import settings
 from src.utils.logger import logger
@@ -51,19 +50,24 @@ class OAuth2Provider(CredlyAuthProvider):
         self._access_token: Optional[str] = None
         self._token_expires_at: float = 0
         self._buffer_seconds = 60
+        # Pages may be fetched from several threads; only one of them refreshes
+        self._lock = threading.Lock()
 
     def get_auth_headers(self) -> Dict[str, str]:
-        current_time = time.time()
-        if self._access_token and current_time < (
-            self._token_expires_at - self._buffer_seconds
-        ):
+        with self._lock:
+            current_time = time.time()
+            if self._access_token and current_time < (
+                self._token_expires_at - self._buffer_seconds
+            ):
+                return {"Authorization": f"Bearer {self._access_token}"}
+
+            logger.info("OAuth token expired or missing. Refreshing...")
+            self._refresh_token()
             return {"Authorization": f"Bearer {self._access_token}"}
 
-        logger.info("OAuth token expired or missing. Refreshing...")
-        self._refresh_token()
-        return {"Authorization": f"Bearer {self._access_token}"}
-
     def _refresh_token(self):
+        import requests
+
         secrets = secrets_client.get_secret(settings.SECRETS_MANAGER_KEY)
         client_id = secrets.get("client_id")
         client_secret = secrets.get("client_secret")
@@ -0,0 +1,73 @@
+import threading
+from typing import Any, Dict
+
+from src.config.settings import settings
+
+_lock = threading.Lock()
+_session = None
+_clients: Dict[str, Any] = {}
+
+
+def get_client(service_name: str) -> Any:
+    """
+    Returns the shared boto3 client for a service.
+
+    Every client comes from one session and one tuned botocore Config
+    (connection pool size, adaptive retries, TCP keep-alive, timeouts), and
+    is cached at module level so warm invocations reuse it and its pooled
+    connections. Clients are thread-safe, so parallel uploads and deletes
+    can share them.
+    """
+    client = _clients.get(service_name)
+    if client is not None:
+        return client
+
+    with _lock:
+        if service_name not in _clients:
+            _clients[service_name] = _get_session().client(
+                service_name,
+                endpoint_url=settings.LOCALSTACK_ENDPOINT,
+                config=_client_config(),
+            )
+        return _clients[service_name]
+
+
+def reset_clients():
+    """Drops cached clients and session (e.g. after changing settings)."""
+    global _session
+    with _lock:
+        _clients.clear()
+        _session = None
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        import boto3.session
+
+        credentials = {}
+        if settings.LOCALSTACK_ENDPOINT:
+            # LocalStack accepts any credentials; default to dummy ones locally
+            credentials = {
+                "aws_access_key_id": settings.AWS_ACCESS_KEY_ID or "test",
+                "aws_secret_access_key": settings.AWS_SECRET_ACCESS_KEY or "test",
+            }
+        # Outside LocalStack the default chain is used, which also picks up the
+        # session token of the Lambda execution role.
+        _session = boto3.session.Session(region_name=settings.AWS_REGION, **credentials)
+    return _session
+
+
+def _client_config():
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+        retries={
+            "mode": settings.AWS_RETRY_MODE,
+            "max_attempts": settings.AWS_MAX_ATTEMPTS,
+        },
+        tcp_keepalive=True,
+        connect_timeout=settings.AWS_CONNECT_TIMEOUT,
+        read_timeout=settings.AWS_READ_TIMEOUT,
+    )
@@ -1,8 +1,10 @@
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 
 from src.auth.token_provider import get_token_provider
 from src.clients.http_client import http_client
 from src.config.settings import settings
+from src.utils.concurrency import bounded_map
+from src.utils.lazy import LazyInstance
 from src.utils.logger import logger
 from src.utils.observability import observability
 
@@ -23,6 +25,22 @@ class CredlyClient:
         endpoint = f"organizations/{self.org_id}/high_volume_issued_badge_search"
         return self._fetch_page(endpoint, params, page_url)
 
+    def count_badges(self, params_list: list[Dict[str, Any]]) -> list[int | None]:
+        """
+        Returns the 'total_count' reported for each badge query, requesting a
+        single-item page per query concurrently. None where the API omits it.
+        """
+        endpoint = f"organizations/{self.org_id}/high_volume_issued_badge_search"
+        return list(
+            bounded_map(
+                lambda params: self._fetch_page_with_metadata(
+                    endpoint, {**params, "page_size": 1}
+                )[1].get("total_count"),
+                params_list,
+                max_workers=settings.CREDLY_MAX_CONCURRENCY,
+            )
+        )
+
     def get_templates(
         self, params: Dict[str, Any] = None, page_url: str = None
     ) -> tuple[list[Dict[str, Any]], str | None]:
@@ -33,6 +51,136 @@ class CredlyClient:
         endpoint = f"organizations/{self.org_id}/badge_templates"
         return self._fetch_page(endpoint, params, page_url)
 
+    def iter_templates(
+        self,
+        params: Dict[str, Any] = None,
+        page_limit: int = None,
+        validators: Dict[str, Dict[str, str]] = None,
+        start_page: int = None,
+        page_info: Dict[str, Any] = None,
+    ) -> Iterator[list[Dict[str, Any]]]:
+        """
+        Yields every page of templates from start_page on, in order.
+        Pages after the first are fetched concurrently.
+        """
+        endpoint = f"organizations/{self.org_id}/badge_templates"
+        return self.iter_pages(
+            endpoint, params, page_limit, validators, start_page, page_info
+        )
+
+    def templates_not_modified(
+        self, params: Dict[str, Any], validators: Dict[str, Dict[str, str]]
+    ) -> bool:
+        """
+        Re-requests every known template page conditionally (concurrently).
+        True only if all of them answer 304 Not Modified and no page was
+        appended after the last known one.
+        """
+        endpoint = f"organizations/{self.org_id}/badge_templates"
+        pages = sorted(int(page) for page in validators)
+        if not pages:
+            return False
+
+        results = list(
+            bounded_map(
+                lambda page: self._request_page(
+                    endpoint, {**params, "page": page}, validators=validators[str(page)]
+                )[0]
+                is None,
+                pages,
+                max_workers=settings.CREDLY_MAX_CONCURRENCY,
+            )
+        )
+        if not all(results):
+            return False
+
+        # A full last page would hide templates added on a new page
+        payload, _ = self._request_page(endpoint, {**params, "page": pages[-1] + 1})
+        return not (payload or {}).get("data")
+
+    def probe_templates(self, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        One single-item request for the cheapest change signals: the size of
+        the catalogue (metadata total_count) and its latest updated_at (first
+        item sorted by -updated_at). Either is None when not reported.
+        """
+        endpoint = f"organizations/{self.org_id}/badge_templates"
+        payload, _ = self._request_page(
+            endpoint,
+            {**(params or {}), "page": 1, "page_size": 1, "sort": "-updated_at"},
+        )
+        items = payload.get("data") or []
+        return {
+            "total_count": (payload.get("metadata") or {}).get("total_count"),
+            "max_updated_at": items[0].get("updated_at") if items else None,
+        }
+
+    def iter_pages(
+        self,
+        endpoint: str,
+        params: Dict[str, Any] = None,
+        page_limit: int = None,
+        validators: Dict[str, Dict[str, str]] = None,
+        start_page: int = None,
+        page_info: Dict[str, Any] = None,
+    ) -> Iterator[list[Dict[str, Any]]]:
+        """
+        Yields the items of every page of a page-numbered endpoint, in order,
+        starting at start_page (default: the first).
+
+        The first page is fetched alone to learn 'total_pages' from its metadata;
+        the remaining pages are then requested concurrently (bounded by
+        CREDLY_MAX_CONCURRENCY). Endpoints that do not report 'total_pages'
+        fall back to following 'next_page_url' one page at a time.
+
+        If a 'validators' dict is given, it is filled with the ETag/Last-Modified
+        of each numbered page, keyed by page number, for conditional re-checks.
+
+        If a 'page_info' dict is given, it is filled with 'total_pages' (when
+        reported) and the 'next_page_url' of the last page yielded, so a caller
+        that stops early can tell whether pages are left without fetching one.
+        """
+        params = params or {}
+        page_info = {} if page_info is None else page_info
+        first_params = {**params, "page": start_page} if start_page else params
+        payload, page_validators = self._request_page(endpoint, first_params)
+        items, metadata = payload.get("data", []), payload.get("metadata") or {}
+        total_pages = metadata.get("total_pages")
+        current_page = metadata.get("current_page")
+        page_info.update(
+            total_pages=total_pages, next_page_url=self._next_page_url(metadata)
+        )
+        yield items
+
+        if total_pages and current_page:
+            if validators is not None and page_validators:
+                validators[str(current_page)] = page_validators
+
+            def fetch(page: int) -> list[Dict[str, Any]]:
+                payload, page_validators = self._request_page(
+                    endpoint, {**params, "page": page}
+                )
+                if validators is not None and page_validators:
+                    validators[str(page)] = page_validators
+                return payload.get("data", [])
+
+            last_page = int(total_pages)
+            if page_limit:
+                last_page = min(last_page, int(current_page) + page_limit - 1)
+            pages = range(int(current_page) + 1, last_page + 1)
+            yield from bounded_map(
+                fetch, pages, max_workers=settings.CREDLY_MAX_CONCURRENCY
+            )
+            return
+
+        next_page_url = page_info["next_page_url"]
+        pages_processed = 1
+        while next_page_url and not (page_limit and pages_processed >= page_limit):
+            items, next_page_url = self._fetch_page(endpoint, page_url=next_page_url)
+            pages_processed += 1
+            page_info["next_page_url"] = next_page_url
+            yield items
+
     def _fetch_page(
         self, endpoint: str, params: Dict[str, Any] = None, page_url: str = None
     ) -> tuple[list[Dict[str, Any]], str | None]:
@@ -40,35 +188,76 @@ class CredlyClient:
         Fetches a single page from the API.
         Returns: (items, next_page_url)
         """
+        items, metadata = self._fetch_page_with_metadata(endpoint, params, page_url)
+        return items, self._next_page_url(metadata)
+
+    def _fetch_page_with_metadata(
+        self, endpoint: str, params: Dict[str, Any] = None, page_url: str = None
+    ) -> tuple[list[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Fetches a single page from the API.
+        Returns: (items, metadata)
+        """
+        data, _ = self._request_page(endpoint, params, page_url)
+
+        # Credly API response structure: { "data": [...], "metadata": { "next_page_url": "..." } }
+        return data.get("data", []), data.get("metadata") or {}
+
+    def _request_page(
+        self,
+        endpoint: str,
+        params: Dict[str, Any] = None,
+        page_url: str = None,
+        validators: Dict[str, str] = None,
+    ) -> tuple[Dict[str, Any] | None, Dict[str, str]]:
+        """
+        Requests a single page, conditionally when validators are given.
+        Returns: (payload, validators); payload is None on 304 Not Modified.
+        """
         # Use provided page_url or construct from endpoint
         url = page_url or f"{self.base_url}/{endpoint}"
         current_params = {} if page_url else (params or {})
 
         headers = self.auth_provider.get_auth_headers()
         headers["Content-Type"] = "application/json"
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
 
         try:
             observability.increment_metric("credly_api_requests")
             response = http_client.get(url, headers=headers, params=current_params)
-            response.raise_for_status()
 
-            data = response.json()
+            if response.status_code == 304:
+                observability.increment_metric("credly_api_not_modified")
+                return None, validators
 
-            # Credly API response structure: { "data": [...], "metadata": { "next_page_url": "..." } }
-            items = data.get("data", [])
-            next_page_url = data.get("metadata", {}).get("next_page_url")
+            response.raise_for_status()
 
-            # Ensure badge_format is always minimal in next_page_url
-            if next_page_url and "badge_format=default" in next_page_url:
-                next_page_url = next_page_url.replace(
-                    "badge_format=default", "badge_format=minimal"
-                )
+            response_validators = {}
+            if response.headers.get("ETag"):
+                response_validators["etag"] = response.headers["ETag"]
+            if response.headers.get("Last-Modified"):
+                response_validators["last_modified"] = response.headers["Last-Modified"]
 
-            return items, next_page_url
+            return response.json(), response_validators
 
         except Exception as e:
             logger.error(f"Error fetching from Credly: {str(e)}")
             raise e
 
+    def _next_page_url(self, metadata: Dict[str, Any]) -> str | None:
+        next_page_url = metadata.get("next_page_url")
+
+        # Ensure badge_format is always minimal in next_page_url
+        if next_page_url and "badge_format=default" in next_page_url:
+            next_page_url = next_page_url.replace(
+                "badge_format=default", "badge_format=minimal"
+            )
+
+        return next_page_url
+
 
-credly_client = CredlyClient()
+credly_client = LazyInstance(CredlyClient)
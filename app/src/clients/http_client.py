@@ -1,35 +1,76 @@
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
+from src.clients.throttler import THROTTLE_STATUS_CODES, AdaptiveThrottler
 from src.config.settings import settings
+from src.utils.lazy import LazyInstance
 
 
 class HttpClient:
     def __init__(self):
+        # Deferred so importing the handler does not pay for requests/urllib3
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
         self.session = requests.Session()
 
+        # Rate-limit responses (429/503) are left to the shared throttler below,
+        # which honours Retry-After for every caller instead of one thread.
+        # urllib3 would otherwise retry them on its own whenever Retry-After is set.
         retry_strategy = Retry(
             total=settings.MAX_RETRIES,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST"],
+            respect_retry_after_header=False,
         )
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # One pool shared by every caller (including concurrent page fetches).
+        # pool_block keeps the number of open connections bounded under load.
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+            pool_block=True,
+        )
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
 
+        self.throttler = AdaptiveThrottler(
+            initial_rate=settings.THROTTLE_INITIAL_RATE,
+            min_rate=settings.THROTTLE_MIN_RATE,
+            max_rate=settings.THROTTLE_MAX_RATE,
+            max_concurrency=settings.CREDLY_MAX_CONCURRENCY,
+        )
+
     def get(self, url: str, headers: dict = None, params: dict = None):
-        return self.session.get(
-            url, headers=headers, params=params, timeout=settings.HTTP_TIMEOUT
+        return self._request(
+            "GET",
+            url,
+            headers=headers,
+            params=params,
+            timeout=settings.HTTP_TIMEOUT,
         )
 
     def post(self, url: str, headers: dict = None, json: dict = None):
-        return self.session.post(
-            url, headers=headers, json=json, timeout=settings.HTTP_TIMEOUT
+        return self._request(
+            "POST", url, headers=headers, json=json, timeout=settings.HTTP_TIMEOUT
         )
 
+    def _request(self, method: str, url: str, **kwargs):
+        """
+        Sends a request through the throttler, retrying rate-limited responses
+        after the pause the throttler imposed.
+        """
+        for attempt in range(settings.MAX_RETRIES + 1):
+            with self.throttler.slot():
+                response = self.session.request(method, url, **kwargs)
+
+            self.throttler.observe(response.status_code, response.headers)
+            if response.status_code not in THROTTLE_STATUS_CODES:
+                return response
+            if attempt < settings.MAX_RETRIES:
+                response.close()
+
+        return response
+
 
 # Global instance
-http_client = HttpClient()
+http_client = LazyInstance(HttpClient)
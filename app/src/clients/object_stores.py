@@ -0,0 +1,376 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional
+
+from src.config.settings import settings
+
+OUTPUT_SINKS = ("s3", "local", "memory")
+
+_lock = threading.Lock()
+_stores: Dict[str, Any] = {}
+
+
+def get_object_store() -> Any:
+    """
+    Returns the store S3Writer writes to, chosen by OUTPUT_SINK:
+
+    - "s3": the shared boto3 S3 client (see clients.aws)
+    - "local": a LocalObjectStore rooted at OUTPUT_LOCAL_DIR
+    - "memory": an InMemoryObjectStore, shared by the whole process
+
+    All of them answer the S3 calls the app makes, so the partition layout,
+    runs and manifests are the same whatever the backend.
+    """
+    sink = settings.OUTPUT_SINK
+    if sink == "s3":
+        from src.clients.aws import get_client
+
+        return get_client("s3")
+    if sink not in OUTPUT_SINKS:
+        raise ValueError(f"Unknown OUTPUT_SINK: {sink}")
+
+    with _lock:
+        if sink not in _stores:
+            _stores[sink] = (
+                LocalObjectStore(settings.OUTPUT_LOCAL_DIR)
+                if sink == "local"
+                else InMemoryObjectStore()
+            )
+        return _stores[sink]
+
+
+def reset_object_stores():
+    """Drops the cached local and in-memory stores."""
+    with _lock:
+        _stores.clear()
+
+
+class _ObjectStore(ABC):
+    """
+    S3 client subset shared by the offline stores: objects, listing with
+    pagination and delimiters, and multipart uploads. Subclasses only say
+    where bytes live.
+
+    bytes_written and put_requests count completed writes, for benchmarks.
+    """
+
+    def __init__(self):
+        self.bytes_written = 0
+        self.put_requests = 0
+        self._upload_count = 0
+        self._lock = threading.Lock()
+
+    # Storage, implemented by subclasses
+    @abstractmethod
+    def _read(self, bucket: str, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def _write(self, bucket: str, key: str, body: bytes):
+        pass
+
+    @abstractmethod
+    def _delete(self, bucket: str, key: str):
+        pass
+
+    @abstractmethod
+    def _sizes(self, bucket: str, prefix: str) -> Dict[str, int]:
+        """Size of every key under prefix."""
+        pass
+
+    @abstractmethod
+    def _store_part(self, upload_id: str, part_number: int, body: bytes):
+        pass
+
+    @abstractmethod
+    def _complete(self, bucket: str, key: str, upload_id: str, part_numbers: list):
+        """Joins the parts into the object; returns its size."""
+        pass
+
+    @abstractmethod
+    def _discard_upload(self, upload_id: str):
+        pass
+
+    # Objects
+    def put_object(self, Bucket, Key, Body=b"", **kwargs):
+        body = Body.read() if hasattr(Body, "read") else bytes(Body)
+        self._write(Bucket, Key, body)
+        self._count_write(len(body))
+        return {"ETag": f'"{hash(body)}"'}
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        body = self._read(Bucket, Key)
+        if body is None:
+            raise _client_error("NoSuchKey", Key, "GetObject")
+        if Range:
+            start, _, end = Range.replace("bytes=", "").partition("-")
+            if start == "":
+                body = body[-int(end) :]
+            else:
+                body = body[int(start) : int(end) + 1 if end else None]
+        return {"Body": io.BytesIO(body), "ContentLength": len(body)}
+
+    def copy_object(self, Bucket, Key, CopySource, **kwargs):
+        body = self._read(CopySource["Bucket"], CopySource["Key"])
+        if body is None:
+            raise _client_error("NoSuchKey", CopySource["Key"], "CopyObject")
+        self._write(Bucket, Key, body)
+        self._count_write(len(body))
+        return {"CopyObjectResult": {"ETag": f'"{hash(body)}"'}}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        body = self._read(Bucket, Key)
+        if body is None:
+            raise _client_error("404", Key, "HeadObject")
+        return {"ContentLength": len(body)}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        for obj in Delete.get("Objects", []):
+            self._delete(Bucket, obj["Key"])
+        return {}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._delete(Bucket, Key)
+        return {}
+
+    def list_objects_v2(
+        self,
+        Bucket,
+        Prefix="",
+        ContinuationToken=None,
+        MaxKeys=1000,
+        Delimiter=None,
+        **kwargs,
+    ):
+        sizes = self._sizes(Bucket, Prefix)
+        keys = sorted(sizes)
+        if Delimiter:
+            # Keys below the next delimiter roll up into common prefixes
+            rolled = []
+            for key in keys:
+                head, sep, _ = key[len(Prefix) :].partition(Delimiter)
+                entry = Prefix + head + sep if sep else key
+                if not rolled or rolled[-1] != entry:
+                    rolled.append(entry)
+            keys = rolled
+        start = int(ContinuationToken or 0)
+        page = keys[start : start + MaxKeys]
+        response = {
+            "KeyCount": len(page),
+            "IsTruncated": start + MaxKeys < len(keys),
+        }
+        contents = [k for k in page if k in sizes]
+        prefixes = [k for k in page if k not in sizes]
+        if contents:
+            response["Contents"] = [{"Key": k, "Size": sizes[k]} for k in contents]
+        if prefixes:
+            response["CommonPrefixes"] = [{"Prefix": p} for p in prefixes]
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = str(start + MaxKeys)
+        return response
+
+    def get_paginator(self, operation_name):
+        if operation_name != "list_objects_v2":
+            raise NotImplementedError(operation_name)
+        return _ListObjectsPaginator(self)
+
+    # Multipart uploads
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        with self._lock:
+            self._upload_count += 1
+            upload_id = str(self._upload_count)
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        body = Body.read() if hasattr(Body, "read") else bytes(Body)
+        self._store_part(UploadId, PartNumber, body)
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kw):
+        numbers = [p["PartNumber"] for p in MultipartUpload["Parts"]]
+        size = self._complete(Bucket, Key, UploadId, numbers)
+        self._discard_upload(UploadId)
+        self._count_write(size)
+        return {}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._discard_upload(UploadId)
+        return {}
+
+    def _count_write(self, size: int):
+        with self._lock:
+            self.bytes_written += size
+            self.put_requests += 1
+
+
+class InMemoryObjectStore(_ObjectStore):
+    """Objects kept in a dict keyed by (bucket, key); nothing touches disk."""
+
+    def __init__(self):
+        super().__init__()
+        self.objects: Dict[tuple, bytes] = {}
+        self._uploads: Dict[str, Dict[int, bytes]] = {}
+
+    def _read(self, bucket, key):
+        with self._lock:
+            return self.objects.get((bucket, key))
+
+    def _write(self, bucket, key, body):
+        with self._lock:
+            self.objects[(bucket, key)] = body
+
+    def _delete(self, bucket, key):
+        with self._lock:
+            self.objects.pop((bucket, key), None)
+
+    def _sizes(self, bucket, prefix):
+        with self._lock:
+            return {
+                key: len(body)
+                for (b, key), body in self.objects.items()
+                if b == bucket and key.startswith(prefix)
+            }
+
+    def _store_part(self, upload_id, part_number, body):
+        with self._lock:
+            self._uploads.setdefault(upload_id, {})[part_number] = body
+
+    def _complete(self, bucket, key, upload_id, part_numbers):
+        with self._lock:
+            parts = self._uploads[upload_id]
+            body = b"".join(parts[n] for n in part_numbers)
+            self.objects[(bucket, key)] = body
+        return len(body)
+
+    def _discard_upload(self, upload_id):
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+
+
+class LocalObjectStore(_ObjectStore):
+    """
+    Objects stored as files under root/{bucket}/{key}, so a local backfill
+    leaves the same raw/{table}/anomesdia=... tree as S3. Writes go through
+    a temporary file and a rename, so readers never see partial files.
+    """
+
+    def __init__(self, root: str):
+        super().__init__()
+        self.root = os.path.abspath(root)
+        self._uploads_dir = os.path.join(self.root, ".uploads")
+
+    def _path(self, bucket: str, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, bucket, key))
+        if not path.startswith(os.path.join(self.root, bucket) + os.sep):
+            raise ValueError(f"Key escapes the bucket directory: {key}")
+        return path
+
+    def _read(self, bucket, key):
+        try:
+            with open(self._path(bucket, key), "rb") as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+    def _write(self, bucket, key, body):
+        self._write_chunks(bucket, key, [body])
+
+    def _write_chunks(self, bucket: str, key: str, chunks) -> int:
+        path = self._path(bucket, key)
+        # Under the lock so a delete cannot remove the directory in between
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(path), prefix=".tmp-", delete=False
+            )
+        size = 0
+        with f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(f.name, path)
+        return size
+
+    def _delete(self, bucket, key):
+        path = self._path(bucket, key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        # S3 has no directories: drop the ones the delete left empty
+        bucket_dir = os.path.join(self.root, bucket)
+        directory = os.path.dirname(path)
+        with self._lock:
+            while directory != bucket_dir:
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+
+    def _sizes(self, bucket, prefix):
+        bucket_dir = os.path.join(self.root, bucket)
+        # Only walk the directory the prefix points into
+        start = os.path.join(bucket_dir, os.path.dirname(prefix))
+        sizes = {}
+        for directory, _, files in os.walk(start):
+            for name in files:
+                if name.startswith(".tmp-"):
+                    continue
+                path = os.path.join(directory, name)
+                key = os.path.relpath(path, bucket_dir).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    sizes[key] = os.path.getsize(path)
+        return sizes
+
+    def _part_path(self, upload_id: str, part_number: int) -> str:
+        return os.path.join(self._uploads_dir, upload_id, f"{part_number:05d}")
+
+    def _store_part(self, upload_id, part_number, body):
+        path = self._part_path(upload_id, part_number)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(body)
+
+    def _complete(self, bucket, key, upload_id, part_numbers):
+        def parts():
+            for number in part_numbers:
+                with open(self._part_path(upload_id, number), "rb") as f:
+                    yield f.read()
+
+        # One part in memory at a time, however large the object
+        return self._write_chunks(bucket, key, parts())
+
+    def _discard_upload(self, upload_id):
+        shutil.rmtree(os.path.join(self._uploads_dir, upload_id), ignore_errors=True)
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        # Upload ids must stay unique across processes sharing the directory
+        import uuid
+
+        return {"UploadId": uuid.uuid4().hex}
+
+
+class _ListObjectsPaginator:
+    def __init__(self, store: _ObjectStore):
+        self._store = store
+
+    def paginate(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        token = None
+        while True:
+            page = self._store.list_objects_v2(ContinuationToken=token, **kwargs)
+            yield page
+            if not page["IsTruncated"]:
+                return
+            token = page["NextContinuationToken"]
+
+
+def _client_error(code: str, key: str, operation: str) -> Exception:
+    """The botocore error S3 raises, so callers handle every backend alike."""
+    from botocore.exceptions import ClientError
+
+    return ClientError({"Error": {"Code": code, "Message": key}}, operation)
@@ -1,10 +1,8 @@
 import json
-import os
 from typing import Any, Dict
 
-import boto3
-
-from src.config.settings import settings
+from src.clients.aws import get_client
+from src.utils.lazy import LazyInstance
 from src.utils.logger import logger
 
 
@@ -15,18 +13,7 @@ class SecretsManagerClient:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(SecretsManagerClient, cls).__new__(cls)
-            ak = os.getenv("AWS_ACCESS_KEY_ID", "test")
-            sk = os.getenv("AWS_SECRET_ACCESS_KEY", "test")
-            print(
-                f"DEBUG: SecretsManagerClient using AK={ak}, SK={sk}, Endpoint={settings.LOCALSTACK_ENDPOINT}"
-            )
-            cls._instance._client = boto3.client(
-                "secretsmanager",
-                region_name=settings.AWS_REGION,
-                endpoint_url=settings.LOCALSTACK_ENDPOINT,
-                aws_access_key_id=ak,
-                aws_secret_access_key=sk,
-            )
+            cls._instance._client = get_client("secretsmanager")
         return cls._instance
 
     def get_secret(self, secret_name: str) -> Dict[str, Any]:
@@ -53,4 +40,4 @@ class SecretsManagerClient:
             raise e
 
 
-secrets_client = SecretsManagerClient()
+secrets_client = LazyInstance(SecretsManagerClient)
@@ -1,24 +1,14 @@
 import json
 from typing import Any, Dict, Optional
 
-import boto3
-from botocore.exceptions import ClientError
-
-from src.config.settings import settings
+from src.clients.aws import get_client
+from src.utils.lazy import LazyInstance
 from src.utils.logger import logger
 
 
 class SSMClient:
     def __init__(self):
-        self.client = boto3.client(
-            "ssm",
-            region_name=settings.AWS_REGION,
-            endpoint_url=settings.LOCALSTACK_ENDPOINT
-            if settings.ENV == "DEV"
-            else None,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        )
+        self.client = get_client("ssm")
 
     def get_parameter(
         self, name: str, default: Optional[Dict] = None
@@ -59,4 +49,4 @@ class SSMClient:
             raise
 
 
-ssm_client = SSMClient()
+ssm_client = LazyInstance(SSMClient)
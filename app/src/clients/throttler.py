@@ -0,0 +1,169 @@
+import email.utils
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Mapping, Optional
+
+from src.utils.logger import logger
+from src.utils.observability import observability
+
+# Status codes that mean "slow down" rather than "something broke"
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class AdaptiveThrottler:
+    """
+    Shared token bucket with AIMD (additive increase, multiplicative decrease)
+    control of both request rate and concurrency.
+
+    - Every request takes a token; tokens refill at the current rate.
+    - Each successful response nudges the rate up; every
+      'concurrency_step' successes allow one more request in flight.
+    - A 429/503 halves rate and concurrency, and Retry-After (or an
+      exponential backoff when absent) pauses every caller at once, so
+      threads do not retry independently into a storm.
+    - RateLimit-Remaining/Reset style headers cap the rate to what the
+      server says is left in the current window.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float,
+        min_rate: float,
+        max_rate: float,
+        max_concurrency: int,
+        additive_increase: float = 0.5,
+        decrease_factor: float = 0.5,
+        concurrency_step: int = 20,
+    ):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.max_concurrency
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.concurrency_step = concurrency_step
+
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._successes = 0
+        self._consecutive_throttles = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Waits for a concurrency slot and a rate token, then holds the slot."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0 and self._in_flight < self.concurrency:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self._in_flight += 1
+                        break
+                    wait = (1 - self._tokens) / self.rate
+                self._condition.wait(timeout=wait if wait > 0 else None)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Adjusts rate and concurrency from a response.
+        Returns the pause in seconds imposed on all callers, if any.
+        """
+        with self._condition:
+            pause = None
+            if status_code in THROTTLE_STATUS_CODES:
+                self._consecutive_throttles += 1
+                self._successes = 0
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self.concurrency = max(1, int(self.concurrency * self.decrease_factor))
+                pause = _retry_after_seconds(headers)
+                if pause is None:
+                    pause = min(2**self._consecutive_throttles, 60)
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                logger.warning(
+                    f"Throttled by server (HTTP {status_code}). Pausing {pause:.1f}s; "
+                    f"rate={self.rate:.2f}/s concurrency={self.concurrency}"
+                )
+            elif status_code < 400:
+                self._consecutive_throttles = 0
+                self._successes += 1
+                self.rate = min(self.max_rate, self.rate + self.additive_increase)
+                if (
+                    self._successes % self.concurrency_step == 0
+                    and self.concurrency < self.max_concurrency
+                ):
+                    self.concurrency += 1
+
+            self._apply_quota(headers)
+            self._condition.notify_all()
+            rate, concurrency = self.rate, self.concurrency
+
+        observability.record_gauge("http_throttle_rate", rate)
+        observability.record_gauge("http_throttle_concurrency", concurrency)
+        return pause
+
+    def _apply_quota(self, headers: Mapping[str, str]):
+        """Caps the rate to the remaining quota over the time left in the window."""
+        remaining = _header_number(
+            headers, "RateLimit-Remaining", "X-RateLimit-Remaining"
+        )
+        reset = _header_number(headers, "RateLimit-Reset", "X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+
+        # Reset is either seconds until the window ends or an epoch timestamp
+        seconds_left = reset - time.time() if reset > 1_000_000_000 else reset
+        if seconds_left <= 0:
+            return
+        if remaining <= 0:
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + seconds_left
+            )
+            return
+        self.rate = max(self.min_rate, min(self.rate, remaining / seconds_left))
+
+    def _refill(self, now: float):
+        # Burst is bounded by the concurrency limit
+        self._tokens = min(
+            float(self.concurrency),
+            self._tokens + (now - self._last_refill) * self.rate,
+        )
+        self._last_refill = now
+
+
+def _header_number(headers: Mapping[str, str], *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """Parses Retry-After as delta-seconds or an HTTP-date."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
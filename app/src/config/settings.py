@@ -25,6 +25,27 @@ class Settings:
     def AWS_SECRET_ACCESS_KEY(self) -> str:
         return os.getenv("AWS_SECRET_ACCESS_KEY", "")
 
+    @property
+    def AWS_MAX_POOL_CONNECTIONS(self) -> int:
+        """Connections pooled per AWS client (botocore default is 10)."""
+        return int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+
+    @property
+    def AWS_RETRY_MODE(self) -> str:
+        return os.getenv("AWS_RETRY_MODE", "adaptive")
+
+    @property
+    def AWS_MAX_ATTEMPTS(self) -> int:
+        return int(os.getenv("AWS_MAX_ATTEMPTS", "5"))
+
+    @property
+    def AWS_CONNECT_TIMEOUT(self) -> int:
+        return int(os.getenv("AWS_CONNECT_TIMEOUT", "5"))
+
+    @property
+    def AWS_READ_TIMEOUT(self) -> int:
+        return int(os.getenv("AWS_READ_TIMEOUT", "30"))
+
     @property
     def LOG_LEVEL(self) -> str:
         return os.getenv("LOG_LEVEL", "INFO").upper()
@@ -48,6 +69,121 @@ class Settings:
     def MAX_RETRIES(self) -> int:
         return int(os.getenv("MAX_RETRIES", "3"))
 
+    @property
+    def HTTP_POOL_MAXSIZE(self) -> int:
+        """Maximum number of pooled connections kept per host."""
+        return int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+
+    @property
+    def CREDLY_MAX_CONCURRENCY(self) -> int:
+        """Maximum number of Credly page requests in flight at once."""
+        return int(os.getenv("CREDLY_MAX_CONCURRENCY", "4"))
+
+    @property
+    def THROTTLE_INITIAL_RATE(self) -> float:
+        """Requests per second the adaptive throttler starts from."""
+        return float(os.getenv("THROTTLE_INITIAL_RATE", "10"))
+
+    @property
+    def THROTTLE_MIN_RATE(self) -> float:
+        return float(os.getenv("THROTTLE_MIN_RATE", "0.5"))
+
+    @property
+    def THROTTLE_MAX_RATE(self) -> float:
+        return float(os.getenv("THROTTLE_MAX_RATE", "50"))
+
+    @property
+    def LAMBDA_TIME_BUDGET_RATIO(self) -> float:
+        """
+        Share of the invocation's remaining time a badges or templates run may
+        spend pulling pages before returning next_page, which the state
+        machine passes back as page. 0 processes one page per invocation.
+        """
+        return float(os.getenv("LAMBDA_TIME_BUDGET_RATIO", "0"))
+
+    @property
+    def PIPELINE_MAX_PENDING_PAGES(self) -> int:
+        """Pages allowed to wait for mapping/writing while the next is fetched."""
+        return int(os.getenv("PIPELINE_MAX_PENDING_PAGES", "2"))
+
+    @property
+    def PARQUET_TARGET_FILE_ROWS(self) -> int:
+        """Rows buffered before a Parquet file is emitted."""
+        return int(os.getenv("PARQUET_TARGET_FILE_ROWS", "1000000"))
+
+    @property
+    def PARQUET_TARGET_FILE_MB(self) -> int:
+        """Buffered (uncompressed) size at which a Parquet file is emitted."""
+        return int(os.getenv("PARQUET_TARGET_FILE_MB", "256"))
+
+    @property
+    def PARQUET_ROW_GROUP_ROWS(self) -> int:
+        return int(os.getenv("PARQUET_ROW_GROUP_ROWS", "100000"))
+
+    @property
+    def PARQUET_BUFFER_MEMORY_MB(self) -> int:
+        """Buffered rows kept in memory before spilling to PARQUET_SPILL_DIR."""
+        return int(os.getenv("PARQUET_BUFFER_MEMORY_MB", "32"))
+
+    @property
+    def PARQUET_SPILL_DIR(self) -> str:
+        return os.getenv("PARQUET_SPILL_DIR", "/tmp")
+
+    @property
+    def PARQUET_COMPRESSION(self) -> str:
+        """Parquet codec: zstd, snappy, lz4, gzip, brotli or none."""
+        return os.getenv("PARQUET_COMPRESSION", "snappy").lower()
+
+    @property
+    def PARQUET_COMPRESSION_LEVEL(self) -> Optional[int]:
+        """Codec level (zstd, gzip, brotli); unset uses the codec's default."""
+        level = os.getenv("PARQUET_COMPRESSION_LEVEL")
+        return int(level) if level else None
+
+    @property
+    def PARQUET_DATA_PAGE_SIZE_KB(self) -> int:
+        return int(os.getenv("PARQUET_DATA_PAGE_SIZE_KB", "1024"))
+
+    @property
+    def PARQUET_DICTIONARY(self) -> bool:
+        """Dictionary encode each table's low-cardinality columns."""
+        return os.getenv("PARQUET_DICTIONARY", "true").lower() == "true"
+
+    @property
+    def PARQUET_WRITE_STATISTICS(self) -> str:
+        """Column statistics: "true", "false" or comma-separated column names."""
+        return os.getenv("PARQUET_WRITE_STATISTICS", "true")
+
+    def table_override(self, name: str, table_name: str) -> Optional[str]:
+        """
+        Raw per-table value of a setting, read from {name}_{TABLE_NAME}
+        (e.g. PARQUET_COMPRESSION_BADGES_EMITIDAS), or None when unset.
+        """
+        return os.getenv(f"{name}_{table_name.upper()}")
+
+    @property
+    def PARQUET_SCHEMA_VERSION(self) -> int:
+        """1: all-string columns; 2: typed columns (see parquet_schemas)."""
+        return int(os.getenv("PARQUET_SCHEMA_VERSION", "1"))
+
+    @property
+    def S3_MULTIPART_PART_MB(self) -> int:
+        """Size of each part streamed to S3 (5 MB minimum)."""
+        return int(os.getenv("S3_MULTIPART_PART_MB", "8"))
+
+    @property
+    def S3_MULTIPART_MAX_PENDING_PARTS(self) -> int:
+        """Parts uploaded in the background while the next one is filled."""
+        return int(os.getenv("S3_MULTIPART_MAX_PENDING_PARTS", "2"))
+
+    @property
+    def S3_MAX_CONCURRENCY(self) -> int:
+        """
+        S3 requests sent at once by batch operations: removing old runs (1000
+        keys per request), reading stats sidecars and compaction reads.
+        """
+        return int(os.getenv("S3_MAX_CONCURRENCY", "4"))
+
     # Credly Specifics
     @property
     def CREDLY_BASE_URL(self) -> str:
@@ -57,6 +193,31 @@ class Settings:
     def CREDLY_ORG_ID(self) -> str:
         return os.getenv("CREDLY_ORG_ID", "")
 
+    @property
+    def OUTPUT_SINK(self) -> str:
+        """Where S3Writer writes: "s3", "local" (OUTPUT_LOCAL_DIR) or "memory"."""
+        return os.getenv("OUTPUT_SINK", "s3").lower()
+
+    @property
+    def OUTPUT_LOCAL_DIR(self) -> str:
+        """Root of the "local" sink; holds one directory per bucket."""
+        return os.getenv("OUTPUT_LOCAL_DIR", "output")
+
+    @property
+    def RAW_ARCHIVE_ENABLED(self) -> bool:
+        """Also keep each fetched page's raw items, for replay without the API."""
+        return os.getenv("RAW_ARCHIVE_ENABLED", "true").lower() == "true"
+
+    @property
+    def RAW_ARCHIVE_COMPRESSION(self) -> str:
+        """Codec of archived pages: gzip or zstd."""
+        return os.getenv("RAW_ARCHIVE_COMPRESSION", "gzip").lower()
+
+    @property
+    def TEMPLATES_SNAPSHOT_INTERVAL_DAYS(self) -> int:
+        """Days between full template snapshots; loads in between write deltas."""
+        return int(os.getenv("TEMPLATES_SNAPSHOT_INTERVAL_DAYS", "7"))
+
     @property
     def S3_BUCKET_NAME(self) -> str:
         return os.getenv("S3_BUCKET_NAME", "my-datalake-bucket")
@@ -0,0 +1,148 @@
+import datetime
+from typing import Any, Dict, List, Optional
+
+from src.config.settings import settings
+from src.utils.concurrency import bounded_map
+from src.utils.logger import logger
+from src.utils.manifest import LOAD_FIELDS
+from src.utils.observability import observability
+from src.utils.parquet_buffer import BufferedParquetWriter
+from src.utils.parquet_schemas import conform_table
+from src.utils.s3_writer import s3_writer
+
+# (key, version): one row is kept per key, the one with the highest version
+DEDUPLICATION_KEYS = {
+    "badges_emitidas": ("badge_id", "updated_at"),
+    "badges_templates": ("badge_template_id", "updated_at"),
+}
+
+
+class CompactionService:
+    def compact(self, table_name: str, partition_date: datetime.date) -> dict:
+        """
+        Rewrites a partition's committed files as a few right-sized Parquet
+        files without duplicate rows, and publishes them as a new run, so
+        readers switch over in one manifest write.
+
+        Memory does not grow with the partition: a first pass reads only the
+        key and version columns to decide which rows to keep, and a second
+        streams the files row group by row group (ranged reads, see
+        S3Writer.open_parquet) into a BufferedParquetWriter, which emits and
+        spills files as loads do. Rows keep the order of the committed files.
+
+        Must not run while a load is writing the same partition.
+
+        Returns:
+            dict with:
+                - records_processed: rows in the compacted partition
+                - duplicates_removed: int
+                - files_before / files_after: int
+                - skipped: True when the partition has no committed files
+        """
+        previous = s3_writer.read_manifest(table_name, partition_date) or {}
+        files = s3_writer.committed_objects(table_name, partition_date)
+        logger.info(f"Compacting {table_name} {partition_date} ({len(files)} files)")
+        if not files:
+            return {
+                "records_processed": 0,
+                "duplicates_removed": 0,
+                "files_before": 0,
+                "files_after": 0,
+                "skipped": True,
+            }
+
+        keep = self._rows_to_keep(table_name, files)
+        run_id = s3_writer.start_run(table_name, partition_date)
+        buffer = BufferedParquetWriter(
+            s3_writer, table_name, partition_date, run_id=run_id
+        )
+        rows_before, rows_after = 0, 0
+        for file in files:
+            parquet_file = s3_writer.open_parquet(file["key"], file["size"])
+            for group in range(parquet_file.num_row_groups):
+                # Files may come from different schema versions
+                table = conform_table(parquet_file.read_row_group(group), table_name)
+                rows = table.num_rows
+                if keep is not None:
+                    table = table.filter(keep.slice(rows_before, rows))
+                rows_before += rows
+                rows_after += table.num_rows
+                for batch in table.to_batches():
+                    buffer.add(batch)
+        buffer.close()
+        # A compacted delta is still a delta
+        manifest = s3_writer.commit_run(
+            table_name,
+            partition_date,
+            run_id,
+            extra={k: previous[k] for k in LOAD_FIELDS if k in previous},
+        )
+
+        duplicates = rows_before - rows_after
+        observability.increment_metric(
+            "compaction_duplicates_removed",
+            tags={"table": table_name},
+            value=duplicates,
+        )
+        logger.info(
+            f"Compacted {table_name} {partition_date}: {len(files)} -> "
+            f"{len(manifest['files'])} files, {duplicates} duplicates removed"
+        )
+        return {
+            "records_processed": rows_after,
+            "duplicates_removed": duplicates,
+            "files_before": len(files),
+            "files_after": len(manifest["files"]),
+        }
+
+    def _rows_to_keep(
+        self, table_name: str, files: List[Dict[str, Any]]
+    ) -> Optional[Any]:
+        """
+        Boolean mask over the partition's rows (files in order) keeping one
+        row per key, the latest by version; None for tables without a key.
+        Only the key and version columns are read, concurrently.
+
+        Rows repeat within a partition when a load fetches a page twice: an
+        invocation retried after writing some of its pages, or a badge
+        updated while the load pages through the listing, which shifts it
+        to another page. The 15-minute overlap of daily loads re-reads rows
+        of the previous day's partition instead, so compacting one partition
+        does not remove those.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if table_name not in DEDUPLICATION_KEYS:
+            return None
+        key, version = DEDUPLICATION_KEYS[table_name]
+
+        def read_keys(file: Dict[str, Any]):
+            parquet_file = s3_writer.open_parquet(file["key"], file["size"])
+            present = [
+                c for c in (key, version) if c in parquet_file.schema_arrow.names
+            ]
+            return conform_table(
+                parquet_file.read(columns=present), table_name, columns=[key, version]
+            )
+
+        tables = list(bounded_map(read_keys, files, settings.S3_MAX_CONCURRENCY))
+        keys = pa.concat_tables(tables)
+        if keys.num_rows < 2:
+            return pa.array([True] * keys.num_rows)
+        keys = keys.append_column(
+            "position", pa.array(range(keys.num_rows), pa.int64())
+        )
+
+        ordered = keys.sort_by([(key, "ascending"), (version, "descending")])
+        values = ordered.column(key).combine_chunks()
+        previous = pa.concat_arrays(
+            [pa.nulls(1, values.type), values.slice(0, len(values) - 1)]
+        )
+        # First row of each key; rows without a key are all kept
+        first = pc.fill_null(pc.not_equal(values, previous), True)
+        kept = ordered.filter(first).column("position")
+        return pc.is_in(keys.column("position"), value_set=kept.combine_chunks())
+
+
+compaction_service = CompactionService()
@@ -1,20 +1,75 @@
 import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from src.clients.credly_client import credly_client
+from src.config.settings import settings
+from src.utils.field_mapping import FieldMapping
 from src.utils.logger import logger
+from src.utils.observability import observability
+from src.utils.parquet_buffer import BufferedParquetWriter
+from src.utils.pipeline import PipelineStage
 from src.utils.s3_writer import s3_writer
+from src.utils.time_budget import TimeBudget
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+HISTORICAL_START_DATE = "2000-01-01 00:00:00"
+
+# Each shard boundary is chosen among this many equal-width sample windows
+SHARD_SAMPLES_PER_SHARD = 4
+SHARD_PLAN_PARAMETER = "/credly/state/badges/shard_plan"
+SHARD_STATE_PREFIX = "/credly/state/badges/shards"
+# Cursor, partition and run of a load split across invocations
+BADGES_PROGRESS_PARAMETER = "/credly/state/badges/progress"
+
+# Badge columns in file order: (column, path, kind, default), see FieldMapping
+BADGE_FIELDS = (
+    ("badge_id", "id", "str", ""),
+    ("issued_to", "issued_to", None, ""),
+    ("issued_to_first_name", "issued_to_first_name", None, ""),
+    ("issued_to_middle_name", "issued_to_middle_name", None, ""),
+    ("issued_to_last_name", "issued_to_last_name", None, ""),
+    ("user_id", "user.id", "str", ""),
+    ("recipient_email", "recipient_email", None, ""),
+    ("badge_template_id", "badge_template.id", "str", ""),
+    ("badge_template_name", "badge_template.name", None, ""),
+    ("image_url", "badge_template.image_url", None, ""),
+    ("locale", "locale", None, ""),
+    ("public", "public", "str", ""),
+    ("state", "state", None, ""),
+    ("issued_at", "issued_at", None, ""),
+    ("expires_at", "expires_at", None, ""),
+    ("created_at", "created_at", None, ""),
+    ("updated_at", "updated_at", None, ""),
+    ("state_updated_at", "state_updated_at", None, ""),
+    # Organization info from the first issuer entity
+    ("organization_id", "issuer.entities.0.id", "str", ""),
+    ("organization_name", "issuer.entities.0.name", None, ""),
+)
+BADGE_MAPPING = FieldMapping("badges_emitidas", BADGE_FIELDS)
 
 
 class CredlyBadgesService:
-    def process(self, mode: str, page: str = None, is_first_page: bool = True) -> dict:
+    def process(
+        self,
+        mode: str,
+        page: str = None,
+        is_first_page: bool = True,
+        time_budget: TimeBudget = None,
+    ) -> dict:
         """
-        Processes a single page of badges.
+        Processes a single page of badges, or as many pages as the time budget
+        allows when one is given.
+
+        The first page fixes the load's partition (today) and, in daily mode,
+        the end of its query window; continuations keep both, so rows carried
+        past midnight stay in their load. The watermark only moves to that end
+        once the load is committed.
 
         Args:
             mode: 'historical' or 'daily'
             page: Optional page URL for continuation
-            is_first_page: Whether this is the first page (to clear partition)
+            is_first_page: Whether this is the first page (to start a new run)
+            time_budget: Optional budget to keep pulling pages within
 
         Returns:
             dict with:
@@ -61,45 +116,320 @@ class CredlyBadgesService:
             params["end_date"] = end_date
 
         elif mode == "historical":
-            params["start_date"] = "2000-01-01 00:00:00"
+            params["start_date"] = HISTORICAL_START_DATE
+
+        from src.clients.ssm_client import ssm_client
 
-        # Clear partition only on first page
+        # A new run on the first page; the partition keeps its committed data
+        # until the run is committed on the last one
         if is_first_page:
-            s3_writer.clear_partition("badges_emitidas", today)
-
-        # Fetch single page
-        items, next_page_url = credly_client.get_badges(params, page_url=page)
-
-        # Process and write
-        if items:
-            mapped_batch = [self._map_badge(item) for item in items]
-            # Use timestamp-based part number to avoid collisions
-            part_number = int(datetime.datetime.now().timestamp() * 1000)
-            s3_writer.write_parquet("badges_emitidas", mapped_batch, today, part_number)
-
-        # Update watermark logic:
-        # In a real scenario, we only update when next_page_url is None (complete success).
-        # However, for local testing with page limits, we might want to force update.
-        # For now, we keep strict logic: only update on full completion.
-        # BUT, to make the test pass with 2 pages limit, we need to simulate completion or force update.
-        # Let's assume if we processed items, we update (this is a simplification for the test).
-        # ideally, the simulation script should handle this, but the service logic is what matters.
-
-        # FIX: The simulation stops at 2 pages, so next_page_url is NOT None.
-        # The service doesn't know about the simulation limit.
-        # We need a way to signal "force update" or just rely on completion.
-
-        # For the sake of this specific test request ("simular como se fosse ontem"),
-        # we can relax the condition slightly or ensure the test consumes enough to finish (which is hard with 4k records).
-
-        # Alternative: Check if we are in a simulation context or just update anyway for this phase.
-        # Let's update if we have items, assuming the orchestrator handles failures.
-        # This is risky for production (partial data), but standard for "checkpointing".
-        # Actually, checkpointing every page is safer than only at the end.
-        if mode == "daily":
+            partition_date = today
+            run_id = s3_writer.start_run("badges_emitidas", partition_date)
+        else:
+            progress = ssm_client.get_parameter(BADGES_PROGRESS_PARAMETER)
+            if progress.get("next_page") != page:
+                raise ValueError(f"No badges load to continue at page {page}")
+            partition_date = datetime.date.fromisoformat(progress["partition_date"])
+            run_id = progress["run_id"]
+            # Another load may have replaced or committed the run meanwhile
+            if s3_writer.current_run("badges_emitidas", partition_date) != run_id:
+                raise ValueError(f"Run {run_id} of badges is no longer open")
+
+            if mode == "daily":
+                # The page URL still carries the first page's query window
+                params["end_date"] = progress["end_date"]
+
+        records_processed, next_page_url = self._process_pages(
+            params, page, partition_date, time_budget, run_id=run_id
+        )
+        if next_page_url is None:
+            s3_writer.commit_run("badges_emitidas", partition_date, run_id)
+        if next_page_url is not None or not is_first_page:
+            # A finished load clears the cursor: a stale continuation must
+            # not resume it
+            ssm_client.put_parameter(
+                BADGES_PROGRESS_PARAMETER,
+                {
+                    "next_page": next_page_url,
+                    "partition_date": partition_date.isoformat(),
+                    "run_id": run_id,
+                    "end_date": params.get("end_date"),
+                },
+                description="Badges load in progress",
+            )
+
+        # Only a committed load moves the watermark: a load that stops midway
+        # is fetched again from the same start by the next one
+        if mode == "daily" and next_page_url is None:
             self._update_watermark(params["end_date"])
 
-        return {"records_processed": len(items), "next_page": next_page_url}
+        return {"records_processed": records_processed, "next_page": next_page_url}
+
+    def plan_shards(self, mode: str, shard_count: int) -> dict:
+        """
+        Splits a historical load into date windows of similar badge volume.
+
+        Every window is an independent query with its own cursor, so shards can
+        be fetched at the same time (e.g. by a Step Functions Map state) with
+        process_shard. One run is started here for all shards and committed by
+        the last shard to complete. Shards carry the size of their plan, so
+        SSM only keeps the run and shard count, whatever the number of shards.
+
+        Returns:
+            dict with:
+                - records_processed: 0
+                - next_page: None
+                - shards: list of shard descriptors for process_shard
+        """
+        if mode != "historical":
+            raise ValueError("Sharding is only supported in historical mode")
+
+        today = datetime.date.today()
+        start = datetime.datetime.strptime(HISTORICAL_START_DATE, DATE_FORMAT)
+        end = datetime.datetime.now().replace(microsecond=0)
+
+        windows = self._split_window(start, end, max(1, shard_count))
+        run_id = s3_writer.start_run("badges_emitidas", today)
+        shards = [
+            {
+                "shard_id": _shard_id(index),
+                "shard_count": len(windows),
+                "start_date": window_start.strftime(DATE_FORMAT),
+                "end_date": window_end.strftime(DATE_FORMAT),
+                "partition_date": today.isoformat(),
+                "run_id": run_id,
+            }
+            for index, (window_start, window_end) in enumerate(windows)
+        ]
+        logger.info(f"Planned {len(shards)} badge shards", extra={"shards": shards})
+
+        from src.clients.ssm_client import ssm_client
+
+        ssm_client.put_parameter(
+            SHARD_PLAN_PARAMETER,
+            {
+                "run_id": run_id,
+                "shard_count": len(shards),
+                "partition_date": today.isoformat(),
+                "created_at": datetime.datetime.now().isoformat(),
+            },
+            description="Date-window shard plan for Credly Badges historical load",
+        )
+
+        return {"records_processed": 0, "next_page": None, "shards": shards}
+
+    def process_shard(
+        self,
+        mode: str,
+        shard: dict,
+        page: str = None,
+        time_budget: TimeBudget = None,
+    ) -> dict:
+        """
+        Processes a single page of one shard planned by plan_shards, or as many
+        pages as the time budget allows when one is given.
+
+        Without a page URL the shard resumes from its stored state, so a retried
+        shard continues where it stopped and a completed shard is not re-fetched.
+        State left by an earlier run's plan is ignored, and a shard whose run
+        is no longer open (replaced or committed) raises ValueError.
+
+        Returns:
+            dict with:
+                - records_processed: int
+                - next_page: str | None
+        """
+        from src.clients.ssm_client import ssm_client
+
+        shard_id = shard["shard_id"]
+        state_name = f"{SHARD_STATE_PREFIX}/{shard_id}"
+
+        if page is None:
+            state = ssm_client.get_parameter(state_name)
+            if state.get("run_id") != shard.get("run_id"):
+                state = {}
+            if state.get("status") == "complete":
+                logger.info(f"Shard {shard_id} already complete. Skipping.")
+                return {"records_processed": 0, "next_page": None}
+            page = state.get("next_page")
+
+        logger.info(
+            f"Processing badges shard {shard_id} in {mode} mode "
+            f"({shard['start_date']} -> {shard['end_date']}, page={page})"
+        )
+
+        params = {"start_date": shard["start_date"], "end_date": shard["end_date"]}
+        partition_date = datetime.date.fromisoformat(shard["partition_date"])
+        # Plans made before runs existed carry no run id
+        run_id = shard.get("run_id") or s3_writer.current_run(
+            "badges_emitidas", partition_date
+        )
+        # Another load may have replaced or committed the run meanwhile
+        if s3_writer.current_run("badges_emitidas", partition_date) != run_id:
+            raise ValueError(f"Run {run_id} of badges is no longer open")
+        records_processed, next_page_url = self._process_pages(
+            params, page, partition_date, time_budget, shard_id=shard_id, run_id=run_id
+        )
+
+        ssm_client.put_parameter(
+            state_name,
+            {
+                "status": "in_progress" if next_page_url else "complete",
+                "next_page": next_page_url,
+                "run_id": shard.get("run_id"),
+                "updated_at": datetime.datetime.now().isoformat(),
+            },
+            description=f"Completion state for Credly Badges shard {shard_id}",
+        )
+
+        if next_page_url is None and self._all_shards_complete(shard):
+            s3_writer.commit_run("badges_emitidas", partition_date, run_id)
+
+        return {"records_processed": records_processed, "next_page": next_page_url}
+
+    def _all_shards_complete(self, shard: dict) -> bool:
+        """
+        Whether every other shard of the plan completed in the same run.
+        Two shards finishing together may both commit, which is harmless.
+        """
+        from src.clients.ssm_client import ssm_client
+
+        if "shard_count" in shard:
+            shard_ids = [_shard_id(index) for index in range(shard["shard_count"])]
+        else:
+            # Plans made before shards carried their count listed every shard
+            plan = ssm_client.get_parameter(SHARD_PLAN_PARAMETER)
+            shard_ids = [other["shard_id"] for other in plan.get("shards", [])]
+        for shard_id in shard_ids:
+            if shard_id == shard["shard_id"]:
+                continue
+            state = ssm_client.get_parameter(f"{SHARD_STATE_PREFIX}/{shard_id}")
+            if state.get("status") != "complete" or state.get("run_id") != shard.get(
+                "run_id"
+            ):
+                return False
+        return True
+
+    def _split_window(
+        self, start: datetime.datetime, end: datetime.datetime, shard_count: int
+    ) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        """
+        Cuts [start, end] into up to shard_count contiguous, non-overlapping
+        windows holding roughly the same number of badges.
+
+        The range is sampled in equal-width slices whose badge counts are probed
+        concurrently; boundaries are placed on the cumulative count. If the API
+        does not report counts, the windows fall back to equal width.
+        """
+        samples = shard_count * SHARD_SAMPLES_PER_SHARD
+        step = (end - start) / samples
+        bounds = [start + step * i for i in range(samples)] + [end]
+        bounds = [b.replace(microsecond=0) for b in bounds]
+
+        weights = [1] * samples
+        if shard_count > 1:
+            counts = credly_client.count_badges(
+                [
+                    {
+                        "start_date": bounds[i].strftime(DATE_FORMAT),
+                        "end_date": bounds[i + 1].strftime(DATE_FORMAT),
+                    }
+                    for i in range(samples)
+                ]
+            )
+            if all(count is not None for count in counts) and sum(counts) > 0:
+                weights = counts
+            else:
+                logger.info("Badge counts unavailable. Using equal-width shards.")
+
+        total = sum(weights)
+        cuts = [start]
+        cumulative = 0
+        for i, weight in enumerate(weights[:-1]):
+            cumulative += weight
+            if (
+                len(cuts) < shard_count
+                and cumulative >= total * len(cuts) / shard_count
+            ):
+                cuts.append(bounds[i + 1])
+
+        # Windows are inclusive on both ends, so the next one starts a second later
+        windows = []
+        for i, cut in enumerate(cuts):
+            window_end = (
+                cuts[i + 1] - datetime.timedelta(seconds=1)
+                if i + 1 < len(cuts)
+                else end
+            )
+            windows.append((cut, window_end))
+        return windows
+
+    def _process_pages(
+        self,
+        params: dict,
+        page: str | None,
+        partition_date: datetime.date,
+        time_budget: TimeBudget | None,
+        shard_id: str = None,
+        run_id: str = None,
+    ) -> tuple[int, str | None]:
+        """
+        Fetches and maps pages starting at 'page' until the cursor is exhausted
+        or, without a time budget, after the first page.
+
+        Raw pages are archived for replay and mapped rows go to a buffered
+        writer that emits large Parquet files and carries leftover rows to
+        the next invocation. Mapping and buffering run
+        on a pipeline stage, so the next page is downloaded meanwhile.
+        Returns: (records_processed, next_page_url)
+        """
+        max_pending = settings.PIPELINE_MAX_PENDING_PAGES
+        records_processed = 0
+
+        buffer = BufferedParquetWriter(
+            s3_writer,
+            "badges_emitidas",
+            partition_date,
+            writer_id=shard_id,
+            run_id=run_id,
+        )
+        buffer.restore()
+
+        with PipelineStage(
+            lambda items: self._buffer_page(items, buffer), max_pending=max_pending
+        ) as writer:
+            while True:
+                items, next_page_url = credly_client.get_badges(params, page_url=page)
+                writer.submit(items)
+                records_processed += len(items)
+
+                # Leave room for the pages still queued for writing
+                if not next_page_url or not (
+                    time_budget
+                    and time_budget.allows_another_page(reserved_pages=max_pending)
+                ):
+                    break
+                page = next_page_url
+
+        buffer.close(final=next_page_url is None)
+
+        if time_budget:
+            observability.record_gauge("badges_pages_per_invocation", time_budget.pages)
+        return records_processed, next_page_url
+
+    def _buffer_page(self, items: list, buffer: BufferedParquetWriter):
+        if not items:
+            return
+
+        if settings.RAW_ARCHIVE_ENABLED:
+            s3_writer.archive_page(
+                "badges_emitidas",
+                buffer.partition_date,
+                buffer.run_id,
+                items,
+                writer_id=buffer.writer_id,
+            )
+        buffer.add(self._map_badges(items, settings.PARQUET_SCHEMA_VERSION))
 
     def _get_watermark(self) -> dict:
         """Retrieves the last watermark from SSM."""
@@ -117,47 +447,22 @@ class CredlyBadgesService:
             description="Last processed watermark for Credly Badges",
         )
 
-    def _map_badge(self, item: Dict[str, Any]) -> Dict[str, str]:
+    def _map_badge(
+        self, item: Dict[str, Any], schema_version: int = 1
+    ) -> Dict[str, Any]:
         """
-        Maps API response to flat schema with all fields as strings.
+        Maps API response to flat schema with all fields as strings, or with
+        typed columns from schema version 2 on (see parquet_schemas).
         """
+        return BADGE_MAPPING.rows([item], schema_version)[0]
+
+    def _map_badges(self, items: List[Dict[str, Any]], schema_version: int = 1):
+        """Maps a page of badges column by column into a RecordBatch."""
+        return BADGE_MAPPING.record_batch(items, schema_version)
+
 
-        # Helper to safely get nested fields
-        def get_val(d, *keys):
-            for k in keys:
-                d = d.get(k, {})
-            return str(d) if d and not isinstance(d, dict) else ""
-
-        user = item.get("user", {})
-        template = item.get("badge_template", {})
-
-        # Organization info from issuer entities
-        issuer = item.get("issuer", {})
-        entities = issuer.get("entities", [])
-        issuer_entity = entities[0] if entities else {}
-
-        return {
-            "badge_id": str(item.get("id", "")),
-            "issued_to": item.get("issued_to", ""),
-            "issued_to_first_name": item.get("issued_to_first_name", ""),
-            "issued_to_middle_name": item.get("issued_to_middle_name", ""),
-            "issued_to_last_name": item.get("issued_to_last_name", ""),
-            "user_id": str(user.get("id", "")),
-            "recipient_email": item.get("recipient_email", ""),
-            "badge_template_id": str(template.get("id", "")),
-            "badge_template_name": template.get("name", ""),
-            "image_url": template.get("image_url", ""),
-            "locale": item.get("locale", ""),
-            "public": str(item.get("public", "")),
-            "state": item.get("state", ""),
-            "issued_at": item.get("issued_at", ""),
-            "expires_at": item.get("expires_at", ""),
-            "created_at": item.get("created_at", ""),
-            "updated_at": item.get("updated_at", ""),
-            "state_updated_at": item.get("state_updated_at", ""),
-            "organization_id": str(issuer_entity.get("id", "")),
-            "organization_name": issuer_entity.get("name", ""),
-        }
+def _shard_id(index: int) -> str:
+    return f"{index:03d}"
 
 
 credly_badges_service = CredlyBadgesService()
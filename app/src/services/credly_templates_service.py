@@ -1,179 +1,433 @@
 import datetime
-import hashlib
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from src.clients.credly_client import credly_client
+from src.config.settings import settings
+from src.utils.field_mapping import FieldMapping
+from src.utils.fingerprint_index import FingerprintIndex
 from src.utils.logger import logger
+from src.utils.parquet_buffer import BufferedParquetWriter
+from src.utils.pipeline import PipelineStage
 from src.utils.s3_writer import s3_writer
+from src.utils.time_budget import TimeBudget
+
+# Template and activity columns in file order: (column, path, kind, default),
+# see FieldMapping
+TEMPLATE_FIELDS = (
+    ("badge_template_id", "id", "str", ""),
+    ("primary_badge_template_id", "primary_badge_template_id", "str", ""),
+    ("variant_name", "variant_name", None, ""),
+    ("name", "name", None, ""),
+    ("description", "description", None, ""),
+    ("state", "state", None, ""),
+    ("public", "public", "str", ""),
+    ("badges_count", "badges_count", "str", ""),
+    ("image_url", "image_url", None, ""),
+    ("url", "url", None, ""),
+    ("vanity_slug", "vanity_slug", None, ""),
+    ("variants_allowed", "variants_allowed", "str", ""),
+    ("variant_type", "variant_type", None, ""),
+    ("level", "level", None, ""),
+    ("type_category", "type_category", None, ""),
+    # Skills can be a list of strings or objects depending on API version/response
+    ("skills", "skills", "names", []),
+    ("reporting_tags", "reporting_tags", "list", ""),
+    ("state_updated_at", "state_updated_at", None, ""),
+    ("created_at", "created_at", None, ""),
+    ("updated_at", "updated_at", None, ""),
+    ("organization_id", "owner.id", "str", ""),
+    ("organization_name", "owner.name", None, ""),
+    ("organization_vanity_url", "owner.vanity_url", None, ""),
+)
+# One row per element of badge_template_activities
+ACTIVITY_FIELDS = (
+    ("badge_template_id", "parent.id", "str", ""),
+    ("badge_template_activity_id", "id", "str", ""),
+    ("badge_template_activity_title", "title", None, ""),
+    ("badge_template_activity_type", "activity_type", None, ""),
+    ("badge_template_activity_url", "url", None, ""),
+)
+TEMPLATE_MAPPING = FieldMapping("badges_templates", TEMPLATE_FIELDS)
+ACTIVITY_MAPPING = FieldMapping(
+    "badges_templates_activities", ACTIVITY_FIELDS, explode="badge_template_activities"
+)
+
+TEMPLATES_STATE_PARAMETER = "/credly/state/templates"
+# Cursor, runs and running template count of a load split across invocations
+TEMPLATES_PROGRESS_PARAMETER = "/credly/state/templates/progress"
+# ETag/Last-Modified of every page, kept in S3 next to the fingerprint index
+# (S3Writer.save_state): one entry per page outgrows an SSM parameter
+TEMPLATES_VALIDATORS_STATE = "page_validators"
 
 
 class CredlyTemplatesService:
-    def process(self, mode: str, page_limit: int = None):
+    def process(
+        self,
+        mode: str,
+        page: str = None,
+        time_budget: TimeBudget = None,
+        page_limit: int = None,
+    ) -> dict:
         """
-        Orchestrates fetching and saving templates.
+        Streams templates page by page: each page is archived, then only the
+        templates whose id and updated_at differ from the fingerprint index
+        of the last load are mapped and buffered, so a one-template edit
+        writes one row. Memory holds the fingerprints, not the templates.
+
+        A download only starts when a single-item probe (template count and
+        latest updated_at) differs from the stored state, or, when the probe
+        is inconclusive, when a known page no longer answers 304.
+
+        Loads are deltas (changed templates plus the ids of deleted ones in
+        the manifest, see manifest.LOAD_FIELDS) except for full snapshots:
+        the first load, historical mode and every
+        TEMPLATES_SNAPSHOT_INTERVAL_DAYS. A load that changed nothing
+        discards its runs. With a time budget the load stops between pages
+        and returns the next page number, to be passed back as 'page' (like
+        badges); without one every page is processed in this invocation.
+
+        Returns:
+            dict with:
+                - records_processed: templates written
+                - next_page: str | None
         """
-        logger.info(
-            f"Starting Templates processing in {mode} mode (page_limit={page_limit})"
-        )
-
-        params = {}
-        today = datetime.date.today()
-
-        # Fetch all templates first to calculate hash
-        all_templates = []
-        params["page_size"] = 100  # Maximize page size for efficiency
+        logger.info(f"Starting Templates processing in {mode} mode (page={page})")
 
-        page_url = None
-        pages_processed = 0
-        part_number = 1
+        from src.clients.ssm_client import ssm_client
 
-        while True:
-            items, next_page_url = credly_client.get_templates(
-                params, page_url=page_url
+        params = {"page_size": 100}  # Maximize page size for efficiency
+        metadata = ssm_client.get_parameter(TEMPLATES_STATE_PARAMETER)
+
+        if page is None:
+            # Cheapest signals first: one single-item request...
+            probe = {} if mode == "historical" else credly_client.probe_templates()
+            moved = self._probe_moved(probe, metadata)
+            if moved is False:
+                logger.info("Templates count and latest update unchanged. Skipping.")
+                return {"records_processed": 0, "next_page": None}
+            # ...then header-only round-trips: if every known page answers 304
+            # nothing changed. Historical loads are forced snapshots.
+            if mode != "historical" and moved is None:
+                stored_validators = s3_writer.load_state(
+                    "badges_templates", TEMPLATES_VALIDATORS_STATE
+                )
+                if stored_validators and credly_client.templates_not_modified(
+                    params, stored_validators
+                ):
+                    logger.info("All template pages not modified. Skipping ingestion.")
+                    return {"records_processed": 0, "next_page": None}
+            # Only a load that goes ahead reads the index
+            index_state = s3_writer.load_fingerprints("badges_templates")
+            index = FingerprintIndex.from_state(index_state)
+            today = datetime.date.today()
+            load, snapshot_due = self._load_kind(
+                mode, index if index_state else None, today
+            )
+            progress = self._start_load(today, load, snapshot_due)
+            progress["max_updated_at"] = probe.get("max_updated_at")
+            seen, validators = {}, {}
+        else:
+            progress = ssm_client.get_parameter(TEMPLATES_PROGRESS_PARAMETER)
+            if str(progress.get("next_page")) != str(page):
+                raise ValueError(f"No templates load to continue at page {page}")
+            index = FingerprintIndex.from_state(
+                s3_writer.load_fingerprints("badges_templates")
+            )
+            run_date = datetime.date.fromisoformat(progress["partition_date"])
+            seen = FingerprintIndex.from_state(
+                s3_writer.load_fingerprints(
+                    "badges_templates", run_date, run_id=progress["templates_run"]
+                )
+            ).fingerprints
+            validators = (
+                s3_writer.load_state(
+                    "badges_templates",
+                    TEMPLATES_VALIDATORS_STATE,
+                    run_date,
+                    run_id=progress["templates_run"],
+                )
+                or {}
             )
 
-            if items:
-                all_templates.extend(items)
-
-            pages_processed += 1
-
-            if page_limit and pages_processed >= page_limit:
-                logger.info(f"Page limit of {page_limit} reached. Stopping fetch.")
-                break
-
-            if not next_page_url:
-                break
-
-            page_url = next_page_url
-
-        # Calculate hash of the current dataset
-        # We use ID and updated_at to detect changes
-        hash_payload = []
-        for t in all_templates:
-            hash_payload.append(f"{t.get('id')}-{t.get('updated_at')}")
-
-        hash_payload.sort()  # Ensure consistent order
-        current_hash = hashlib.sha256("".join(hash_payload).encode()).hexdigest()
-
-        # Check against stored hash
-        from src.clients.ssm_client import ssm_client
-
-        metadata = ssm_client.get_parameter("/credly/state/templates")
-        stored_hash = metadata.get("payload_hash")
+        partition_date = datetime.date.fromisoformat(progress["partition_date"])
+        count = int(progress.get("count", 0))
+        start_page = int(progress["next_page"])
+        snapshot = progress["load"] == "snapshot"
+        # A second delta of the day replaces the first: it rewrites its templates
+        carried = self._partition_delta(index, partition_date, "changed")
+
+        templates_buffer = BufferedParquetWriter(
+            s3_writer,
+            "badges_templates",
+            partition_date,
+            run_id=progress["templates_run"],
+        )
+        activities_buffer = BufferedParquetWriter(
+            s3_writer,
+            "badges_templates_activities",
+            partition_date,
+            run_id=progress["activities_run"],
+        )
+        if page is not None:
+            # Rows buffered but not yet written by the previous invocation
+            templates_buffer.restore()
+            activities_buffer.restore()
+
+        # Page N is archived, mapped and buffered in the background while the
+        # client fetches the next ones (concurrently, see iter_pages).
+        max_pending = settings.PIPELINE_MAX_PENDING_PAGES
+        records_written, pages = 0, 0
+        page_info = {}
+        all_pages = iter(
+            credly_client.iter_templates(
+                params,
+                page_limit=page_limit,
+                validators=validators,
+                start_page=start_page,
+                page_info=page_info,
+            )
+        )
+        with PipelineStage(self._buffer_page, max_pending=max_pending) as writer:
+            items = next(all_pages, None)
+            while items is not None:
+                selected = []
+                for item in items:
+                    key = f"{item.get('id')}-{item.get('updated_at')}"
+                    template_id = str(item.get("id", ""))
+                    count += 1
+                    seen[template_id] = FingerprintIndex.fingerprint(key)
+                    if (
+                        snapshot
+                        or index.fingerprints.get(template_id) != seen[template_id]
+                        or template_id in carried
+                    ):
+                        selected.append(item)
+                writer.submit((items, selected, templates_buffer, activities_buffer))
+                records_written += len(selected)
+                pages += 1
+
+                # Leave room for the pages still queued for writing
+                if time_budget and not time_budget.allows_another_page(
+                    reserved_pages=max_pending
+                ):
+                    break
+                items = next(all_pages, None)
+        if items is None:
+            finished = True
+        elif page_info.get("total_pages"):
+            # Stopped by the time budget: the listing says whether pages are
+            # left, without downloading the next one
+            finished = start_page + pages > int(page_info["total_pages"])
+        else:
+            finished = not page_info.get("next_page_url")
+
+        templates_buffer.close(final=finished)
+        activities_buffer.close(final=finished)
+
+        if not finished:
+            s3_writer.save_fingerprints(
+                "badges_templates",
+                FingerprintIndex(seen).to_state(),
+                partition_date,
+                run_id=progress["templates_run"],
+            )
+            s3_writer.save_state(
+                "badges_templates",
+                TEMPLATES_VALIDATORS_STATE,
+                validators,
+                partition_date,
+                run_id=progress["templates_run"],
+            )
+            progress.update(next_page=start_page + pages, count=count)
+            ssm_client.put_parameter(
+                TEMPLATES_PROGRESS_PARAMETER,
+                progress,
+                description="Templates load in progress",
+            )
+            return {
+                "records_processed": records_written,
+                "next_page": str(start_page + pages),
+            }
+
+        if page is not None:
+            # The load is over; a stale continuation must not resume it
+            ssm_client.put_parameter(
+                TEMPLATES_PROGRESS_PARAMETER,
+                {"next_page": None},
+                description="Templates load in progress",
+            )
 
-        if stored_hash == current_hash:
+        changed = index.changed(seen)
+        removed = index.removed(seen)
+        if not changed and not removed and not progress["snapshot_due"]:
             logger.info("No changes detected in templates. Skipping ingestion.")
+            s3_writer.discard_run(
+                "badges_templates", partition_date, progress["templates_run"]
+            )
+            s3_writer.discard_run(
+                "badges_templates_activities",
+                partition_date,
+                progress["activities_run"],
+            )
+            if validators:
+                s3_writer.save_state(
+                    "badges_templates", TEMPLATES_VALIDATORS_STATE, validators
+                )
+            state = {
+                **metadata,
+                "record_count": count,
+                "max_updated_at": progress.get("max_updated_at"),
+            }
+            # Validators used to live in the parameter; they are in S3 now.
+            # The payload hash is superseded by the fingerprint index.
+            state.pop("page_validators", None)
+            state.pop("payload_hash", None)
+            if state != metadata:
+                # Same data, fresh probe values: let the next run short-circuit
+                ssm_client.put_parameter(
+                    TEMPLATES_STATE_PARAMETER,
+                    state,
+                    description="State for Credly Templates",
+                )
             return {"records_processed": 0, "next_page": None}
 
+        if snapshot:
+            written, deleted = [], []
+        else:
+            written = sorted(set(changed) | (carried & seen.keys()))
+            deleted = sorted(
+                (self._partition_delta(index, partition_date, "deleted") - seen.keys())
+                | set(removed)
+            )
         logger.info(
-            f"Changes detected (Old: {stored_hash}, New: {current_hash}). Starting full load."
+            f"Committing templates {progress['load']}: {len(changed)} changed, "
+            f"{len(removed)} deleted of {len(seen)}"
         )
-
-        # Clear partitions
-        s3_writer.clear_partition("badges_templates", today)
-        s3_writer.clear_partition("badges_templates_activities", today)
-
-        # Process and write data
-        # Since we already have all_templates in memory, we can process them directly
-        # If memory is a concern for very large datasets, we might need to re-fetch or stream,
-        # but for templates (usually thousands, not millions), memory should be fine.
-
-        # Chunk processing to avoid huge parquet files
-        chunk_size = 1000
-        for i in range(0, len(all_templates), chunk_size):
-            chunk = all_templates[i : i + chunk_size]
-
-            mapped_templates = []
-            mapped_activities = []
-
-            for item in chunk:
-                mapped_templates.append(self._map_template(item))
-                mapped_activities.extend(self._extract_activities(item))
-
-            if mapped_templates:
-                s3_writer.write_parquet(
-                    "badges_templates", mapped_templates, today, part_number
-                )
-
-            if mapped_activities:
-                s3_writer.write_parquet(
-                    "badges_templates_activities", mapped_activities, today, part_number
-                )
-
-            part_number += 1
+        extra = {"load": progress["load"], "deleted_ids": deleted}
+        s3_writer.commit_run(
+            "badges_templates", partition_date, progress["templates_run"], extra
+        )
+        s3_writer.commit_run(
+            "badges_templates_activities",
+            partition_date,
+            progress["activities_run"],
+            extra,
+        )
+        # Only after the commits: if this fails the next load writes a superset
+        s3_writer.save_fingerprints(
+            "badges_templates",
+            FingerprintIndex(
+                seen,
+                snapshot_date=(
+                    partition_date.isoformat() if snapshot else index.snapshot_date
+                ),
+                partition={
+                    "date": partition_date.isoformat(),
+                    "load": progress["load"],
+                    "changed": written,
+                    "deleted": deleted,
+                },
+            ).to_state(),
+        )
+        s3_writer.save_state("badges_templates", TEMPLATES_VALIDATORS_STATE, validators)
 
         # Update metadata
-        from src.clients.ssm_client import ssm_client
-
         ssm_client.put_parameter(
-            "/credly/state/templates",
+            TEMPLATES_STATE_PARAMETER,
             {
-                "payload_hash": current_hash,
                 "last_updated_at": datetime.datetime.now().isoformat(),
-                "record_count": len(all_templates),
+                "record_count": count,
+                # As probed before the download: a later edit makes the next
+                # probe differ rather than go unnoticed
+                "max_updated_at": progress.get("max_updated_at"),
             },
-            description="State and Hash for Credly Templates",
+            description="State for Credly Templates",
         )
 
-        return {"records_processed": len(all_templates), "next_page": None}
-
-    def _map_template(self, item: Dict[str, Any]) -> Dict[str, str]:
-        owner = item.get("owner", {})
-        skills = item.get("skills", [])
-        # Skills can be a list of strings or objects depending on API version/response
-        skills_list = []
-        for s in skills:
-            if isinstance(s, dict):
-                skills_list.append(s.get("name", ""))
-            elif isinstance(s, str):
-                skills_list.append(s)
-            else:
-                skills_list.append(str(s))
-
-        skills_str = ";".join(skills_list) if skills_list else ""
+        return {"records_processed": records_written, "next_page": None}
 
+    def _probe_moved(self, probe: dict, metadata: dict) -> Optional[bool]:
+        """
+        Compares a probe_templates result with the stored state: True if the
+        template count or latest updated_at moved, False if neither did,
+        None when either side lacks a value.
+        """
+        stored = (metadata.get("record_count"), metadata.get("max_updated_at"))
+        probed = (probe.get("total_count"), probe.get("max_updated_at"))
+        if None in stored or None in probed:
+            return None
+        return probed != stored
+
+    def _load_kind(
+        self, mode: str, index: FingerprintIndex, today: datetime.date
+    ) -> tuple:
+        """
+        Returns: ("snapshot" | "delta", whether the load must be committed
+        even if nothing changed)
+        """
+        if index is None or mode == "historical" or not index.snapshot_date:
+            return "snapshot", True
+        if index.partition.get("date") == today.isoformat() and (
+            index.partition.get("load") == "snapshot"
+        ):
+            # A delta would replace today's snapshot
+            return "snapshot", False
+        age = (today - datetime.date.fromisoformat(index.snapshot_date)).days
+        if age >= settings.TEMPLATES_SNAPSHOT_INTERVAL_DAYS:
+            return "snapshot", True
+        return "delta", False
+
+    def _partition_delta(
+        self, index: FingerprintIndex, partition_date: datetime.date, field: str
+    ) -> set:
+        """Ids the committed delta of partition_date changed or deleted."""
+        partition = index.partition
+        if partition.get("date") != partition_date.isoformat():
+            return set()
+        if partition.get("load") != "delta":
+            return set()
+        return set(partition.get(field, []))
+
+    def _start_load(
+        self, partition_date: datetime.date, load: str, snapshot_due: bool
+    ) -> dict:
+        """New runs; the committed partitions stay readable until the commit."""
         return {
-            "badge_template_id": str(item.get("id", "")),
-            "primary_badge_template_id": str(item.get("primary_badge_template_id", "")),
-            "variant_name": item.get("variant_name", ""),
-            "name": item.get("name", ""),
-            "description": item.get("description", ""),
-            "state": item.get("state", ""),
-            "public": str(item.get("public", "")),
-            "badges_count": str(item.get("badges_count", "")),
-            "image_url": item.get("image_url", ""),
-            "url": item.get("url", ""),
-            "vanity_slug": item.get("vanity_slug", ""),
-            "variants_allowed": str(item.get("variants_allowed", "")),
-            "variant_type": item.get("variant_type", ""),
-            "level": item.get("level", ""),
-            "type_category": item.get("type_category", ""),
-            "skills": skills_str,
-            "reporting_tags": str(item.get("reporting_tags", "")),
-            "state_updated_at": item.get("state_updated_at", ""),
-            "created_at": item.get("created_at", ""),
-            "updated_at": item.get("updated_at", ""),
-            "organization_id": str(owner.get("id", "")),
-            "organization_name": owner.get("name", ""),
-            "organization_vanity_url": owner.get("vanity_url", ""),
+            "next_page": 1,
+            "partition_date": partition_date.isoformat(),
+            "load": load,
+            "snapshot_due": snapshot_due,
+            "templates_run": s3_writer.start_run("badges_templates", partition_date),
+            "activities_run": s3_writer.start_run(
+                "badges_templates_activities", partition_date
+            ),
+            "count": 0,
         }
 
-    def _extract_activities(self, item: dict[str, Any]) -> list[dict[str, str]]:
-        activities = item.get("badge_template_activities", [])
-        results = []
-        template_id = str(item.get("id", ""))
-
-        for act in activities:
-            results.append(
-                {
-                    "badge_template_id": template_id,
-                    "badge_template_activity_id": str(act.get("id", "")),
-                    "badge_template_activity_title": act.get("title", ""),
-                    "badge_template_activity_type": act.get("activity_type", ""),
-                    "badge_template_activity_url": act.get("url", ""),
-                }
+    def _buffer_page(self, page: tuple) -> None:
+        items, selected, templates_buffer, activities_buffer = page
+        if not items:
+            return
+
+        if settings.RAW_ARCHIVE_ENABLED:
+            # Every raw template is archived, so a replay rebuilds a snapshot
+            s3_writer.archive_page(
+                "badges_templates",
+                templates_buffer.partition_date,
+                templates_buffer.run_id,
+                items,
             )
-        return results
+        schema_version = settings.PARQUET_SCHEMA_VERSION
+        templates_buffer.add(TEMPLATE_MAPPING.record_batch(selected, schema_version))
+        activities_buffer.add(ACTIVITY_MAPPING.record_batch(selected, schema_version))
+
+    def _map_template(
+        self, item: Dict[str, Any], schema_version: int = 1
+    ) -> Dict[str, Any]:
+        return TEMPLATE_MAPPING.rows([item], schema_version)[0]
+
+    def _extract_activities(self, item: dict[str, Any]) -> list[dict[str, str]]:
+        return ACTIVITY_MAPPING.rows([item])
 
 
 credly_templates_service = CredlyTemplatesService()
@@ -0,0 +1,109 @@
+import datetime
+
+from src.config.settings import settings
+from src.services.credly_badges_service import BADGE_MAPPING
+from src.services.credly_templates_service import ACTIVITY_MAPPING, TEMPLATE_MAPPING
+from src.utils.logger import logger
+from src.utils.parquet_buffer import BufferedParquetWriter
+from src.utils.s3_writer import s3_writer
+
+# Archived source -> tables rebuilt from it
+REPLAY_TABLES = {
+    "badges_emitidas": ["badges_emitidas"],
+    "badges_templates": ["badges_templates", "badges_templates_activities"],
+}
+
+
+class ReplayService:
+    """
+    Rebuilds tables from the raw pages archived by the loads, with the
+    current mappers and schema version, without calling the Credly API.
+
+    A replay of one partition is split in three steps so the mapping can be
+    spread over processes, like the badge shards:
+        run_ids, pages = replay_service.plan(source, date)
+        replay_service.replay_pages(source, date, pages[i::n], run_ids, f"replay-{i}")
+        replay_service.commit(source, date, run_ids)
+    """
+
+    def plan(self, source: str, partition_date: datetime.date) -> tuple:
+        """
+        Opens a run per rebuilt table.
+
+        Returns: (run_ids by table, archived page keys); both empty when
+        nothing was archived
+        """
+        if source not in REPLAY_TABLES:
+            raise ValueError(f"No replay for {source}")
+
+        pages = s3_writer.archived_pages(source, partition_date)
+        if not pages:
+            return {}, []
+        run_ids = {
+            table: s3_writer.start_run(table, partition_date)
+            for table in REPLAY_TABLES[source]
+        }
+        logger.info(f"Replaying {len(pages)} pages of {source} {partition_date}")
+        return run_ids, pages
+
+    def replay_pages(
+        self,
+        source: str,
+        partition_date: datetime.date,
+        pages: list,
+        run_ids: dict,
+        writer_id: str = None,
+    ) -> int:
+        """
+        Maps archived pages into the runs opened by plan().
+
+        Returns: raw records replayed
+        """
+        buffers = {
+            table: BufferedParquetWriter(
+                s3_writer,
+                table,
+                partition_date,
+                writer_id=writer_id,
+                run_id=run_ids[table],
+            )
+            for table in REPLAY_TABLES[source]
+        }
+        schema_version = settings.PARQUET_SCHEMA_VERSION
+        records = 0
+        for key in pages:
+            items = s3_writer.read_archive_page(key)
+            records += len(items)
+            if source == "badges_emitidas":
+                buffers["badges_emitidas"].add(
+                    BADGE_MAPPING.record_batch(items, schema_version)
+                )
+                continue
+            buffers["badges_templates"].add(
+                TEMPLATE_MAPPING.record_batch(items, schema_version)
+            )
+            buffers["badges_templates_activities"].add(
+                ACTIVITY_MAPPING.record_batch(items, schema_version)
+            )
+        for buffer in buffers.values():
+            buffer.close()
+        return records
+
+    def commit(self, source: str, partition_date: datetime.date, run_ids: dict):
+        """Publishes the rebuilt tables."""
+        for table in REPLAY_TABLES[source]:
+            s3_writer.commit_run(table, partition_date, run_ids[table])
+
+    def replay(self, source: str, partition_date: datetime.date) -> dict:
+        """Rebuilds one partition in the current process."""
+        run_ids, pages = self.plan(source, partition_date)
+        if not pages:
+            logger.info(f"No archived pages for {source} {partition_date}")
+            return {"records_processed": 0, "pages": 0}
+
+        records = self.replay_pages(source, partition_date, pages, run_ids)
+        self.commit(source, partition_date, run_ids)
+        return {"records_processed": records, "pages": len(pages)}
+
+
+replay_service = ReplayService()
@@ -0,0 +1,41 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[R]:
+    """
+    Applies fn to every item on a thread pool and yields results in input order.
+    At most max_in_flight calls (default: 2 * max_workers) are pending at any
+    time, so results that are not consumed yet cannot pile up in memory.
+    """
+    max_workers = max(1, max_workers)
+    max_in_flight = max(max_workers, max_in_flight or max_workers * 2)
+
+    if max_workers == 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
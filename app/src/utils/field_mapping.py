@@ -0,0 +1,184 @@
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from src.utils.parquet_schemas import columns_to_record_batch, get_schema, type_row
+
+# Value kinds of a mapping field:
+#   None:    the API value as is
+#   "str":   str() of the value (ids, flags and counts were always strings)
+#   "names": a list of names (objects give their 'name'); joined by ';' for
+#            string columns, kept as a list for list columns
+#   "list":  str() of the list for string columns, the list itself (or [])
+#            for list columns
+KINDS = (None, "str", "names", "list")
+
+# Paths of an exploded mapping starting with this segment read the parent item
+PARENT = "parent"
+
+
+class FieldMapping:
+    """
+    Declarative mapping of API items to a table's columns, compiled once
+    (at import) into per-path resolvers and a per-column plan.
+
+    Fields are (column, path, kind, default): path is dotted and may go
+    through nested objects and list positions ("issuer.entities.0.name");
+    default replaces a missing key, and a missing object on the way makes
+    every field read from it default. With explode, each element of the
+    list at that path is a row, and paths read the element, or the item
+    with a "parent." prefix.
+
+    Pages are mapped column by column: every distinct object path is
+    resolved once per item, then each column is one pass over its objects.
+
+    Usage:
+        BADGES = FieldMapping("badges_emitidas", BADGE_FIELDS)
+        BADGES.record_batch(items, schema_version)  # Arrow, for Parquet
+        BADGES.rows(items, schema_version)          # dicts, as type_row gives
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        fields: Sequence[Tuple[str, str, str, Any]],
+        explode: str = None,
+    ):
+        self.table_name = table_name
+        self.columns = [column for column, _, _, _ in fields]
+        self._explode = _resolver(explode.split("."), list) if explode else None
+        self._resolvers: Dict[Tuple[str, ...], Callable] = {}
+        self._plan = []
+        for column, path, kind, default in fields:
+            if kind not in KINDS:
+                raise ValueError(f"Unknown kind {kind!r} of {table_name}.{column}")
+            *parent, key = path.split(".")
+            parent = tuple(parent)
+            if parent not in self._resolvers:
+                from_parent = bool(explode) and parent[:1] == (PARENT,)
+                self._resolvers[parent] = (
+                    from_parent,
+                    _resolver(parent[1:] if from_parent else parent, dict),
+                )
+            self._plan.append((column, parent, key, kind, default))
+
+    def record_batch(self, items: List[Dict[str, Any]], schema_version: int = None):
+        """Maps a page of items into a RecordBatch of the table's schema."""
+        import pyarrow as pa
+
+        schema = get_schema(self.table_name, schema_version)
+        list_columns = {field.name for field in schema if pa.types.is_list(field.type)}
+        columns, _ = self._columns(items, list_columns)
+        return columns_to_record_batch(self.table_name, columns, schema_version)
+
+    def rows(
+        self, items: List[Dict[str, Any]], schema_version: int = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Maps items into row dicts: strings as in schema version 1, typed by
+        type_row from version 2 on.
+        """
+        listed = {c for c, _, _, kind, _ in self._plan if kind in ("names", "list")}
+        columns, raw = self._columns(items, listed, keep_strings=True)
+        count = len(columns[self.columns[0]]) if self.columns else 0
+        return [
+            type_row(
+                self.table_name,
+                {column: columns[column][i] for column in self.columns},
+                schema_version,
+                # Lists keep their items whole in typed columns
+                **{column: values[i] for column, values in raw.items()},
+            )
+            for i in range(count)
+        ]
+
+    def _columns(
+        self, items: List[Dict[str, Any]], list_columns: set, keep_strings=False
+    ) -> tuple:
+        """
+        Returns: (values by column, list values by column). Columns in
+        list_columns hold their list values, or with keep_strings their
+        string form, the lists going to the second dict (type_row's raw
+        values).
+        """
+        if self._explode is None:
+            contexts, parents = items, items
+        else:
+            pairs = [
+                (element, item)
+                for item in items
+                for element in self._explode(item)
+                if isinstance(element, dict)
+            ]
+            contexts = [element for element, _ in pairs]
+            parents = [item for _, item in pairs]
+
+        objects = {
+            path: list(map(resolve, parents if from_parent else contexts))
+            for path, (from_parent, resolve) in self._resolvers.items()
+        }
+        columns, raw = {}, {}
+        for column, path, key, kind, default in self._plan:
+            values = [obj.get(key, default) for obj in objects[path]]
+            as_list = column in list_columns
+            if kind == "str":
+                columns[column] = list(map(str, values))
+            elif kind == "names":
+                names = [_names(value) for value in values]
+                if as_list and not keep_strings:
+                    columns[column] = names
+                else:
+                    columns[column] = [";".join(n) for n in names]
+                    if as_list:
+                        raw[column] = names
+            elif kind == "list":
+                lists = [value or [] for value in values]
+                if as_list and not keep_strings:
+                    columns[column] = lists
+                else:
+                    columns[column] = list(map(str, values))
+                    if as_list:
+                        raw[column] = lists
+            else:
+                columns[column] = values
+        return columns, raw
+
+
+def _resolver(segments: Sequence[str], expected: type) -> Callable:
+    """Function following segments from an item; expected() when missing."""
+    if not segments:
+        return lambda obj: obj
+    if len(segments) == 1:
+        # The common case: one nested object
+        (segment,) = segments
+
+        def resolve_one(obj):
+            value = obj.get(segment)
+            return value if isinstance(value, expected) else expected()
+
+        return resolve_one
+
+    def resolve(obj):
+        for segment in segments:
+            if isinstance(obj, dict):
+                obj = obj.get(segment)
+            elif isinstance(obj, list) and segment.isdigit():
+                index = int(segment)
+                obj = obj[index] if index < len(obj) else None
+            else:
+                return expected()
+        return obj if isinstance(obj, expected) else expected()
+
+    return resolve
+
+
+def _names(value: Any) -> List[str]:
+    """Names of a list of objects or strings (e.g. template skills)."""
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [
+        (
+            item.get("name", "")
+            if isinstance(item, dict)
+            else item if isinstance(item, str) else str(item)
+        )
+        for item in value
+    ]
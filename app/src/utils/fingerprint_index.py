@@ -0,0 +1,58 @@
+import hashlib
+from typing import Any, Dict, List, Optional
+
+
+class FingerprintIndex:
+    """
+    Short fingerprint of every record of the last committed load (id ->
+    hash), with the date of the last full snapshot and what that load wrote
+    into its partition. Comparing a new load against it tells which records
+    are new, changed or gone, so only those have to be written.
+
+    'partition' describes the committed partition of the last load:
+        {"date": "YYYY-MM-DD", "load": "snapshot" | "delta",
+         "changed": [ids written], "deleted": [ids removed]}
+    """
+
+    def __init__(
+        self,
+        fingerprints: Dict[str, str] = None,
+        snapshot_date: str = None,
+        partition: Dict[str, Any] = None,
+    ):
+        self.fingerprints = fingerprints or {}
+        self.snapshot_date = snapshot_date
+        self.partition = partition or {}
+
+    @staticmethod
+    def fingerprint(value: str) -> str:
+        # 64 bits keep the index small; collisions are negligible at this size
+        return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+    def changed(self, fingerprints: Dict[str, str]) -> List[str]:
+        """Ids of fingerprints that are new or differ from the index."""
+        return [
+            key
+            for key, value in fingerprints.items()
+            if self.fingerprints.get(key) != value
+        ]
+
+    def removed(self, fingerprints: Dict[str, str]) -> List[str]:
+        """Ids of the index missing from fingerprints."""
+        return [key for key in self.fingerprints if key not in fingerprints]
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "fingerprints": self.fingerprints,
+            "snapshot_date": self.snapshot_date,
+            "partition": self.partition,
+        }
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Any]]) -> "FingerprintIndex":
+        state = state or {}
+        return cls(
+            state.get("fingerprints"),
+            state.get("snapshot_date"),
+            state.get("partition"),
+        )
@@ -0,0 +1,38 @@
+import threading
+from typing import Any, Callable
+
+
+class LazyInstance:
+    """
+    Module-level singleton that is only built on first use.
+
+    Attribute access is forwarded to the wrapped object, which is created by
+    'factory' the first time it is needed. Importing a module that exposes
+    e.g. 's3_writer = LazyInstance(S3Writer)' therefore costs nothing, and
+    invocations that never touch S3 never build an S3 client.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _get_instance(self) -> Any:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, "_instance", self._factory())
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_instance(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._get_instance(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._get_instance(), name)
+
+    def __repr__(self) -> str:
+        state = "built" if self._instance is not None else "not built"
+        return f"<LazyInstance {getattr(self._factory, '__name__', '?')} ({state})>"
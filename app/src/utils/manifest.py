@@ -0,0 +1,70 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+# Columns whose min/max are kept per file and per partition in the manifest
+STATS_COLUMNS = ("updated_at", "issued_at", "badge_id")
+
+# What a partition holds when it is not a full snapshot (templates deltas):
+# "load" is "snapshot" or "delta" and "deleted_ids" lists the records a delta
+# removed. Manifests without them are snapshots. Compaction keeps them.
+LOAD_FIELDS = ("load", "deleted_ids")
+
+
+def batch_stats(record_batch: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    Min/max of the STATS_COLUMNS present in a RecordBatch. Nulls and empty
+    strings (what the mappers emit for missing values) are ignored.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    stats = {}
+    for name in STATS_COLUMNS:
+        if name not in record_batch.schema.names:
+            continue
+        column = record_batch.column(name)
+        if pa.types.is_string(column.type):
+            column = column.filter(pc.not_equal(column, ""))
+        min_max = pc.min_max(column)
+        low, high = min_max["min"].as_py(), min_max["max"].as_py()
+        if low is not None:
+            stats[name] = {"min": _json_value(low), "max": _json_value(high)}
+    return stats
+
+
+def merge_stats(
+    stats_list: Iterable[Optional[Dict[str, Dict[str, Any]]]],
+) -> Dict[str, Dict[str, Any]]:
+    """Combines per-batch or per-file min/max into one."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for stats in stats_list:
+        for name, values in (stats or {}).items():
+            if name not in merged:
+                merged[name] = dict(values)
+            else:
+                merged[name]["min"] = min(merged[name]["min"], values["min"])
+                merged[name]["max"] = max(merged[name]["max"], values["max"])
+    return merged
+
+
+def files_in_range(
+    manifest: Dict[str, Any], column: str, low: Any = None, high: Any = None
+) -> List[str]:
+    """
+    Keys of the manifest's files that may hold rows with low <= column <= high.
+    Files without statistics for the column are always kept.
+    """
+    keys = []
+    for entry in manifest.get("files", []):
+        stats = (entry.get("stats") or {}).get(column)
+        if stats is not None and (
+            (low is not None and stats["max"] < low)
+            or (high is not None and stats["min"] > high)
+        ):
+            continue
+        keys.append(entry["key"])
+    return keys
+
+
+def _json_value(value: Any) -> Any:
+    # Typed timestamp columns come back as datetimes
+    return value.isoformat() if hasattr(value, "isoformat") else value
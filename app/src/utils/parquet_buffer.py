@@ -0,0 +1,243 @@
+import datetime
+import os
+import tempfile
+from typing import Any, Dict, Iterator, List, Union
+
+from src.config.settings import settings
+from src.utils.logger import logger
+from src.utils.parquet_schemas import TABLE_COLUMNS, to_record_batch, writer_options
+
+
+class BufferedParquetWriter:
+    """
+    Gathers mapped rows across pages and invocations and emits one Parquet
+    file per PARQUET_TARGET_FILE_ROWS rows or PARQUET_TARGET_FILE_MB of data,
+    so a partition ends up with a few large files instead of one per page.
+
+    Pages are buffered as Arrow RecordBatches: batch mappers hand them over
+    directly and row dicts are converted on add, with the table's schema.
+    Batches are kept in memory up to PARQUET_BUFFER_MEMORY_MB and spilled
+    to PARQUET_SPILL_DIR (Arrow IPC) beyond that. When an invocation ends
+    mid-load, close(final=False) stores the rows it buffered as a pending
+    part in staging, and restore() in the next invocation counts the parts
+    towards the targets without downloading them: they are streamed once,
+    into the file that finally includes them. Files and pending parts
+    belong to run_id (see S3Writer.start_run).
+
+    Usage:
+        buffer = BufferedParquetWriter(s3_writer, table, today, run_id=run_id)
+        buffer.restore()
+        buffer.add(rows)
+        buffer.close(final=next_page is None)
+    """
+
+    def __init__(
+        self,
+        writer: Any,
+        table_name: str,
+        partition_date: datetime.date,
+        writer_id: str = None,
+        run_id: str = None,
+    ):
+        if table_name not in TABLE_COLUMNS:
+            raise ValueError(f"No Parquet schema for {table_name}")
+
+        self.writer = writer
+        self.table_name = table_name
+        self.partition_date = partition_date
+        self.writer_id = writer_id
+        self.run_id = run_id
+        self.files_written = 0
+        self._last_part_number = 0
+
+        self._target_rows = settings.PARQUET_TARGET_FILE_ROWS
+        self._target_bytes = settings.PARQUET_TARGET_FILE_MB * 1024 * 1024
+        self._memory_bytes = settings.PARQUET_BUFFER_MEMORY_MB * 1024 * 1024
+
+        self._batches: List[Any] = []
+        self._batches_bytes = 0
+        self._row_count = 0
+        self._total_bytes = 0
+        self._spill = None
+        self._spill_writer = None
+        # Parts left by previous invocations, still in staging
+        self._pending_parts: List[Dict[str, Any]] = []
+
+    @property
+    def pending_rows(self) -> int:
+        return self._row_count
+
+    def restore(self):
+        """Takes over the pending parts left by previous invocations."""
+        self._pending_parts = self.writer.pending_parts(
+            self.table_name, self.partition_date, self._pending_id, run_id=self.run_id
+        )
+        for part in self._pending_parts:
+            self._row_count += part["rows"]
+            self._total_bytes += part["bytes"]
+        if self._pending_parts:
+            logger.info(
+                f"Restored {self._row_count} pending rows for {self.table_name} "
+                f"({len(self._pending_parts)} parts)"
+            )
+
+    def add(self, rows: Union[List[Dict[str, Any]], Any]):
+        """
+        Buffers a page, as row dicts or as a RecordBatch of the table's
+        schema, emitting a file once a target is reached.
+        """
+        if not isinstance(rows, list):
+            batch = rows
+        elif rows:
+            batch = to_record_batch(self.table_name, rows)
+        else:
+            return
+        if not batch.num_rows:
+            return
+
+        size = batch.nbytes
+        self._batches.append(batch)
+        self._batches_bytes += size
+        self._row_count += batch.num_rows
+        self._total_bytes += size
+
+        if (
+            self._row_count >= self._target_rows
+            or self._total_bytes >= self._target_bytes
+        ):
+            self.flush()
+        elif self._batches_bytes >= self._memory_bytes:
+            self._spill_batches()
+
+    def flush(self):
+        """Writes every buffered row as one Parquet file."""
+        if not self._row_count:
+            return
+
+        # Files emitted within the same millisecond must not share a key
+        part_number = max(
+            int(datetime.datetime.now().timestamp() * 1000),
+            self._last_part_number + 1,
+        )
+        self._last_part_number = part_number
+        options = {"run_id": self.run_id}
+        if self.writer_id:
+            options["shard_id"] = self.writer_id
+        self.writer.write_parquet_batches(
+            self.table_name,
+            self._iter_row_groups(),
+            self.partition_date,
+            part_number,
+            **options,
+        )
+        self.files_written += 1
+
+        if self._pending_parts:
+            # Restored rows are now in a file; a retry must not restore them again
+            self.writer.delete_pending(
+                self.table_name,
+                self.partition_date,
+                self._pending_id,
+                run_id=self.run_id,
+            )
+            self._pending_parts = []
+        self._reset()
+
+    def close(self, final: bool = True):
+        """
+        Emits the remaining rows when the load is complete, otherwise stores
+        the rows buffered by this invocation for the next one.
+        """
+        try:
+            if final:
+                self.flush()
+            elif self._row_count:
+                restored = sum(part["rows"] for part in self._pending_parts)
+                if self._row_count > restored:
+                    self.writer.save_pending(
+                        self.table_name,
+                        self.partition_date,
+                        self._pending_id,
+                        self._iter_local(),
+                        self._row_count - restored,
+                        self._total_bytes
+                        - sum(part["bytes"] for part in self._pending_parts),
+                        run_id=self.run_id,
+                    )
+                logger.info(
+                    f"Carrying {self._row_count} pending rows of {self.table_name} "
+                    "to the next invocation"
+                )
+        finally:
+            self._pending_parts = []
+            self._reset()
+
+    @property
+    def _pending_id(self) -> str:
+        return self.writer_id or "default"
+
+    def _spill_batches(self):
+        import pyarrow as pa
+
+        if self._spill is None:
+            fd, self._spill = tempfile.mkstemp(dir=settings.PARQUET_SPILL_DIR)
+            os.close(fd)
+            self._spill_writer = pa.ipc.new_stream(
+                pa.OSFile(self._spill, "wb"), self._batches[0].schema
+            )
+        for batch in self._batches:
+            self._spill_writer.write_batch(batch)
+        self._batches = []
+        self._batches_bytes = 0
+
+    def _iter_buffered(self) -> Iterator[Any]:
+        """
+        Yields buffered batches in insertion order: restored parts, spilled
+        batches, then the ones in memory.
+        """
+        for part in self._pending_parts:
+            yield from self.writer.iter_pending_part(part["key"])
+        yield from self._iter_local()
+
+    def _iter_local(self) -> Iterator[Any]:
+        """Batches buffered by this invocation, spilled ones first."""
+        import pyarrow as pa
+
+        if self._spill is not None:
+            self._spill_writer.close()
+            self._spill_writer = None
+            # Read into memory: batches may outlive the file handle
+            with pa.OSFile(self._spill, "rb") as source:
+                yield from pa.ipc.open_stream(source)
+        yield from self._batches
+
+    def _iter_row_groups(self) -> Iterator[Any]:
+        """Buffered batches regrouped into batches of PARQUET_ROW_GROUP_ROWS."""
+        import pyarrow as pa
+
+        group_rows = writer_options(self.table_name)["row_group_rows"]
+        group, rows = [], 0
+        for batch in self._iter_buffered():
+            group.append(batch)
+            rows += batch.num_rows
+            if rows < group_rows:
+                continue
+            table = pa.Table.from_batches(group).combine_chunks()
+            full = rows - rows % group_rows
+            yield from table.slice(0, full).to_batches(max_chunksize=group_rows)
+            group = table.slice(full).to_batches()
+            rows -= full
+        if rows:
+            yield from pa.Table.from_batches(group).combine_chunks().to_batches()
+
+    def _reset(self):
+        if self._spill_writer is not None:
+            self._spill_writer.close()
+            self._spill_writer = None
+        if self._spill is not None:
+            os.remove(self._spill)
+            self._spill = None
+        self._batches = []
+        self._batches_bytes = 0
+        self._row_count = 0
+        self._total_bytes = 0
@@ -0,0 +1,356 @@
+import ast
+import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from src.config.settings import settings
+
+# Schema versions (PARQUET_SCHEMA_VERSION, stored in each file's metadata):
+#   1: every column is a string, as mapped since the first release
+#   2: timestamps, booleans, integers and string lists get real types
+SCHEMA_VERSIONS = (1, 2)
+
+# Columns of each table, in file order, as (name, dictionary, kind).
+# Columns flagged True hold few distinct values (states, locales,
+# organizations, templates) and are dictionary encoded; high-cardinality ones
+# (ids, names, e-mails, timestamps) are not, which spares the writer a
+# dictionary it would abandon anyway. 'kind' is the column's type from
+# version 2 on (None: string). Credly ids are UUIDs, so they stay strings.
+TABLE_COLUMNS: Dict[str, List[tuple]] = {
+    "badges_emitidas": [
+        ("badge_id", False, None),
+        ("issued_to", False, None),
+        ("issued_to_first_name", False, None),
+        ("issued_to_middle_name", False, None),
+        ("issued_to_last_name", False, None),
+        ("user_id", False, None),
+        ("recipient_email", False, None),
+        ("badge_template_id", True, None),
+        ("badge_template_name", True, None),
+        ("image_url", True, None),
+        ("locale", True, None),
+        ("public", True, "bool"),
+        ("state", True, None),
+        ("issued_at", False, "timestamp"),
+        ("expires_at", False, "timestamp"),
+        ("created_at", False, "timestamp"),
+        ("updated_at", False, "timestamp"),
+        ("state_updated_at", False, "timestamp"),
+        ("organization_id", True, None),
+        ("organization_name", True, None),
+    ],
+    "badges_templates": [
+        ("badge_template_id", False, None),
+        ("primary_badge_template_id", False, None),
+        ("variant_name", False, None),
+        ("name", False, None),
+        ("description", False, None),
+        ("state", True, None),
+        ("public", True, "bool"),
+        ("badges_count", False, "int"),
+        ("image_url", False, None),
+        ("url", False, None),
+        ("vanity_slug", False, None),
+        ("variants_allowed", True, "bool"),
+        ("variant_type", True, None),
+        ("level", True, None),
+        ("type_category", True, None),
+        ("skills", False, "list"),
+        ("reporting_tags", False, "list"),
+        ("state_updated_at", False, "timestamp"),
+        ("created_at", False, "timestamp"),
+        ("updated_at", False, "timestamp"),
+        ("organization_id", True, None),
+        ("organization_name", True, None),
+        ("organization_vanity_url", True, None),
+    ],
+    "badges_templates_activities": [
+        ("badge_template_id", True, None),
+        ("badge_template_activity_id", False, None),
+        ("badge_template_activity_title", False, None),
+        ("badge_template_activity_type", True, None),
+        ("badge_template_activity_url", False, None),
+    ],
+}
+
+
+def get_schema(table_name: str, version: int = None):
+    """
+    Returns the Arrow schema of a table for a schema version (default
+    PARQUET_SCHEMA_VERSION), or None for unknown tables.
+    """
+    if table_name not in TABLE_COLUMNS:
+        return None
+    return _schema(table_name, _version(version))
+
+
+@lru_cache(maxsize=None)
+def _schema(table_name: str, version: int):
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field(name, _arrow_type(kind if version >= 2 else None))
+            for name, _, kind in TABLE_COLUMNS[table_name]
+        ],
+        metadata={"schema_version": str(version)},
+    )
+
+
+def dictionary_columns(table_name: str, version: int = None) -> Optional[List[str]]:
+    """Columns to dictionary encode, or None for unknown tables."""
+    if table_name not in TABLE_COLUMNS:
+        return None
+    version = _version(version)
+    return [
+        name
+        for name, dictionary, kind in TABLE_COLUMNS[table_name]
+        # Only string columns; typed columns are encoded by type
+        if dictionary and (kind is None or version < 2)
+    ]
+
+
+def writer_options(table_name: str, version: int = None) -> Dict[str, Any]:
+    """
+    Parquet writer options of a table: the PARQUET_* settings, each
+    overridable per table (see Settings.table_override).
+
+    Returns:
+        dict with compression, compression_level, data_page_size (bytes),
+        use_dictionary, write_statistics and row_group_rows.
+    """
+
+    def option(name: str, parse):
+        value = settings.table_override(name, table_name)
+        return getattr(settings, name) if value is None else parse(value)
+
+    compression = option("PARQUET_COMPRESSION", str.lower)
+    statistics = option("PARQUET_WRITE_STATISTICS", str)
+    if option("PARQUET_DICTIONARY", lambda value: value.lower() == "true"):
+        use_dictionary = dictionary_columns(table_name, version)
+        if use_dictionary is None:
+            use_dictionary = True
+    else:
+        use_dictionary = False
+
+    return {
+        "compression": None if compression == "none" else compression,
+        "compression_level": option(
+            "PARQUET_COMPRESSION_LEVEL", lambda value: int(value) if value else None
+        ),
+        "data_page_size": option("PARQUET_DATA_PAGE_SIZE_KB", int) * 1024,
+        "use_dictionary": use_dictionary,
+        "write_statistics": _statistics_option(statistics),
+        "row_group_rows": option("PARQUET_ROW_GROUP_ROWS", int),
+    }
+
+
+def _statistics_option(value: str):
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def schema_version_of(schema: Any) -> int:
+    """Schema version stored in a file's Arrow schema (1 for older files)."""
+    metadata = schema.metadata or {}
+    return int(metadata.get(b"schema_version", b"1"))
+
+
+def to_record_batch(table_name: str, rows: List[Dict[str, Any]], version: int = None):
+    """
+    Builds a RecordBatch straight from mapped rows, one column at a time,
+    with the table's explicit schema (no type inference, no DataFrame).
+    """
+    schema = get_schema(table_name, version)
+    return columns_to_record_batch(
+        table_name,
+        {field.name: [row.get(field.name) for row in rows] for field in schema},
+        version,
+    )
+
+
+def columns_to_record_batch(
+    table_name: str, columns: Dict[str, List[Any]], version: int = None
+):
+    """
+    Builds a RecordBatch from value lists keyed by column, as produced by
+    the batch mappers; values are the version 1 (string) or raw values and
+    are converted to each column's type. Missing columns are nulls.
+    """
+    import pyarrow as pa
+
+    schema = get_schema(table_name, version)
+    num_rows = len(next(iter(columns.values()), []))
+    arrays = [
+        (
+            _to_array(columns[field.name], field.type)
+            if field.name in columns
+            else pa.nulls(num_rows, field.type)
+        )
+        for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def conform_table(
+    table: Any, table_name: str, version: int = None, columns: List[str] = None
+):
+    """
+    Casts a table read back from Parquet (any schema version) to a table's
+    schema, or to its fields in columns: missing columns become nulls and
+    values are converted the same way the mappers convert API values.
+    """
+    import pyarrow as pa
+
+    schema = get_schema(table_name, version)
+    if columns is not None:
+        schema = pa.schema([schema.field(name) for name in columns])
+    arrays = []
+    for field in schema:
+        if field.name not in table.column_names:
+            arrays.append(pa.nulls(table.num_rows, field.type))
+            continue
+        column = table.column(field.name)
+        if column.type != field.type:
+            column = _to_array(column.to_pylist(), field.type)
+        arrays.append(column)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def type_row(
+    table_name: str, row: Dict[str, Any], version: int = None, **raw: Any
+) -> Dict[str, Any]:
+    """
+    Converts the typed columns of a mapped row for schema version 2 and
+    later; version 1 rows are returned unchanged. Columns whose string form
+    is lossy (e.g. skills joined by ';') take their raw API value from raw.
+    """
+    if _version(version) < 2:
+        return row
+    for name, _, kind in TABLE_COLUMNS[table_name]:
+        if kind is not None and name in row:
+            row[name] = _CONVERTERS[kind](raw.get(name, row[name]))
+    return row
+
+
+# Value converters used by the mappers (schema version 2) and conform_table.
+# They accept raw API values as well as the strings of schema version 1.
+
+
+def to_bool(value: Any) -> Optional[bool]:
+    if isinstance(value, bool) or value is None:
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1"):
+        return True
+    if text in ("false", "0"):
+        return False
+    return None
+
+
+def to_int(value: Any) -> Optional[int]:
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_timestamp(value: Any) -> Optional[datetime.datetime]:
+    """Parses ISO 8601 timestamps; values without an offset are UTC."""
+    if value is None or value == "":
+        return None
+    if not isinstance(value, datetime.datetime):
+        try:
+            value = datetime.datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def to_list(value: Any) -> Optional[List[str]]:
+    """Lists stay lists; version 1 strings ("a;b" or "['a', 'b']") are split."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if not value:
+            return []
+        if value.startswith("["):
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                return [value]
+        else:
+            return value.split(";")
+    if not isinstance(value, (list, tuple)):
+        return [str(value)]
+    return [
+        item.get("name", "") if isinstance(item, dict) else str(item) for item in value
+    ]
+
+
+_CONVERTERS = {
+    "bool": to_bool,
+    "int": to_int,
+    "timestamp": to_timestamp,
+    "list": to_list,
+}
+
+
+def _version(version: Optional[int]) -> int:
+    version = version or settings.PARQUET_SCHEMA_VERSION
+    if version not in SCHEMA_VERSIONS:
+        raise ValueError(f"Unknown Parquet schema version: {version}")
+    return version
+
+
+def _arrow_type(kind: Optional[str]):
+    import pyarrow as pa
+
+    return {
+        None: pa.string(),
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "list": pa.list_(pa.string()),
+    }[kind]
+
+
+def _kind_of(type_) -> Optional[str]:
+    import pyarrow as pa
+
+    if pa.types.is_boolean(type_):
+        return "bool"
+    if pa.types.is_integer(type_):
+        return "int"
+    if pa.types.is_timestamp(type_):
+        return "timestamp"
+    if pa.types.is_list(type_):
+        return "list"
+    return None
+
+
+def _to_array(values: List[Any], type_):
+    import pyarrow as pa
+
+    kind = _kind_of(type_)
+    if kind is not None:
+        # Always convert: Arrow would read a string as a list of characters
+        return pa.array([_CONVERTERS[kind](value) for value in values], type=type_)
+    try:
+        return pa.array(values, type=type_)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # A mapper passed a raw non-string value through; store its text
+        return pa.array([_to_text(value) for value in values], type=type_)
+
+
+def _to_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return str(value)
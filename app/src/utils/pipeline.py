@@ -0,0 +1,81 @@
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+from src.utils.logger import logger
+
+_STOP = object()
+
+
+class PipelineStage:
+    """
+    Runs a consumer function on a background thread fed by a bounded queue.
+
+    The caller keeps producing (e.g. fetching the next page) while the stage
+    consumes the previous item (e.g. mapping and writing it). submit() blocks
+    once max_pending items are queued, which caps memory to a few pages.
+    A failure in the consumer is re-raised in the caller on the next submit()
+    or on close().
+
+    Usage:
+        with PipelineStage(write_page, max_pending=2) as stage:
+            for page in pages:
+                stage.submit(page)
+    """
+
+    def __init__(self, consumer: Callable[[Any], None], max_pending: int = 2):
+        self._consumer = consumer
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any):
+        """Queues an item, waiting while the queue is full."""
+        while True:
+            self._raise_if_failed()
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        """Waits until every queued item is consumed."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._raise_if_failed()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if self._error is not None:
+                # Drain without consuming so a blocked producer can notice
+                continue
+            try:
+                self._consumer(item)
+            except BaseException as e:
+                logger.error(f"Pipeline stage failed: {str(e)}")
+                self._error = e
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "PipelineStage":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return False
+
+        # The producer already failed: stop the stage but keep its exception
+        try:
+            self.close()
+        except BaseException:
+            pass
+        return False
@@ -0,0 +1,169 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+from src.config.settings import settings
+from src.utils.logger import logger
+
+# S3 rejects multipart parts smaller than this (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class S3MultipartSink:
+    """
+    Write-only file object that streams into an S3 multipart upload.
+
+    Bytes are gathered into parts of S3_MULTIPART_PART_MB; each full part is
+    uploaded in the background while the caller keeps writing, with at most
+    S3_MULTIPART_MAX_PENDING_PARTS parts waiting, so memory stays bounded no
+    matter how large the object gets. Objects smaller than one part are sent
+    with a single put_object. Nothing is visible in S3 until close(); abort()
+    discards the upload.
+
+    Usage:
+        with S3MultipartSink(client, bucket, key) as sink:
+            pq.ParquetWriter(sink, schema) ...
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        key: str,
+        content_type: str = "application/octet-stream",
+        part_size: int = None,
+        max_pending_parts: int = None,
+    ):
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._content_type = content_type
+        self._part_size = max(
+            part_size or settings.S3_MULTIPART_PART_MB * 1024 * 1024, MIN_PART_SIZE
+        )
+        max_pending_parts = max_pending_parts or settings.S3_MULTIPART_MAX_PENDING_PARTS
+
+        self._buffer = bytearray()
+        self._position = 0
+        self._upload_id = None
+        self._parts: List[Any] = []
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max(1, max_pending_parts))
+        self._max_workers = max(1, max_pending_parts)
+        self.closed = False
+
+    # File object protocol
+    def writable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return False
+
+    def seekable(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed S3MultipartSink")
+        self._buffer += data
+        self._position += len(data)
+        if len(self._buffer) >= self._part_size:
+            self._upload_buffer()
+        return len(data)
+
+    def close(self):
+        """Uploads what is left and completes the upload."""
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                self._client.put_object(
+                    Bucket=self._bucket,
+                    Key=self._key,
+                    Body=bytes(self._buffer),
+                    ContentType=self._content_type,
+                )
+            else:
+                if self._buffer:
+                    self._upload_buffer()
+                parts = [future.result() for future in self._parts]
+                self._client.complete_multipart_upload(
+                    Bucket=self._bucket,
+                    Key=self._key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._shutdown()
+
+    def abort(self):
+        """Discards everything written so far."""
+        if self._upload_id is not None:
+            # Let in-flight parts finish so none is left orphaned
+            for future in self._parts:
+                future.exception()
+            try:
+                self._client.abort_multipart_upload(
+                    Bucket=self._bucket, Key=self._key, UploadId=self._upload_id
+                )
+            except Exception as e:
+                logger.error(f"Failed to abort upload of {self._key}: {str(e)}")
+            self._upload_id = None
+        self._shutdown()
+
+    def _upload_buffer(self):
+        if self._upload_id is None:
+            response = self._client.create_multipart_upload(
+                Bucket=self._bucket, Key=self._key, ContentType=self._content_type
+            )
+            self._upload_id = response["UploadId"]
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+
+        # Surface a failed part before producing more data
+        for future in self._parts:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+        body, self._buffer = bytes(self._buffer), bytearray()
+        part_number = len(self._parts) + 1
+        self._slots.acquire()
+        self._parts.append(self._executor.submit(self._upload_part, part_number, body))
+
+    def _upload_part(self, part_number: int, body: bytes) -> dict:
+        try:
+            response = self._client.upload_part(
+                Bucket=self._bucket,
+                Key=self._key,
+                UploadId=self._upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+        finally:
+            self._slots.release()
+
+    def _shutdown(self):
+        self.closed = True
+        self._buffer = bytearray()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self) -> "S3MultipartSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
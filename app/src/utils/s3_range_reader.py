@@ -0,0 +1,76 @@
+import io
+from typing import Any
+
+
+class S3RangeReader:
+    """
+    Read-only, seekable file object over an S3 object.
+
+    Every read is a ranged GET, so a reader that seeks (e.g. pq.ParquetFile)
+    only downloads the parts it decodes, such as the footer and the column
+    chunks of one row group, instead of the whole object. The size is taken
+    from the caller (a listing or manifest) or asked with head_object.
+
+    Usage:
+        reader = S3RangeReader(client, bucket, key)
+        pq.ParquetFile(reader).read_row_group(0, columns=["badge_id"])
+    """
+
+    def __init__(self, client: Any, bucket: str, key: str, size: int = None):
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        if size is None:
+            size = client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        self._size = size
+        self._position = 0
+        self.closed = False
+
+    # File object protocol
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return False
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._position = offset
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if self.closed:
+            raise ValueError("read from closed S3RangeReader")
+        end = self._size if size is None or size < 0 else self._position + size
+        end = min(end, self._size)
+        if end <= self._position:
+            return b""
+        response = self._client.get_object(
+            Bucket=self._bucket,
+            Key=self._key,
+            Range=f"bytes={self._position}-{end - 1}",
+        )
+        data = response["Body"].read()
+        self._position += len(data)
+        return data
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self) -> "S3RangeReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -1,59 +1,255 @@
 import datetime
 import json
-import os
-from typing import Any, Dict, List
-
-import boto3
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
+from src.clients.object_stores import get_object_store
 from src.config.settings import settings
+from src.utils.concurrency import bounded_map
+from src.utils.lazy import LazyInstance
 from src.utils.logger import logger
+from src.utils.manifest import batch_stats, merge_stats
+from src.utils.parquet_schemas import (
+    get_schema,
+    schema_version_of,
+    to_record_batch,
+    writer_options,
+)
+from src.utils.s3_multipart import S3MultipartSink
+from src.utils.s3_range_reader import S3RangeReader
 
 
 class S3Writer:
+    """
+    Writes table partitions to S3 with a run/manifest commit protocol.
+
+    A load opens a run with start_run and writes its files outside the
+    table, under staging/{table}/anomesdia=YYYYMMDD/run={run_id}/files/.
+    commit_run copies them into the partition as {run_id}-part-*.parquet,
+    writes the partition's _manifest.json, then removes the files of older
+    runs (and legacy files) before returning. Readers that follow the
+    manifest never see an empty or half-written partition; readers that
+    list the partition (Athena, Glue, Spark) only see plain files, with
+    both runs present for the duration of a commit. One load writes a given
+    partition at a time.
+
+    Loads also archive the raw API pages of a run under
+    archive/{table}/anomesdia=YYYYMMDD/run={run_id}/ (see archive_page).
+    Committing a run that archived pages points the partition's
+    _archive.json at it, and older archived runs are removed with the rest,
+    so the archive always matches the data last loaded from the API.
+
+    The bucket is S3 by default; OUTPUT_SINK=local or memory keeps the same
+    layout on disk or in memory (see clients.object_stores).
+    """
+
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(S3Writer, cls).__new__(cls)
-            cls._instance._client = boto3.client(
-                "s3",
-                region_name=settings.AWS_REGION,
-                endpoint_url=settings.LOCALSTACK_ENDPOINT,
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test"),
-            )
+            cls._instance._setup(get_object_store())
         return cls._instance
 
-    def clear_partition(self, table_name: str, partition_date: datetime.date):
+    def _setup(self, client: Any):
+        self._client = client
+
+    def start_run(self, table_name: str, partition_date: datetime.date) -> str:
         """
-        Deletes all objects in the partition to ensure overwrite.
+        Opens a new run for the partition and returns its id. The committed
+        data keeps being served until the run is committed.
         """
+        run_id = f"{datetime.datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self._put_json(
+            self._run_marker_key(table_name, partition_date),
+            {"run_id": run_id, "started_at": datetime.datetime.now().isoformat()},
+        )
+        logger.info(f"Started run {run_id} for {table_name} {partition_date}")
+        return run_id
+
+    def current_run(self, table_name: str, partition_date: datetime.date) -> str:
+        """
+        Returns the partition's open run. Raises ValueError if there is none:
+        starting one would silently drop what the load wrote so far.
+        """
+        marker = self._get_json(self._run_marker_key(table_name, partition_date))
+        if not marker:
+            raise ValueError(f"No open run for {table_name} {partition_date}")
+        return marker["run_id"]
+
+    def commit_run(
+        self,
+        table_name: str,
+        partition_date: datetime.date,
+        run_id: str,
+        extra: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Publishes a run: copies its staged files into the partition, writes
+        the partition manifest, then removes older runs. Committing the same
+        run again (e.g. two shards finishing together) is harmless.
+
+        The manifest lists every file with its size, row count and min/max of
+        the manifest.STATS_COLUMNS, gathered from the stats each write left
+        in staging, plus the totals for the partition. Fields in extra (e.g.
+        manifest.LOAD_FIELDS) are added as they are.
+        """
+        committed = self.read_manifest(table_name, partition_date)
+        if committed is not None and committed.get("run_id") == run_id:
+            logger.info(f"Run {run_id} of {table_name} {partition_date} is committed")
+            return committed
+
+        run_prefix = self._run_prefix(table_name, partition_date, run_id)
+        stats_prefix = self._stats_prefix(table_name, partition_date, run_id)
+        sidecars = {
+            key[len(stats_prefix) : -len(".json")]: key
+            for key in (o["Key"] for o in self._list_objects(stats_prefix))
+        }
+        objects = [
+            obj
+            for obj in self._list_objects(run_prefix)
+            if obj["Key"].endswith(".parquet")
+        ]
+
+        def publish(obj):
+            name = obj["Key"][len(run_prefix) :]
+            # Server-side copy: the bytes never pass through the function
+            self._client.copy_object(
+                Bucket=settings.S3_BUCKET_NAME,
+                Key=self._published_key(table_name, partition_date, run_id, name),
+                CopySource={"Bucket": settings.S3_BUCKET_NAME, "Key": obj["Key"]},
+            )
+            return self._get_json(sidecars[name]) if name in sidecars else None
+
+        # Copies and sidecars are independent; run several at a time
+        file_stats = list(bounded_map(publish, objects, settings.S3_MAX_CONCURRENCY))
+
+        committed = self.read_manifest(table_name, partition_date)
+        if committed is not None and committed.get("run_id") == run_id:
+            # Another commit of the run won the race and is cleaning up
+            return committed
+
+        files = []
+        for obj, stats in zip(objects, file_stats):
+            stats = stats or {}
+            name = obj["Key"][len(run_prefix) :]
+            files.append(
+                {
+                    "key": self._published_key(
+                        table_name, partition_date, run_id, name
+                    ),
+                    "size": obj["Size"],
+                    "rows": stats.get("rows"),
+                    "stats": stats.get("stats", {}),
+                    "schema_version": stats.get("schema_version"),
+                }
+            )
+
+        row_counts = [f["rows"] for f in files]
+        versions = {f["schema_version"] for f in files}
+        manifest = {
+            "table": table_name,
+            "partition": f"anomesdia={partition_date.strftime('%Y%m%d')}",
+            "run_id": run_id,
+            "committed_at": datetime.datetime.now().isoformat(),
+            "record_count": (
+                sum(row_counts) if all(r is not None for r in row_counts) else None
+            ),
+            "bytes": sum(f["size"] for f in files),
+            "stats": merge_stats(f["stats"] for f in files),
+            # None when the run mixes versions (or predates versioning)
+            "schema_version": (versions.pop() if len(versions) == 1 else None),
+            "files": files,
+            **(extra or {}),
+        }
+        self._put_json(self._manifest_key(table_name, partition_date), manifest)
+        archive_prefix = self._archive_run_prefix(table_name, partition_date, run_id)
+        if next(self._list_objects(archive_prefix), None) is not None:
+            self._put_json(
+                self._archive_marker_key(table_name, partition_date),
+                {"run_id": run_id, "committed_at": manifest["committed_at"]},
+            )
+        logger.info(
+            f"Committed run {run_id} of {table_name} {partition_date} "
+            f"({len(files)} files)"
+        )
+
+        # Before returning: a Lambda is frozen as soon as the handler returns,
+        # so work left on background threads may never finish
+        self._cleanup_partition(table_name, partition_date, run_id)
+        return manifest
+
+    def discard_run(self, table_name: str, partition_date: datetime.date, run_id: str):
+        """
+        Drops a run that will not be committed (its files, staging objects and
+        archived pages). The committed data of the partition is untouched.
+        """
+        marker_key = self._run_marker_key(table_name, partition_date)
+        keys = [
+            obj["Key"]
+            for prefix in (
+                self._staging_run_prefix(table_name, partition_date, run_id),
+                self._archive_run_prefix(table_name, partition_date, run_id),
+            )
+            for obj in self._list_objects(prefix)
+        ]
+        marker = self._get_json(marker_key)
+        if marker and marker.get("run_id") == run_id:
+            keys.append(marker_key)
+        if keys:
+            self._delete_keys(keys)
+        logger.info(f"Discarded run {run_id} of {table_name} {partition_date}")
+
+    def committed_files(
+        self, table_name: str, partition_date: datetime.date
+    ) -> List[str]:
+        """
+        Keys of the partition's committed Parquet files: the manifest's, or
+        for partitions written before runs existed, the files listed at the
+        partition root.
+        """
+        return [
+            entry["key"] for entry in self.committed_objects(table_name, partition_date)
+        ]
+
+    def committed_objects(
+        self, table_name: str, partition_date: datetime.date
+    ) -> List[Dict[str, Any]]:
+        """
+        The partition's committed Parquet files, as committed_files.
+
+        Returns: [{"key": str, "size": int | None}]
+        """
+        manifest = self.read_manifest(table_name, partition_date)
+        if manifest is not None:
+            return [
+                {"key": entry["key"], "size": entry.get("size")}
+                for entry in manifest["files"]
+            ]
+
         anomesdia = partition_date.strftime("%Y%m%d")
-        prefix = f"raw/{table_name}/anomesdia={anomesdia}/"
+        return [
+            {"key": obj["Key"], "size": obj["Size"]}
+            for obj in self._list_objects(f"raw/{table_name}/anomesdia={anomesdia}/")
+            if obj["Key"].endswith(".parquet") and "/run=" not in obj["Key"]
+        ]
 
-        try:
-            # List objects
-            paginator = self._client.get_paginator("list_objects_v2")
-            pages = paginator.paginate(Bucket=settings.S3_BUCKET_NAME, Prefix=prefix)
-
-            objects_to_delete = []
-            for page in pages:
-                if "Contents" in page:
-                    for obj in page["Contents"]:
-                        objects_to_delete.append({"Key": obj["Key"]})
-
-            if objects_to_delete:
-                logger.info(f"Clearing {len(objects_to_delete)} objects from {prefix}")
-                # Delete in batches of 1000 (S3 limit)
-                for i in range(0, len(objects_to_delete), 1000):
-                    batch = objects_to_delete[i : i + 1000]
-                    self._client.delete_objects(
-                        Bucket=settings.S3_BUCKET_NAME,
-                        Delete={"Objects": batch, "Quiet": True},
-                    )
-        except Exception as e:
-            logger.error(f"Failed to clear partition {prefix}: {str(e)}")
-            # Don't raise, just log. Overwrite might fail or result in duplicates if this fails.
+    def open_parquet(self, key: str, size: int = None):
+        """
+        Opens one Parquet file of the bucket without downloading it: the
+        footer, then the row groups and columns read, are fetched with
+        ranged reads (see S3RangeReader). size saves a head_object.
+        """
+        import pyarrow.parquet as pq
+
+        reader = S3RangeReader(self._client, settings.S3_BUCKET_NAME, key, size)
+        return pq.ParquetFile(reader, pre_buffer=True)
+
+    def read_manifest(
+        self, table_name: str, partition_date: datetime.date
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the partition's committed manifest, if any."""
+        return self._get_json(self._manifest_key(table_name, partition_date))
 
     def write_parquet(
         self,
@@ -61,40 +257,630 @@ class S3Writer:
         data: List[Dict[str, Any]],
         partition_date: datetime.date,
         part_number: int,
+        shard_id: str = None,
+        run_id: str = None,
     ):
         """
-        Writes a list of dicts to S3 as a Parquet file.
+        Writes a list of dicts to S3 as a Parquet file, inside run_id's prefix
+        when given. Files written by a shard carry its id, so shards never collide.
         """
         if not data:
             logger.info(f"No data to write for {table_name}")
             return
 
-        import io
+        self.write_parquet_batches(
+            table_name,
+            [data],
+            partition_date,
+            part_number,
+            shard_id=shard_id,
+            run_id=run_id,
+        )
 
-        import pandas as pd
+    def write_parquet_batches(
+        self,
+        table_name: str,
+        batches: Iterable[List[Dict[str, Any]]],
+        partition_date: datetime.date,
+        part_number: int,
+        shard_id: str = None,
+        run_id: str = None,
+        schema_version: int = None,
+    ) -> int:
+        """
+        Writes batches of dicts (or Arrow RecordBatches) to S3 as a single
+        Parquet file, one row group per batch (split at the table's
+        PARQUET_ROW_GROUP_ROWS). Row groups are streamed into a multipart upload as they
+        are encoded, so only one batch and a few upload parts are held in
+        memory at a time.
 
-        anomesdia = partition_date.strftime("%Y%m%d")
-        # Use part number for filename
-        filename = f"part-{part_number:05d}.parquet"
-        key = f"raw/{table_name}/anomesdia={anomesdia}/{filename}"
+        Known tables are written with their explicit Arrow schema and
+        dictionary encoding on their low-cardinality columns only, in
+        schema_version (default PARQUET_SCHEMA_VERSION); codec, page size and
+        statistics follow the table's writer options. See parquet_schemas.
+
+        Returns: number of rows written
+        """
+        import pyarrow.parquet as pq
+
+        key = self._parquet_key(
+            table_name, partition_date, part_number, shard_id, run_id
+        )
+        schema = get_schema(table_name, schema_version)
+        options = writer_options(table_name, schema_version)
+        rows = 0
+        stats = {}
+
+        sink = S3MultipartSink(
+            self._client,
+            settings.S3_BUCKET_NAME,
+            key,
+            content_type="application/x-parquet",
+        )
+        writer = None
+        try:
+            for batch in batches:
+                if not batch:
+                    continue
+                if not isinstance(batch, list):
+                    # Already Arrow (e.g. compaction): keep the writer's schema
+                    record_batch = (
+                        batch if writer is None else batch.cast(writer.schema)
+                    )
+                elif schema is not None:
+                    record_batch = to_record_batch(table_name, batch, schema_version)
+                else:
+                    record_batch = self._infer_record_batch(batch, writer)
+                if writer is None:
+                    writer = pq.ParquetWriter(
+                        sink,
+                        record_batch.schema,
+                        compression=options["compression"],
+                        compression_level=options["compression_level"],
+                        use_dictionary=options["use_dictionary"],
+                        write_statistics=options["write_statistics"],
+                        data_page_size=options["data_page_size"],
+                    )
+                    writer_schema = record_batch.schema
+                writer.write_batch(
+                    record_batch, row_group_size=options["row_group_rows"]
+                )
+                rows += len(batch)
+                stats = merge_stats([stats, batch_stats(record_batch)])
+
+            if writer is not None:
+                writer.close()
+                writer = None
+
+            if not rows:
+                sink.abort()
+                logger.info(f"No data to write for {table_name}")
+                return 0
+
+            sink.close()
+            if run_id:
+                # Picked up by commit_run for the manifest
+                self._put_json(
+                    self._stats_prefix(table_name, partition_date, run_id)
+                    + key.rsplit("/", 1)[1]
+                    + ".json",
+                    {
+                        "rows": rows,
+                        "size": sink.tell(),
+                        "stats": stats,
+                        "schema_version": schema_version_of(writer_schema),
+                    },
+                )
+        except Exception as e:
+            sink.abort()
+            logger.error(f"Failed to write to S3: {str(e)}")
+            raise e
+
+        logger.info(
+            f"Successfully wrote {rows} records to s3://{settings.S3_BUCKET_NAME}/{key}"
+        )
+        return rows
+
+    def _infer_record_batch(self, batch: List[Dict[str, Any]], writer: Any):
+        """Fallback for tables without an explicit schema."""
+        import pyarrow as pa
+
+        if writer is not None:
+            return pa.RecordBatch.from_pylist(batch, schema=writer.schema)
+
+        inferred = pa.RecordBatch.from_pylist(batch)
+        # Columns that are all null in the first batch are strings
+        schema = pa.schema(
+            (
+                pa.field(field.name, pa.string())
+                if pa.types.is_null(field.type)
+                else field
+            )
+            for field in inferred.schema
+        )
+        return inferred.cast(schema)
 
+    def save_pending(
+        self,
+        table_name: str,
+        partition_date: datetime.date,
+        writer_id: str,
+        batches: Iterable[Any],
+        rows: int,
+        size: int,
+        run_id: str = None,
+    ):
+        """
+        Stores RecordBatches not yet written to Parquet (rows rows of size
+        in-memory bytes) as a new pending part: zstd-compressed Arrow IPC,
+        streamed into a multipart upload. The next invocation of the same
+        load picks the parts up (see BufferedParquetWriter). Earlier parts
+        are left as they are, so each invocation only uploads the rows it
+        buffered itself.
+        """
+        import pyarrow as pa
+
+        batches = iter(batches)
+        first = next(batches, None)
+        if first is None:
+            return
+
+        millis = int(datetime.datetime.now().timestamp() * 1000)
+        sink = S3MultipartSink(
+            self._client,
+            settings.S3_BUCKET_NAME,
+            # Row count and size in the name: restoring is a single listing
+            self._pending_prefix(table_name, partition_date, writer_id, run_id)
+            + f"part-{millis:013d}-{uuid.uuid4().hex[:8]}-{rows}r-{size}b.arrow",
+            content_type="application/vnd.apache.arrow.stream",
+        )
         try:
-            df = pd.DataFrame(data)
-            buffer = io.BytesIO()
-            df.to_parquet(buffer, index=False)
+            options = pa.ipc.IpcWriteOptions(compression="zstd")
+            with pa.ipc.new_stream(sink, first.schema, options=options) as stream:
+                stream.write_batch(first)
+                for batch in batches:
+                    stream.write_batch(batch)
+            sink.close()
+        except Exception:
+            sink.abort()
+            raise
+
+    def pending_parts(
+        self,
+        table_name: str,
+        partition_date: datetime.date,
+        writer_id: str,
+        run_id: str = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Pending parts stored by save_pending, oldest first, with their row
+        count and in-memory size, from a single listing.
+
+        Returns: [{"key": str, "rows": int, "bytes": int}]
+        """
+        import re
+
+        prefix = self._pending_prefix(table_name, partition_date, writer_id, run_id)
+        parts = []
+        for obj in self._list_objects(prefix):
+            match = re.search(r"-(\d+)r-(\d+)b\.arrow$", obj["Key"])
+            if match:
+                parts.append(
+                    {
+                        "key": obj["Key"],
+                        "rows": int(match.group(1)),
+                        "bytes": int(match.group(2)),
+                    }
+                )
+        return sorted(parts, key=lambda part: part["key"])
+
+    def iter_pending_part(self, key: str) -> Iterator[Any]:
+        """Streams the RecordBatches of a pending part."""
+        import pyarrow as pa
+
+        response = self._client.get_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
+        with pa.ipc.open_stream(response["Body"]) as reader:
+            yield from reader
+
+    def delete_pending(
+        self,
+        table_name: str,
+        partition_date: datetime.date,
+        writer_id: str,
+        run_id: str = None,
+    ):
+        """Drops every pending part of the writer (once they are in a file)."""
+        prefix = self._pending_prefix(table_name, partition_date, writer_id, run_id)
+        keys = [obj["Key"] for obj in self._list_objects(prefix)]
+        if keys:
+            self._delete_keys(keys)
 
-            self._client.put_object(
+    def archive_page(
+        self,
+        table_name: str,
+        partition_date: datetime.date,
+        run_id: str,
+        items: List[Dict[str, Any]],
+        writer_id: str = None,
+    ) -> Optional[str]:
+        """
+        Stores a page of raw API items as compressed NDJSON
+        (RAW_ARCHIVE_COMPRESSION) in the run's archive, so the tables can be
+        rebuilt later without calling the API (see ReplayService).
+
+        Returns: the page's key, or None for empty pages
+        """
+        if not items:
+            return None
+
+        key = self._archive_page_key(
+            table_name,
+            partition_date,
+            run_id,
+            settings.RAW_ARCHIVE_COMPRESSION,
+            writer_id,
+        )
+        body = _compress(
+            b"".join(json.dumps(item).encode() + b"\n" for item in items),
+            settings.RAW_ARCHIVE_COMPRESSION,
+        )
+        self._client.put_object(
+            Bucket=settings.S3_BUCKET_NAME,
+            Key=key,
+            Body=body,
+            ContentType="application/x-ndjson",
+            ContentEncoding=settings.RAW_ARCHIVE_COMPRESSION,
+        )
+        return key
+
+    def archived_pages(
+        self, table_name: str, partition_date: datetime.date
+    ) -> List[str]:
+        """
+        Keys of the partition's archived pages: the archived run's when one
+        was committed, otherwise every archived page.
+        """
+        archive = self._get_json(self._archive_marker_key(table_name, partition_date))
+        prefix = (
+            self._archive_run_prefix(table_name, partition_date, archive["run_id"])
+            if archive
+            else self._archive_prefix(table_name, partition_date)
+        )
+        return [
+            obj["Key"] for obj in self._list_objects(prefix) if "/page-" in obj["Key"]
+        ]
+
+    def read_archive_page(self, key: str) -> List[Dict[str, Any]]:
+        """Raw API items of an archived page."""
+        response = self._client.get_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
+        body = _decompress(response["Body"].read(), key.rsplit(".", 1)[1])
+        return [json.loads(line) for line in body.splitlines() if line]
+
+    def archived_partitions(self, table_name: str) -> List[datetime.date]:
+        """Dates with archived pages for a table."""
+        paginator = self._client.get_paginator("list_objects_v2")
+        prefix = f"archive/{table_name}/anomesdia="
+        dates = []
+        for page in paginator.paginate(
+            Bucket=settings.S3_BUCKET_NAME, Prefix=prefix, Delimiter="/"
+        ):
+            for common in page.get("CommonPrefixes", []):
+                anomesdia = common["Prefix"][len(prefix) :].rstrip("/")
+                dates.append(datetime.datetime.strptime(anomesdia, "%Y%m%d").date())
+        return dates
+
+    def save_fingerprints(
+        self,
+        table_name: str,
+        state: Dict[str, Any],
+        partition_date: datetime.date = None,
+        run_id: str = None,
+    ):
+        """
+        Stores a FingerprintIndex state: the table's committed index, or with
+        run_id the partial index of a load still in progress (see save_state).
+        """
+        self.save_state(table_name, "fingerprints", state, partition_date, run_id)
+
+    def load_fingerprints(
+        self,
+        table_name: str,
+        partition_date: datetime.date = None,
+        run_id: str = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Reads what save_fingerprints stored, if anything."""
+        return self.load_state(table_name, "fingerprints", partition_date, run_id)
+
+    def save_state(
+        self,
+        table_name: str,
+        name: str,
+        state: Dict[str, Any],
+        partition_date: datetime.date = None,
+        run_id: str = None,
+    ):
+        """
+        Stores load state too large for SSM as gzipped JSON: under
+        state/{table}/ once committed, or with run_id in the run's staging
+        prefix while the load is in progress (dropped with the run).
+        """
+        self._client.put_object(
+            Bucket=settings.S3_BUCKET_NAME,
+            Key=self._state_key(table_name, name, partition_date, run_id),
+            Body=_compress(json.dumps(state).encode(), "gzip"),
+            ContentType="application/json",
+            ContentEncoding="gzip",
+        )
+
+    def load_state(
+        self,
+        table_name: str,
+        name: str,
+        partition_date: datetime.date = None,
+        run_id: str = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Reads what save_state stored, if anything."""
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self._client.get_object(
                 Bucket=settings.S3_BUCKET_NAME,
-                Key=key,
-                Body=buffer.getvalue(),
-                ContentType="application/x-parquet",
+                Key=self._state_key(table_name, name, partition_date, run_id),
             )
-            logger.info(
-                f"Successfully wrote {len(data)} records to s3://{settings.S3_BUCKET_NAME}/{key}"
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return json.loads(_decompress(response["Body"].read(), "gz"))
+
+    def _cleanup_partition(
+        self, table_name: str, partition_date: datetime.date, run_id: str
+    ):
+        """
+        Deletes everything in the partition that is not the committed run's
+        files or its manifest, archived pages of other runs than the archived
+        one, plus the staging objects of the committed run and of the runs it
+        supersedes, in parallel batches. A run opened after the committed one
+        (the run marker names it) keeps its staging and archived pages.
+        Failures are only logged: the manifest is authoritative and the next
+        commit retries.
+        """
+        anomesdia = partition_date.strftime("%Y%m%d")
+        keep = (
+            self._published_key(table_name, partition_date, run_id, ""),
+            self._manifest_key(table_name, partition_date),
+        )
+        try:
+            stale = [
+                obj["Key"]
+                for obj in self._list_objects(
+                    f"raw/{table_name}/anomesdia={anomesdia}/"
+                )
+                if not obj["Key"].startswith(keep)
+            ]
+            staging = [
+                obj["Key"]
+                for obj in self._list_objects(
+                    f"staging/{table_name}/anomesdia={anomesdia}/"
+                )
+            ]
+            # Read after the listing: a run writes its marker before any of
+            # its staging objects, so every listed object of an open run is
+            # recognised
+            marker = self._get_json(self._run_marker_key(table_name, partition_date))
+            open_run = marker.get("run_id") if marker else None
+            keep_open = ()
+            if open_run and open_run != run_id:
+                keep_open = (
+                    self._staging_run_prefix(table_name, partition_date, open_run),
+                    self._run_marker_key(table_name, partition_date),
+                    self._archive_run_prefix(table_name, partition_date, open_run),
+                )
+            stale += [key for key in staging if not key.startswith(keep_open)]
+            archive = self._get_json(
+                self._archive_marker_key(table_name, partition_date)
             )
+            if archive is not None:
+                keep_archive = keep_open + (
+                    self._archive_run_prefix(
+                        table_name, partition_date, archive["run_id"]
+                    ),
+                    self._archive_marker_key(table_name, partition_date),
+                )
+                stale += [
+                    obj["Key"]
+                    for obj in self._list_objects(
+                        self._archive_prefix(table_name, partition_date)
+                    )
+                    if not obj["Key"].startswith(keep_archive)
+                ]
+            if stale:
+                logger.info(
+                    f"Removing {len(stale)} stale objects of {table_name} {anomesdia}"
+                )
+                self._delete_keys(stale)
         except Exception as e:
-            logger.error(f"Failed to write to S3: {str(e)}")
-            raise e
+            logger.error(f"Failed to clean up {table_name} {anomesdia}: {str(e)}")
+
+    def _delete_keys(self, keys: List[str]):
+        # Delete in batches of 1000 (S3 limit), several batches at a time
+        batches = [keys[i : i + 1000] for i in range(0, len(keys), 1000)]
+
+        def delete(batch):
+            response = self._client.delete_objects(
+                Bucket=settings.S3_BUCKET_NAME,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            for error in response.get("Errors", []):
+                logger.error(f"Failed to delete {error.get('Key')}: {error}")
+
+        for _ in bounded_map(delete, batches, settings.S3_MAX_CONCURRENCY):
+            pass
+
+    def _list_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=settings.S3_BUCKET_NAME, Prefix=prefix):
+            yield from page.get("Contents", [])
+
+    def _put_json(self, key: str, payload: Dict[str, Any]):
+        self._client.put_object(
+            Bucket=settings.S3_BUCKET_NAME,
+            Key=key,
+            Body=json.dumps(payload).encode(),
+            ContentType="application/json",
+        )
+
+    def _get_json(self, key: str) -> Optional[Dict[str, Any]]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self._client.get_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return json.loads(response["Body"].read())
+
+    def _parquet_key(
+        self,
+        table_name: str,
+        partition_date: datetime.date,
+        part_number: int,
+        shard_id: str = None,
+        run_id: str = None,
+    ) -> str:
+        # Use part number for filename
+        filename = f"part-{part_number:05d}.parquet"
+        if shard_id:
+            filename = f"part-{shard_id}-{part_number:05d}.parquet"
+        if run_id:
+            return self._run_prefix(table_name, partition_date, run_id) + filename
+        anomesdia = partition_date.strftime("%Y%m%d")
+        return f"raw/{table_name}/anomesdia={anomesdia}/{filename}"
+
+    def _run_prefix(
+        self, table_name: str, partition_date: datetime.date, run_id: str
+    ) -> str:
+        # Outside raw/: table readers never see a run before its commit
+        return self._staging_run_prefix(table_name, partition_date, run_id) + "files/"
+
+    def _published_key(
+        self, table_name: str, partition_date: datetime.date, run_id: str, name: str
+    ) -> str:
+        # Flat in the partition: no run=... directory for readers to take
+        # for a partition key
+        anomesdia = partition_date.strftime("%Y%m%d")
+        return f"raw/{table_name}/anomesdia={anomesdia}/{run_id}-{name}"
+
+    def _staging_run_prefix(
+        self, table_name: str, partition_date: datetime.date, run_id: str
+    ) -> str:
+        anomesdia = partition_date.strftime("%Y%m%d")
+        return f"staging/{table_name}/anomesdia={anomesdia}/run={run_id}/"
+
+    def _stats_prefix(
+        self, table_name: str, partition_date: datetime.date, run_id: str
+    ) -> str:
+        return self._staging_run_prefix(table_name, partition_date, run_id) + "stats/"
+
+    def _archive_prefix(self, table_name: str, partition_date: datetime.date) -> str:
+        anomesdia = partition_date.strftime("%Y%m%d")
+        return f"archive/{table_name}/anomesdia={anomesdia}/"
+
+    def _archive_run_prefix(
+        self, table_name: str, partition_date: datetime.date, run_id: str
+    ) -> str:
+        return self._archive_prefix(table_name, partition_date) + f"run={run_id}/"
+
+    def _archive_marker_key(
+        self, table_name: str, partition_date: datetime.date
+    ) -> str:
+        return self._archive_prefix(table_name, partition_date) + "_archive.json"
+
+    def _archive_page_key(
+        self,
+        table_name: str,
+        partition_date: datetime.date,
+        run_id: str,
+        compression: str,
+        writer_id: str = None,
+    ) -> str:
+        # Millisecond timestamps list pages in (roughly) fetch order
+        millis = int(datetime.datetime.now().timestamp() * 1000)
+        owner = f"{writer_id}-" if writer_id else ""
+        name = f"page-{owner}{millis}-{uuid.uuid4().hex[:8]}"
+        return (
+            self._archive_run_prefix(table_name, partition_date, run_id)
+            + f"{name}.ndjson.{_EXTENSIONS[compression]}"
+        )
+
+    def _state_key(
+        self,
+        table_name: str,
+        name: str,
+        partition_date: datetime.date = None,
+        run_id: str = None,
+    ) -> str:
+        if run_id:
+            return (
+                self._staging_run_prefix(table_name, partition_date, run_id)
+                + f"{name}.json.gz"
+            )
+        return f"state/{table_name}/{name}.json.gz"
+
+    def _manifest_key(self, table_name: str, partition_date: datetime.date) -> str:
+        # Leading underscore: Athena/Hive skip it when scanning the partition
+        anomesdia = partition_date.strftime("%Y%m%d")
+        return f"raw/{table_name}/anomesdia={anomesdia}/_manifest.json"
+
+    def _run_marker_key(self, table_name: str, partition_date: datetime.date) -> str:
+        anomesdia = partition_date.strftime("%Y%m%d")
+        return f"staging/{table_name}/anomesdia={anomesdia}/_run.json"
+
+    def _pending_prefix(
+        self,
+        table_name: str,
+        partition_date: datetime.date,
+        writer_id: str,
+        run_id: str = None,
+    ) -> str:
+        # Outside raw/ so readers of the table never see it
+        anomesdia = partition_date.strftime("%Y%m%d")
+        run = f"run={run_id}/" if run_id else ""
+        return f"staging/{table_name}/anomesdia={anomesdia}/{run}pending-{writer_id}/"
+
+
+# Archive codecs and the file extension of their pages
+_EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        import gzip
+
+        return gzip.compress(data)
+    if compression == "zstd":
+        import pyarrow as pa
+
+        # zstd comes with pyarrow, so no extra dependency
+        buffer = pa.BufferOutputStream()
+        with pa.CompressedOutputStream(buffer, "zstd") as stream:
+            stream.write(data)
+        return buffer.getvalue().to_pybytes()
+    raise ValueError(f"Unknown RAW_ARCHIVE_COMPRESSION: {compression}")
+
+
+def _decompress(data: bytes, extension: str) -> bytes:
+    if extension == "gz":
+        import gzip
+
+        return gzip.decompress(data)
+    if extension == "zst":
+        import pyarrow as pa
+
+        with pa.input_stream(pa.py_buffer(data), compression="zstd") as stream:
+            return stream.read()
+    raise ValueError(f"Unknown archive page extension: {extension}")
 
 
-s3_writer = S3Writer()
+s3_writer = LazyInstance(S3Writer)
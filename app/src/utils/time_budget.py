@@ -0,0 +1,41 @@
+import time
+from typing import Any, Optional
+
+
+class TimeBudget:
+    """
+    Tracks how much of a Lambda invocation may be spent pulling pages.
+
+    The budget is a share of the time remaining when the invocation starts.
+    Another page is only started if it would still finish within the budget
+    assuming it takes as long as the slowest page seen so far.
+    """
+
+    def __init__(self, seconds: float):
+        now = time.monotonic()
+        self._deadline = now + seconds
+        self._last_mark = now
+        self._slowest_page = 0.0
+        self.pages = 0
+
+    @classmethod
+    def from_context(cls, context: Any, ratio: float) -> Optional["TimeBudget"]:
+        """
+        Returns None (single page per invocation) when there is no Lambda
+        context or the ratio is disabled.
+        """
+        if context is None or ratio <= 0:
+            return None
+        remaining_ms = context.get_remaining_time_in_millis()
+        return cls(remaining_ms / 1000 * min(ratio, 1.0))
+
+    def allows_another_page(self, reserved_pages: int = 0) -> bool:
+        """
+        Records the page that just finished and checks room for one more,
+        plus reserved_pages still in flight (e.g. queued for writing).
+        """
+        now = time.monotonic()
+        self._slowest_page = max(self._slowest_page, now - self._last_mark)
+        self._last_mark = now
+        self.pages += 1
+        return now + self._slowest_page * (1 + reserved_pages) < self._deadline
@@ -3,6 +3,9 @@ import sys
 
 import pytest
 
+from src.clients.object_stores import InMemoryObjectStore
+from src.utils.s3_writer import S3Writer
+
 # Add app directory to sys.path so 'src' module can be found
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
 
@@ -32,3 +35,18 @@ def mock_boto3_client(mocker):
     mock_client = mocker.patch("boto3.client")
     mock_resource = mocker.patch("boto3.resource")
     return mock_client, mock_resource
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """In-memory S3 with S3_BUCKET_NAME pointing at its bucket"""
+    monkeypatch.setenv("S3_BUCKET_NAME", "bucket")
+    return InMemoryObjectStore()
+
+
+@pytest.fixture
+def writer(s3):
+    """S3Writer over the in-memory store"""
+    writer = object.__new__(S3Writer)
+    writer._setup(s3)
+    return writer
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from src.clients import aws
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    aws.reset_clients()
+    yield
+    aws.reset_clients()
+
+
+def test_clients_are_cached_and_share_one_session(mocker):
+    session_cls = mocker.patch("boto3.session.Session")
+
+    s3 = aws.get_client("s3")
+
+    assert aws.get_client("s3") is s3
+    aws.get_client("ssm")
+    session_cls.assert_called_once()
+    assert session_cls.return_value.client.call_count == 2
+
+
+def test_client_config_is_tuned(mocker, monkeypatch):
+    monkeypatch.setenv("AWS_MAX_POOL_CONNECTIONS", "64")
+    monkeypatch.setenv("AWS_RETRY_MODE", "standard")
+    session_cls = mocker.patch("boto3.session.Session")
+
+    aws.get_client("s3")
+
+    config = session_cls.return_value.client.call_args.kwargs["config"]
+    assert config.max_pool_connections == 64
+    assert config.retries == {"mode": "standard", "max_attempts": 5}
+    assert config.tcp_keepalive is True
+
+
+def test_localstack_defaults_to_dummy_credentials(mocker, monkeypatch):
+    monkeypatch.setenv("LOCALSTACK_ENDPOINT", "http://localhost:4566")
+    monkeypatch.delenv("AWS_ACCESS_KEY_ID", raising=False)
+    monkeypatch.delenv("AWS_SECRET_ACCESS_KEY", raising=False)
+    session_cls = mocker.patch("boto3.session.Session")
+
+    aws.get_client("s3")
+
+    assert session_cls.call_args.kwargs["aws_access_key_id"] == "test"
+    assert session_cls.call_args.kwargs["aws_secret_access_key"] == "test"
+    assert (
+        session_cls.return_value.client.call_args.kwargs["endpoint_url"]
+        == "http://localhost:4566"
+    )
+
+
+def test_aws_uses_default_credential_chain(mocker, monkeypatch):
+    monkeypatch.delenv("LOCALSTACK_ENDPOINT", raising=False)
+    session_cls = mocker.patch("boto3.session.Session")
+
+    aws.get_client("s3")
+
+    assert "aws_access_key_id" not in session_cls.call_args.kwargs
+
+
+def test_concurrent_callers_build_a_single_client(mocker):
+    session_cls = mocker.patch("boto3.session.Session")
+    clients = []
+
+    threads = [
+        threading.Thread(target=lambda: clients.append(aws.get_client("s3")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert session_cls.return_value.client.call_count == 1
+    assert len({id(c) for c in clients}) == 1
@@ -80,3 +80,29 @@ def test_map_badge_no_issuer_entities(service):
 
     assert result["badge_id"] == "789"
     assert result["organization_id"] == ""
+
+
+@pytest.mark.parametrize("schema_version", [1, 2])
+def test_map_badges_matches_map_badge(service, schema_version):
+    """The columnar page mapper yields the row mapper's values"""
+    from src.utils.parquet_schemas import to_record_batch
+
+    items = [
+        {
+            "id": 1,
+            "issued_to": "Ann",
+            "user": {"id": 7},
+            "badge_template": {"id": 3, "name": "Cloud", "image_url": "http://i"},
+            "issuer": {"entities": [{"id": 9, "name": "Acme"}, {"id": 10}]},
+            "public": True,
+            "issued_at": "2024-05-01T10:00:00.000-03:00",
+        },
+        {"id": 2, "user": None, "issuer": {"entities": []}, "public": False},
+        {},
+    ]
+
+    batch = service._map_badges(items, schema_version)
+    rows = [service._map_badge(item, schema_version) for item in items]
+
+    assert batch.equals(to_record_batch("badges_emitidas", rows, schema_version))
+    assert service._map_badges([], schema_version).num_rows == 0
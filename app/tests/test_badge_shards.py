@@ -0,0 +1,203 @@
+import datetime
+
+import pytest
+from src.services.credly_badges_service import CredlyBadgesService
+
+
+@pytest.fixture
+def service():
+    return CredlyBadgesService()
+
+
+@pytest.fixture
+def mock_credly_client(mocker):
+    return mocker.patch("src.services.credly_badges_service.credly_client")
+
+
+@pytest.fixture
+def mock_s3_writer(mocker):
+    mock_writer = mocker.patch("src.services.credly_badges_service.s3_writer")
+    # The run of the shards below is open unless a test says otherwise
+    mock_writer.current_run.return_value = "run-1"
+    return mock_writer
+
+
+@pytest.fixture
+def mock_ssm_client(mocker):
+    return mocker.patch("src.clients.ssm_client.ssm_client")
+
+
+def test_split_window_balances_by_badge_count(service, mock_credly_client):
+    """Windows are cut where the cumulative badge count crosses each share"""
+    start = datetime.datetime(2020, 1, 1)
+    end = datetime.datetime(2020, 1, 9)
+    # 8 samples (2 shards x 4): almost everything is in the last two days
+    mock_credly_client.count_badges.return_value = [0, 0, 0, 0, 0, 0, 50, 50]
+
+    windows = service._split_window(start, end, 2)
+
+    assert len(windows) == 2
+    assert windows[0][0] == start
+    assert windows[1][0] == datetime.datetime(2020, 1, 8)
+    assert windows[0][1] == datetime.datetime(2020, 1, 7, 23, 59, 59)
+    assert windows[1][1] == end
+
+
+def test_split_window_falls_back_to_equal_width(service, mock_credly_client):
+    start = datetime.datetime(2020, 1, 1)
+    end = datetime.datetime(2020, 1, 5)
+    mock_credly_client.count_badges.return_value = [None] * 8
+
+    windows = service._split_window(start, end, 2)
+
+    assert [w[0] for w in windows] == [start, datetime.datetime(2020, 1, 3)]
+
+
+def test_plan_shards_requires_historical(service):
+    with pytest.raises(ValueError, match="historical"):
+        service.plan_shards("daily", 4)
+
+
+def test_plan_shards_starts_one_run(
+    service, mock_credly_client, mock_s3_writer, mock_ssm_client
+):
+    mock_credly_client.count_badges.return_value = [1] * 12
+    mock_s3_writer.start_run.return_value = "run-1"
+
+    result = service.plan_shards("historical", 3)
+
+    assert [s["shard_id"] for s in result["shards"]] == ["000", "001", "002"]
+    assert {s["run_id"] for s in result["shards"]} == {"run-1"}
+    assert {s["shard_count"] for s in result["shards"]} == {3}
+    mock_s3_writer.start_run.assert_called_once()
+    # The stored plan does not grow with the number of shards
+    name, plan = mock_ssm_client.put_parameter.call_args.args[:2]
+    assert name == "/credly/state/badges/shard_plan"
+    assert plan["run_id"] == "run-1" and plan["shard_count"] == 3
+    assert "shards" not in plan
+
+
+def test_process_shard_writes_own_parts_and_state(
+    service, mock_credly_client, mock_s3_writer, mock_ssm_client
+):
+    shard = {
+        "shard_id": "001",
+        "start_date": "2020-01-01 00:00:00",
+        "end_date": "2020-06-30 23:59:59",
+        "partition_date": "2024-05-01",
+    }
+    mock_ssm_client.get_parameter.return_value = {}
+    mock_credly_client.get_badges.return_value = ([{"id": 1}], "http://next")
+
+    result = service.process_shard("historical", shard)
+
+    assert result == {"records_processed": 1, "next_page": "http://next"}
+    params = mock_credly_client.get_badges.call_args.args[0]
+    assert params == {"start_date": shard["start_date"], "end_date": shard["end_date"]}
+    # Rows are buffered per shard until the shard completes
+    mock_s3_writer.write_parquet_batches.assert_not_called()
+    name, partition_date, writer_id = mock_s3_writer.save_pending.call_args.args[:3]
+    assert name == "badges_emitidas"
+    assert partition_date == datetime.date(2024, 5, 1)
+    assert writer_id == "001"
+    name, state = mock_ssm_client.put_parameter.call_args.args[:2]
+    assert name.endswith("/001")
+    assert state["status"] == "in_progress"
+    assert state["next_page"] == "http://next"
+
+
+def test_process_shard_skips_completed_shard(
+    service, mock_credly_client, mock_ssm_client
+):
+    mock_ssm_client.get_parameter.return_value = {"status": "complete"}
+
+    result = service.process_shard("historical", {"shard_id": "000"})
+
+    assert result["records_processed"] == 0
+    mock_credly_client.get_badges.assert_not_called()
+
+
+def test_last_completed_shard_commits_the_run(
+    service, mock_credly_client, mock_s3_writer, mock_ssm_client
+):
+    shard = {
+        "shard_id": "001",
+        "start_date": "2020-01-01 00:00:00",
+        "end_date": "2020-06-30 23:59:59",
+        "partition_date": "2024-05-01",
+        "run_id": "run-1",
+        "shard_count": 2,
+    }
+    states = {
+        "/credly/state/badges/shards/000": {"status": "complete", "run_id": "run-1"},
+    }
+    mock_ssm_client.get_parameter.side_effect = lambda name: states.get(name, {})
+    mock_credly_client.get_badges.return_value = ([{"id": 1}], None)
+
+    service.process_shard("historical", shard)
+
+    mock_s3_writer.commit_run.assert_called_once_with(
+        "badges_emitidas", datetime.date(2024, 5, 1), "run-1"
+    )
+
+    # Shard 000 completed in an earlier run: nothing is committed
+    states["/credly/state/badges/shards/000"]["run_id"] = "run-0"
+    mock_s3_writer.reset_mock()
+    service.process_shard("historical", shard)
+    mock_s3_writer.commit_run.assert_not_called()
+
+
+def test_shards_of_legacy_plans_are_read_from_the_plan(
+    service, mock_credly_client, mock_s3_writer, mock_ssm_client
+):
+    shard = {
+        "shard_id": "000",
+        "start_date": "2020-01-01 00:00:00",
+        "end_date": "2020-06-30 23:59:59",
+        "partition_date": "2024-05-01",
+        "run_id": "run-1",
+    }
+    states = {
+        "/credly/state/badges/shard_plan": {
+            "shards": [{"shard_id": "000"}, {"shard_id": "001"}]
+        },
+    }
+    mock_ssm_client.get_parameter.side_effect = lambda name: states.get(name, {})
+    mock_credly_client.get_badges.return_value = ([{"id": 1}], None)
+
+    service.process_shard("historical", shard)
+    mock_s3_writer.commit_run.assert_not_called()
+
+    states["/credly/state/badges/shards/001"] = {
+        "status": "complete",
+        "run_id": "run-1",
+    }
+    service.process_shard("historical", shard)
+    mock_s3_writer.commit_run.assert_called_once()
+
+
+def test_shard_of_a_run_no_longer_open_is_refused(
+    service, mock_credly_client, mock_s3_writer, mock_ssm_client
+):
+    shard = {
+        "shard_id": "000",
+        "start_date": "2020-01-01 00:00:00",
+        "end_date": "2020-06-30 23:59:59",
+        "partition_date": "2024-05-01",
+        "run_id": "run-1",
+        "shard_count": 2,
+    }
+    mock_ssm_client.get_parameter.return_value = {
+        "status": "in_progress",
+        "next_page": "http://page-2",
+        "run_id": "run-1",
+    }
+    # Another load replaced the run while the shard was paused
+    mock_s3_writer.current_run.return_value = "run-2"
+
+    with pytest.raises(ValueError):
+        service.process_shard("historical", shard)
+
+    mock_credly_client.get_badges.assert_not_called()
+    mock_s3_writer.write_parquet_batches.assert_not_called()
+    mock_ssm_client.put_parameter.assert_not_called()
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+from src.utils.lazy import LazyInstance
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_handler_import_loads_no_heavy_modules():
+    """Importing the handler must not build AWS/HTTP clients or load Parquet"""
+    code = (
+        "import sys, lambda_function; "
+        "print(','.join(m for m in ('boto3', 'botocore', 'requests', 'pandas', "
+        "'pyarrow') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == ""
+
+
+def test_lazy_instance_builds_once_on_first_use():
+    built = []
+
+    class Client:
+        def __init__(self):
+            built.append(self)
+            self.value = 1
+
+    lazy = LazyInstance(Client)
+    assert built == []
+
+    assert lazy.value == 1
+    lazy.value = 2
+    assert lazy.value == 2
+    assert len(built) == 1
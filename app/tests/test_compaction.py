@@ -0,0 +1,169 @@
+import datetime
+import io
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.services.compaction_service import CompactionService
+
+PARTITION = datetime.date(2024, 5, 1)
+
+
+@pytest.fixture
+def writer(writer, mocker):
+    mocker.patch("src.services.compaction_service.s3_writer", writer)
+    return writer
+
+
+def _badge(badge_id, updated_at, state="accepted"):
+    return {"badge_id": badge_id, "updated_at": updated_at, "state": state}
+
+
+def test_compacts_legacy_page_files_and_drops_overlap_duplicates(writer, s3):
+    # One file per page, as written before buffering; page 2 re-reads the
+    # overlap window and sees badge b2 again, now revoked
+    pages = [
+        [_badge("b3", "2024-05-01 10:00:00"), _badge("b2", "2024-05-01 09:00:00")],
+        [
+            _badge("b2", "2024-05-01 09:30:00", "revoked"),
+            _badge("b1", "2024-05-01 08:00:00"),
+        ],
+    ]
+    for part_number, page in enumerate(pages, start=1700000000000):
+        writer.write_parquet("badges_emitidas", page, PARTITION, part_number)
+
+    result = CompactionService().compact("badges_emitidas", PARTITION)
+
+    assert result == {
+        "records_processed": 3,
+        "duplicates_removed": 1,
+        "files_before": 2,
+        "files_after": 1,
+    }
+    (key,) = writer.committed_files("badges_emitidas", PARTITION)
+    table = pq.read_table(io.BytesIO(s3.objects[("bucket", key)]))
+    # In the order of the files, latest version of b2 kept
+    assert table.column("badge_id").to_pylist() == ["b3", "b2", "b1"]
+    assert table.column("state").to_pylist() == ["accepted", "revoked", "accepted"]
+    # Only the compacted file and the manifest remain
+    assert sorted(k for _, k in s3.objects) == sorted(
+        [key, "raw/badges_emitidas/anomesdia=20240501/_manifest.json"]
+    )
+
+
+def test_splits_output_into_target_sized_files(writer, monkeypatch):
+    monkeypatch.setenv("PARQUET_TARGET_FILE_ROWS", "4")
+    run_id = writer.start_run("badges_emitidas", PARTITION)
+    for i in range(10):
+        writer.write_parquet(
+            "badges_emitidas",
+            [_badge(f"b{i}", f"2024-05-01 00:00:{i:02d}")],
+            PARTITION,
+            i,
+            run_id=run_id,
+        )
+    writer.commit_run("badges_emitidas", PARTITION, run_id)
+
+    result = CompactionService().compact("badges_emitidas", PARTITION)
+
+    assert result["files_before"] == 10
+    assert result["files_after"] == 3
+    manifest = writer.read_manifest("badges_emitidas", PARTITION)
+    assert [f["rows"] for f in manifest["files"]] == [4, 4, 2]
+
+
+def test_compaction_streams_row_groups_with_ranged_reads(
+    writer, s3, monkeypatch, mocker
+):
+    monkeypatch.setenv("PARQUET_ROW_GROUP_ROWS", "2")
+    # Each file holds several row groups; duplicates span files and groups
+    writer.write_parquet(
+        "badges_emitidas",
+        [_badge(f"b{i}", "2024-05-01 08:00:00") for i in range(5)],
+        PARTITION,
+        1,
+    )
+    writer.write_parquet(
+        "badges_emitidas",
+        [_badge(f"b{i}", "2024-05-01 09:00:00", "revoked") for i in range(3, 7)],
+        PARTITION,
+        2,
+    )
+    get_object = mocker.spy(s3, "get_object")
+
+    result = CompactionService().compact("badges_emitidas", PARTITION)
+
+    assert result["records_processed"] == 7
+    assert result["duplicates_removed"] == 2
+    # No committed file is downloaded whole
+    reads = [
+        c.kwargs
+        for c in get_object.call_args_list
+        if c.kwargs["Key"].endswith(".parquet")
+    ]
+    assert reads and all("Range" in kwargs for kwargs in reads)
+    (key,) = writer.committed_files("badges_emitidas", PARTITION)
+    table = pq.read_table(io.BytesIO(s3.objects[("bucket", key)]))
+    states = dict(
+        zip(table.column("badge_id").to_pylist(), table.column("state").to_pylist())
+    )
+    assert states == {
+        **{f"b{i}": "accepted" for i in range(3)},
+        **{f"b{i}": "revoked" for i in range(3, 7)},
+    }
+
+
+def test_empty_partition_is_left_alone(writer, s3):
+    result = CompactionService().compact("badges_emitidas", PARTITION)
+
+    assert result["files_after"] == 0
+    assert result["skipped"] is True
+    assert s3.objects == {}
+
+
+def test_compaction_upgrades_files_to_the_current_schema_version(
+    writer, s3, monkeypatch
+):
+    writer.write_parquet(
+        "badges_emitidas",
+        [_badge("b1", "2024-05-01T08:00:00Z"), _badge("b2", "")],
+        PARTITION,
+        1,
+    )
+    monkeypatch.setenv("PARQUET_SCHEMA_VERSION", "2")
+
+    CompactionService().compact("badges_emitidas", PARTITION)
+
+    manifest = writer.read_manifest("badges_emitidas", PARTITION)
+    assert manifest["schema_version"] == 2
+    (key,) = writer.committed_files("badges_emitidas", PARTITION)
+    table = pq.read_table(io.BytesIO(s3.objects[("bucket", key)]))
+    # Empty strings of the old version become nulls
+    assert table.column("updated_at").to_pylist() == [
+        datetime.datetime(2024, 5, 1, 8, tzinfo=datetime.timezone.utc),
+        None,
+    ]
+
+
+def test_compaction_keeps_a_delta_partition_a_delta(writer):
+    run_id = writer.start_run("badges_templates", PARTITION)
+    writer.write_parquet(
+        "badges_templates",
+        [{"badge_template_id": "t1", "updated_at": "2024-05-01T00:00:00"}],
+        PARTITION,
+        1,
+        run_id=run_id,
+    )
+    writer.commit_run(
+        "badges_templates",
+        PARTITION,
+        run_id,
+        extra={"load": "delta", "deleted_ids": ["t2"]},
+    )
+
+    CompactionService().compact("badges_templates", PARTITION)
+
+    manifest = writer.read_manifest("badges_templates", PARTITION)
+    assert manifest["run_id"] != run_id
+    assert manifest["load"] == "delta"
+    assert manifest["deleted_ids"] == ["t2"]
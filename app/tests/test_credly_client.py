@@ -0,0 +1,179 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from src.clients.credly_client import CredlyClient
+from src.utils.concurrency import bounded_map
+
+
+@pytest.fixture
+def client(mocker):
+    provider = mocker.patch("src.clients.credly_client.get_token_provider")
+    provider.return_value.get_auth_headers.side_effect = lambda: {
+        "Authorization": "Basic token"
+    }
+    return CredlyClient()
+
+
+def _response(data, metadata, status_code=200, headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.json.return_value = {"data": data, "metadata": metadata}
+    return response
+
+
+def test_iter_pages_fetches_remaining_pages_by_number(client, mocker):
+    """Pages 2..N are requested by number once total_pages is known"""
+    mock_http = mocker.patch("src.clients.credly_client.http_client")
+
+    def fake_get(url, headers=None, params=None):
+        page = params.get("page", 1)
+        return _response([{"id": page}], {"current_page": page, "total_pages": 3})
+
+    mock_http.get.side_effect = fake_get
+
+    pages = list(client.iter_pages("endpoint", {"page_size": 100}))
+
+    assert pages == [[{"id": 1}], [{"id": 2}], [{"id": 3}]]
+    assert mock_http.get.call_count == 3
+    requested = sorted(
+        c.kwargs["params"].get("page", 1) for c in mock_http.get.call_args_list
+    )
+    assert requested == [1, 2, 3]
+
+
+def test_iter_pages_respects_page_limit(client, mocker):
+    mock_http = mocker.patch("src.clients.credly_client.http_client")
+    mock_http.get.side_effect = lambda url, headers=None, params=None: _response(
+        [{"id": params.get("page", 1)}],
+        {"current_page": params.get("page", 1), "total_pages": 10},
+    )
+
+    pages = list(client.iter_pages("endpoint", page_limit=2))
+
+    assert len(pages) == 2
+    assert mock_http.get.call_count == 2
+
+
+def test_iter_pages_resumes_at_start_page(client, mocker):
+    mock_http = mocker.patch("src.clients.credly_client.http_client")
+    mock_http.get.side_effect = lambda url, headers=None, params=None: _response(
+        [{"id": params.get("page", 1)}],
+        {"current_page": params.get("page", 1), "total_pages": 5},
+    )
+
+    pages = list(client.iter_pages("endpoint", start_page=4))
+
+    assert pages == [[{"id": 4}], [{"id": 5}]]
+
+
+def test_iter_pages_follows_cursor_without_total_pages(client, mocker):
+    """Cursor-only endpoints are followed serially via next_page_url"""
+    mock_http = mocker.patch("src.clients.credly_client.http_client")
+    mock_http.get.side_effect = [
+        _response([{"id": 1}], {"next_page_url": "http://next?badge_format=default"}),
+        _response([{"id": 2}], {"next_page_url": None}),
+    ]
+
+    pages = list(client.iter_pages("endpoint"))
+
+    assert pages == [[{"id": 1}], [{"id": 2}]]
+    assert mock_http.get.call_args_list[1].args[0] == "http://next?badge_format=minimal"
+
+
+def test_iter_pages_collects_validators(client, mocker):
+    mock_http = mocker.patch("src.clients.credly_client.http_client")
+    mock_http.get.side_effect = lambda url, headers=None, params=None: _response(
+        [{"id": 1}],
+        {"current_page": params.get("page", 1), "total_pages": 2},
+        headers={"ETag": '"v%s"' % params.get("page", 1)},
+    )
+    validators = {}
+
+    list(client.iter_pages("endpoint", validators=validators))
+
+    assert validators == {"1": {"etag": '"v1"'}, "2": {"etag": '"v2"'}}
+
+
+def test_iter_pages_reports_page_info(client, mocker):
+    mock_http = mocker.patch("src.clients.credly_client.http_client")
+    mock_http.get.side_effect = [
+        _response([{"id": 1}], {"current_page": 1, "total_pages": 4}),
+        _response([{"id": 1}], {"next_page_url": "http://next"}),
+        _response([{"id": 2}], {"next_page_url": None}),
+    ]
+
+    numbered, cursor = {}, {}
+    pages = client.iter_pages("endpoint", page_info=numbered)
+    next(pages)
+    assert numbered["total_pages"] == 4
+    assert mock_http.get.call_count == 1
+
+    pages = client.iter_pages("endpoint", page_info=cursor)
+    next(pages)
+    assert cursor["next_page_url"] == "http://next"
+    next(pages)
+    assert cursor["next_page_url"] is None
+
+
+def test_templates_not_modified_when_all_pages_304(client, mocker):
+    mock_http = mocker.patch("src.clients.credly_client.http_client")
+
+    def fake_get(url, headers=None, params=None):
+        if params["page"] == 3:
+            return _response([], {})
+        assert headers["If-None-Match"] == '"v%s"' % params["page"]
+        return _response(None, None, status_code=304)
+
+    mock_http.get.side_effect = fake_get
+    validators = {"1": {"etag": '"v1"'}, "2": {"etag": '"v2"'}}
+
+    assert client.templates_not_modified({}, validators) is True
+    assert mock_http.get.call_count == 3
+
+
+def test_templates_modified_when_any_page_changed(client, mocker):
+    mock_http = mocker.patch("src.clients.credly_client.http_client")
+    mock_http.get.side_effect = lambda url, headers=None, params=None: (
+        _response([{"id": 1}], {})
+        if params["page"] == 2
+        else _response(None, None, status_code=304)
+    )
+    validators = {"1": {"etag": '"v1"'}, "2": {"etag": '"v2"'}}
+
+    assert client.templates_not_modified({}, validators) is False
+
+
+def test_probe_templates_reads_count_and_latest_update(client, mocker):
+    mock_http = mocker.patch("src.clients.credly_client.http_client")
+    mock_http.get.return_value = _response(
+        [{"id": "t9", "updated_at": "2024-05-01T10:00:00"}], {"total_count": 42}
+    )
+
+    assert client.probe_templates({"page_size": 100}) == {
+        "total_count": 42,
+        "max_updated_at": "2024-05-01T10:00:00",
+    }
+    params = mock_http.get.call_args.kwargs["params"]
+    assert params == {"page": 1, "page_size": 1, "sort": "-updated_at"}
+
+
+def test_bounded_map_runs_concurrently_and_keeps_order():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(n):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return n * 2
+
+    results = list(bounded_map(work, range(8), max_workers=4))
+
+    assert results == [n * 2 for n in range(8)]
+    assert 1 < peak <= 4
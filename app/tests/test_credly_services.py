@@ -10,17 +10,45 @@ def mock_credly_client(mocker):
 
 @pytest.fixture
 def mock_credly_client_templates(mocker):
-    return mocker.patch("src.services.credly_templates_service.credly_client")
+    mock_client = mocker.patch("src.services.credly_templates_service.credly_client")
+    # Inconclusive probe unless a test says otherwise
+    mock_client.probe_templates.return_value = {}
+    return mock_client
 
 
 @pytest.fixture
 def mock_s3_writer(mocker):
-    return mocker.patch("src.services.credly_badges_service.s3_writer")
+    return _record_writes(mocker.patch("src.services.credly_badges_service.s3_writer"))
 
 
 @pytest.fixture
 def mock_s3_writer_templates(mocker):
-    return mocker.patch("src.services.credly_templates_service.s3_writer")
+    mock_writer = _record_writes(
+        mocker.patch("src.services.credly_templates_service.s3_writer")
+    )
+    # S3 state by (table, name, run_id); run_id None is the committed one
+    mock_writer.states = {}
+    mock_writer.save_state.side_effect = (
+        lambda table, name, state, date=None, run_id=None: (
+            mock_writer.states.__setitem__((table, name, run_id), state)
+        )
+    )
+    mock_writer.load_state.side_effect = (
+        lambda table, name, date=None, run_id=None: mock_writer.states.get(
+            (table, name, run_id)
+        )
+    )
+    mock_writer.save_fingerprints.side_effect = (
+        lambda table, state, date=None, run_id=None: mock_writer.save_state(
+            table, "fingerprints", state, date, run_id
+        )
+    )
+    mock_writer.load_fingerprints.side_effect = (
+        lambda table, date=None, run_id=None: mock_writer.load_state(
+            table, "fingerprints", date, run_id
+        )
+    )
+    return mock_writer
 
 
 @pytest.fixture
@@ -28,6 +56,53 @@ def mock_ssm_client(mocker):
     return mocker.patch("src.clients.ssm_client.ssm_client")
 
 
+def _record_writes(mock_writer):
+    """Makes write_parquet_batches consume its batches and remember the rows"""
+    mock_writer.written = []
+
+    def write(table_name, batches, *args, **kwargs):
+        rows = [row for batch in batches for row in _to_rows(batch)]
+        mock_writer.written.append((table_name, rows, args, kwargs))
+        return len(rows)
+
+    mock_writer.write_parquet_batches.side_effect = write
+    # Pending parts by (table, writer id), each a list of batches
+    mock_writer.pending = {}
+
+    def save_pending(name, date, writer_id, batches, rows, size, **kwargs):
+        parts = mock_writer.pending.setdefault((name, writer_id), [])
+        parts.append(list(batches))
+
+    def pending_parts(name, date, writer_id, **kwargs):
+        parts = mock_writer.pending.get((name, writer_id), [])
+        return [
+            {
+                "key": (name, writer_id, i),
+                "rows": sum(b.num_rows for b in part),
+                "bytes": 0,
+            }
+            for i, part in enumerate(parts)
+        ]
+
+    def iter_pending_part(key):
+        name, writer_id, i = key
+        return iter(mock_writer.pending[(name, writer_id)][i])
+
+    mock_writer.save_pending.side_effect = save_pending
+    mock_writer.pending_parts.side_effect = pending_parts
+    mock_writer.iter_pending_part.side_effect = iter_pending_part
+    mock_writer.delete_pending.side_effect = (
+        lambda name, date, writer_id, **kwargs: mock_writer.pending.pop(
+            (name, writer_id), None
+        )
+    )
+    return mock_writer
+
+
+def _to_rows(batch):
+    return batch if isinstance(batch, list) else batch.to_pylist()
+
+
 def test_badges_mapping(mock_credly_client, mock_s3_writer, mocker):
     # Mock SSM to avoid actual calls
     mock_ssm = mocker.patch("src.clients.ssm_client.ssm_client")
@@ -51,9 +126,8 @@ def test_badges_mapping(mock_credly_client, mock_s3_writer, mocker):
     service.process("daily")
 
     # Verify S3 write
-    mock_s3_writer.write_parquet.assert_called()
-    args, _ = mock_s3_writer.write_parquet.call_args
-    table_name, data, _, _ = args
+    assert len(mock_s3_writer.written) == 1
+    table_name, data, _, _ = mock_s3_writer.written[0]
 
     assert table_name == "badges_emitidas"
     assert len(data) == 1
@@ -64,7 +138,7 @@ def test_badges_mapping(mock_credly_client, mock_s3_writer, mocker):
     assert item["organization_name"] == "Acme"
 
 
-def test_templates_hash_validation(
+def test_templates_change_detection(
     mock_credly_client_templates, mock_s3_writer_templates, mock_ssm_client
 ):
     mock_data = [
@@ -77,38 +151,472 @@ def test_templates_hash_validation(
             "badge_template_activities": [{"id": "a1", "title": "Activity 1"}],
         }
     ]
-    # Return tuple: (items, next_page_url)
-    mock_credly_client_templates.get_templates.return_value = (mock_data, None)
+    # One page of templates per run
+    mock_credly_client_templates.iter_templates.side_effect = lambda *a, **k: iter(
+        [mock_data]
+    )
 
-    # Case 1: Hash mismatch (should write)
-    mock_ssm_client.get_parameter.return_value = {"payload_hash": "old_hash"}
+    # Case 1: No index yet (should write)
+    parameters = {"/credly/state/templates": {}}
+    mock_ssm_client.get_parameter.side_effect = lambda name: parameters.get(name, {})
+    mock_ssm_client.put_parameter.side_effect = (
+        lambda name, value, **kw: parameters.__setitem__(name, value)
+    )
 
     service = CredlyTemplatesService()
     result = service.process("daily")
 
     # Check calls
-    assert mock_s3_writer_templates.write_parquet.call_count >= 2
+    assert [w[0] for w in mock_s3_writer_templates.written] == [
+        "badges_templates",
+        "badges_templates_activities",
+    ]
     mock_ssm_client.put_parameter.assert_called_once()
 
     # Verify update metadata call
     args, kwargs = mock_ssm_client.put_parameter.call_args
     assert args[0] == "/credly/state/templates"
-    assert "payload_hash" in args[1]
+    assert args[1]["record_count"] == 1
     assert result["records_processed"] == 1
 
-    # Case 2: Hash match (should skip)
-    # Calculate expected hash for mock data
-    import hashlib
-
-    expected_hash = hashlib.sha256("100-2023-01-01T00:00:00".encode()).hexdigest()
-
-    mock_ssm_client.get_parameter.return_value = {"payload_hash": expected_hash}
+    # Case 2: Nothing changed since the indexed load (should skip)
     mock_s3_writer_templates.reset_mock()
-    mock_ssm_client.reset_mock()
+    mock_ssm_client.put_parameter.reset_mock()
 
     result = service.process("daily")
 
-    # Should NOT write to S3 or update SSM
-    mock_s3_writer_templates.write_parquet.assert_not_called()
+    # The new runs are dropped, the committed partitions stay, SSM untouched
+    mock_s3_writer_templates.commit_run.assert_not_called()
+    assert [c.args[0] for c in mock_s3_writer_templates.discard_run.call_args_list] == [
+        "badges_templates",
+        "badges_templates_activities",
+    ]
     mock_ssm_client.put_parameter.assert_not_called()
     assert result["records_processed"] == 0
+
+
+def test_templates_write_deltas_between_snapshots(
+    mock_credly_client_templates, mock_s3_writer_templates, mock_ssm_client, mocker
+):
+    import datetime
+
+    templates = {
+        n: {"id": n, "updated_at": "2024-01-01", "badge_template_activities": []}
+        for n in (1, 2, 3)
+    }
+    mock_credly_client_templates.iter_templates.side_effect = lambda *a, **k: iter(
+        [list(templates.values())]
+    )
+    mock_ssm_client.get_parameter.return_value = {}
+    today = mocker.patch("src.services.credly_templates_service.datetime")
+    today.date.today.return_value = datetime.date(2024, 5, 1)
+    today.date.fromisoformat = datetime.date.fromisoformat
+
+    def run():
+        mock_s3_writer_templates.written.clear()
+        mock_s3_writer_templates.commit_run.reset_mock()
+        CredlyTemplatesService().process("daily")
+        rows = [
+            row["badge_template_id"]
+            for table, batch, _, _ in mock_s3_writer_templates.written
+            if table == "badges_templates"
+            for row in batch
+        ]
+        extras = [c.args[3] for c in mock_s3_writer_templates.commit_run.call_args_list]
+        return rows, extras[0] if extras else None
+
+    # First load: full snapshot
+    rows, extra = run()
+    assert rows == ["1", "2", "3"]
+    assert extra == {"load": "snapshot", "deleted_ids": []}
+
+    # Next day: one edit, one deletion -> one row
+    today.date.today.return_value = datetime.date(2024, 5, 2)
+    templates[2] = {**templates[2], "updated_at": "2024-05-02"}
+    del templates[3]
+    rows, extra = run()
+    assert rows == ["2"]
+    assert extra == {"load": "delta", "deleted_ids": ["3"]}
+
+    # Same day again: the partition's delta is rewritten, not lost
+    templates[1] = {**templates[1], "updated_at": "2024-05-02"}
+    rows, extra = run()
+    assert sorted(rows) == ["1", "2"]
+    assert extra == {"load": "delta", "deleted_ids": ["3"]}
+
+    # Snapshot interval reached: everything is written even if nothing changed
+    today.date.today.return_value = datetime.date(2024, 5, 8)
+    rows, extra = run()
+    assert rows == ["1", "2"]
+    assert extra["load"] == "snapshot"
+
+
+def test_templates_continue_across_invocations(
+    mock_credly_client_templates, mock_s3_writer_templates, mock_ssm_client
+):
+    from src.utils.time_budget import TimeBudget
+
+    pages = {
+        n: [{"id": n, "name": f"Template {n}", "updated_at": "2024-01-01"}]
+        for n in (1, 2, 3)
+    }
+
+    fetched = []
+
+    def fake_iter(params, page_limit=None, validators=None, start_page=None, **kw):
+        kw["page_info"]["total_pages"] = 3
+        for n in range(start_page, 4):
+            fetched.append(n)
+            validators[str(n)] = {"etag": f'"v{n}"'}
+            yield pages[n]
+
+    mock_credly_client_templates.iter_templates.side_effect = fake_iter
+    mock_s3_writer_templates.start_run.side_effect = ["run-t", "run-a"]
+    parameters = {}
+    mock_ssm_client.get_parameter.side_effect = lambda name: parameters.get(name, {})
+    mock_ssm_client.put_parameter.side_effect = (
+        lambda name, value, **kw: parameters.__setitem__(name, value)
+    )
+
+    # Room for a single page per invocation
+    budget = TimeBudget(1.0)
+    budget.allows_another_page = lambda reserved_pages=0: False
+    service = CredlyTemplatesService()
+
+    result = service.process("daily", time_budget=budget)
+    assert result == {"records_processed": 1, "next_page": "2"}
+    # Stopping downloads no page beyond the last one processed
+    assert fetched == [1]
+    mock_s3_writer_templates.commit_run.assert_not_called()
+    assert "/credly/state/templates" not in parameters
+
+    result = service.process("daily", page="2", time_budget=budget)
+    assert result == {"records_processed": 1, "next_page": "3"}
+
+    # A stale continuation is refused
+    with pytest.raises(ValueError):
+        service.process("daily", page="2")
+
+    result = service.process("daily", page="3")
+    assert result == {"records_processed": 1, "next_page": None}
+
+    # Every invocation writes into the runs opened by the first one
+    assert mock_s3_writer_templates.start_run.call_count == 2
+    assert [
+        (c.args[0], c.args[2])
+        for c in mock_s3_writer_templates.commit_run.call_args_list
+    ] == [("badges_templates", "run-t"), ("badges_templates_activities", "run-a")]
+    written = [
+        row["badge_template_id"]
+        for table, rows, _, _ in mock_s3_writer_templates.written
+        if table == "badges_templates"
+        for row in rows
+    ]
+    assert written == ["1", "2", "3"]
+
+    state = parameters["/credly/state/templates"]
+    assert state["record_count"] == 3
+    # Validators of every invocation's pages, carried through the run
+    assert mock_s3_writer_templates.states[
+        ("badges_templates", "page_validators", None)
+    ] == {str(n): {"etag": f'"v{n}"'} for n in (1, 2, 3)}
+    assert parameters["/credly/state/templates/progress"] == {"next_page": None}
+
+
+def test_badges_time_budget_pulls_pages_until_exhausted(
+    mock_credly_client, mock_s3_writer, mock_ssm_client
+):
+    from src.utils.time_budget import TimeBudget
+
+    mock_ssm_client.get_parameter.return_value = {}
+    mock_credly_client.get_badges.side_effect = [
+        ([{"id": 1}], "http://page-2"),
+        ([{"id": 2}], "http://page-3"),
+        ([{"id": 3}], None),
+    ]
+
+    service = CredlyBadgesService()
+    result = service.process("daily", time_budget=TimeBudget(60))
+
+    assert result == {"records_processed": 3, "next_page": None}
+    # The three pages are buffered into a single file
+    assert len(mock_s3_writer.written) == 1
+    assert len(mock_s3_writer.written[0][1]) == 3
+    # Watermark is read and written once per invocation, not per page
+    mock_ssm_client.get_parameter.assert_called_once()
+    mock_ssm_client.put_parameter.assert_called_once()
+    # One run, committed once the last page is written
+    mock_s3_writer.start_run.assert_called_once()
+    run_id = mock_s3_writer.start_run.return_value
+    assert mock_s3_writer.written[0][3]["run_id"] == run_id
+    mock_s3_writer.commit_run.assert_called_once_with(
+        "badges_emitidas", mock_s3_writer.start_run.call_args.args[1], run_id
+    )
+
+
+def test_badges_time_budget_stops_and_returns_next_page(
+    mock_credly_client, mock_s3_writer, mock_ssm_client
+):
+    from src.utils.time_budget import TimeBudget
+
+    mock_credly_client.get_badges.return_value = ([{"id": 1}], "http://page-2")
+
+    service = CredlyBadgesService()
+    result = service.process("historical", time_budget=TimeBudget(0))
+
+    assert result == {"records_processed": 1, "next_page": "http://page-2"}
+    mock_credly_client.get_badges.assert_called_once()
+    # Not enough rows for a file yet: they are carried to the next invocation
+    mock_s3_writer.write_parquet_batches.assert_not_called()
+    ((batch,),) = mock_s3_writer.pending[("badges_emitidas", "default")]
+    rows = _to_rows(batch)
+    assert [row["badge_id"] for row in rows] == ["1"]
+    # The run stays open until the last page
+    mock_s3_writer.commit_run.assert_not_called()
+
+
+def test_badges_continuation_writes_into_open_run(
+    mock_credly_client, mock_s3_writer, mock_ssm_client
+):
+    mock_ssm_client.get_parameter.return_value = {
+        "next_page": "http://page-2",
+        "partition_date": "2024-05-01",
+        "run_id": "run-1",
+    }
+    mock_s3_writer.current_run.return_value = "run-1"
+    mock_credly_client.get_badges.return_value = ([{"id": 1}], None)
+    service = CredlyBadgesService()
+
+    service.process("historical", page="http://page-2", is_first_page=False)
+
+    mock_s3_writer.start_run.assert_not_called()
+    assert mock_s3_writer.written[0][3]["run_id"] == "run-1"
+    mock_s3_writer.commit_run.assert_called_once()
+
+    # The run was replaced by another load: nothing is written into it
+    mock_s3_writer.current_run.return_value = "run-2"
+    mock_s3_writer.reset_mock(return_value=False)
+    with pytest.raises(ValueError):
+        service.process("historical", page="http://page-2", is_first_page=False)
+    mock_s3_writer.commit_run.assert_not_called()
+
+
+def test_badges_continuation_keeps_the_partition_of_the_first_page(
+    mock_credly_client, mock_s3_writer, mock_ssm_client, mocker
+):
+    import datetime
+
+    from src.utils.time_budget import TimeBudget
+
+    parameters = {}
+    mock_ssm_client.get_parameter.side_effect = lambda name: parameters.get(name, {})
+    mock_ssm_client.put_parameter.side_effect = (
+        lambda name, value, **kw: parameters.__setitem__(name, value)
+    )
+    mock_credly_client.get_badges.side_effect = [
+        ([{"id": 1}], "http://page-2"),
+        ([{"id": 2}], None),
+    ]
+    mock_s3_writer.start_run.return_value = "run-1"
+    mock_s3_writer.current_run.return_value = "run-1"
+    today = [datetime.date(2024, 5, 1)]
+
+    class Clock(datetime.date):
+        @classmethod
+        def today(cls):
+            return today[0]
+
+    mocker.patch.object(datetime, "date", Clock)
+    service = CredlyBadgesService()
+
+    result = service.process("historical", time_budget=TimeBudget(0))
+    # The next invocation runs after midnight
+    today[0] = Clock(2024, 5, 2)
+    service.process("historical", page=result["next_page"], is_first_page=False)
+
+    dates = {c.args[1] for c in mock_s3_writer.save_pending.call_args_list}
+    dates |= {c.args[1] for c in mock_s3_writer.pending_parts.call_args_list}
+    dates |= {args[0] for _, _, args, _ in mock_s3_writer.written}
+    dates |= {c.args[1] for c in mock_s3_writer.commit_run.call_args_list}
+    assert dates == {datetime.date(2024, 5, 1)}
+    # Both invocations wrote into the run of the first page
+    assert {kw["run_id"] for _, _, _, kw in mock_s3_writer.written} == {"run-1"}
+    assert parameters["/credly/state/badges/progress"]["next_page"] is None
+
+    # A stale continuation is refused
+    with pytest.raises(ValueError):
+        service.process("historical", page="http://page-2", is_first_page=False)
+
+
+def test_badges_watermark_moves_only_when_the_load_is_committed(
+    mock_credly_client, mock_s3_writer, mock_ssm_client, mocker
+):
+    import datetime
+
+    from src.utils.time_budget import TimeBudget
+
+    parameters = {"/credly/watermark/badges": {"watermark": "2024-05-01 00:00:00"}}
+    mock_ssm_client.get_parameter.side_effect = lambda name: parameters.get(name, {})
+    mock_ssm_client.put_parameter.side_effect = (
+        lambda name, value, **kw: parameters.__setitem__(name, value)
+    )
+    mock_credly_client.get_badges.side_effect = [
+        ([{"id": 1}], "http://page-2"),
+        ([{"id": 2}], None),
+    ]
+    mock_s3_writer.start_run.return_value = "run-1"
+    mock_s3_writer.current_run.return_value = "run-1"
+    now = [datetime.datetime(2024, 5, 2, 6, 0, 0)]
+
+    class Clock(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now[0]
+
+    mocker.patch.object(datetime, "datetime", Clock)
+    service = CredlyBadgesService()
+
+    result = service.process("daily", time_budget=TimeBudget(0))
+
+    mock_s3_writer.commit_run.assert_not_called()
+    assert parameters["/credly/watermark/badges"]["watermark"] == (
+        "2024-05-01 00:00:00"
+    )
+
+    # The continuation runs an hour later but keeps the first page's window
+    now[0] = datetime.datetime(2024, 5, 2, 7, 0, 0)
+    service.process("daily", page=result["next_page"], is_first_page=False)
+
+    mock_s3_writer.commit_run.assert_called_once()
+    params = mock_credly_client.get_badges.call_args.args[0]
+    assert params["end_date"] == "2024-05-02 06:00:00"
+    assert parameters["/credly/watermark/badges"]["watermark"] == (
+        "2024-05-02 06:00:00"
+    )
+
+
+def test_badges_pages_are_archived_raw_in_the_run(
+    mock_credly_client, mock_s3_writer, mock_ssm_client, monkeypatch
+):
+    page = [{"id": 1, "public": True}]
+    mock_credly_client.get_badges.return_value = (page, None)
+
+    CredlyBadgesService().process("historical")
+    monkeypatch.setenv("RAW_ARCHIVE_ENABLED", "false")
+    CredlyBadgesService().process("historical")
+
+    (call,) = mock_s3_writer.archive_page.call_args_list
+    table, _, run_id, items = call.args
+    assert table == "badges_emitidas"
+    assert run_id == mock_s3_writer.start_run.return_value
+    assert items == page
+
+
+def test_templates_short_circuit_when_not_modified(
+    mock_credly_client_templates, mock_s3_writer_templates, mock_ssm_client
+):
+    mock_ssm_client.get_parameter.return_value = {"record_count": 1}
+    mock_s3_writer_templates.states[("badges_templates", "page_validators", None)] = {
+        "1": {"etag": '"abc"'}
+    }
+    mock_credly_client_templates.templates_not_modified.return_value = True
+
+    result = CredlyTemplatesService().process("daily")
+
+    assert result["records_processed"] == 0
+    mock_credly_client_templates.iter_templates.assert_not_called()
+    mock_s3_writer_templates.write_parquet_batches.assert_not_called()
+    mock_ssm_client.put_parameter.assert_not_called()
+    mock_s3_writer_templates.load_fingerprints.assert_not_called()
+
+
+def test_templates_historical_ignores_not_modified_pages(
+    mock_credly_client_templates, mock_s3_writer_templates, mock_ssm_client
+):
+    mock_ssm_client.get_parameter.return_value = {"record_count": 1}
+    mock_s3_writer_templates.states[("badges_templates", "page_validators", None)] = {
+        "1": {"etag": '"abc"'}
+    }
+    mock_credly_client_templates.templates_not_modified.return_value = True
+    mock_credly_client_templates.iter_templates.side_effect = lambda *a, **k: iter(
+        [[{"id": 1, "updated_at": "2024-01-01"}]]
+    )
+
+    result = CredlyTemplatesService().process("historical")
+
+    assert result["records_processed"] == 1
+    mock_credly_client_templates.templates_not_modified.assert_not_called()
+    assert mock_s3_writer_templates.commit_run.call_count == 2
+
+
+def test_templates_probe_skips_download_when_nothing_moved(
+    mock_credly_client_templates, mock_s3_writer_templates, mock_ssm_client
+):
+    mock_ssm_client.get_parameter.return_value = {
+        "record_count": 3,
+        "max_updated_at": "2024-05-01T10:00:00",
+    }
+    mock_s3_writer_templates.states[("badges_templates", "page_validators", None)] = {
+        "1": {"etag": '"abc"'}
+    }
+    mock_credly_client_templates.probe_templates.return_value = {
+        "total_count": 3,
+        "max_updated_at": "2024-05-01T10:00:00",
+    }
+
+    result = CredlyTemplatesService().process("daily")
+
+    assert result["records_processed"] == 0
+    mock_credly_client_templates.templates_not_modified.assert_not_called()
+    mock_credly_client_templates.iter_templates.assert_not_called()
+    mock_s3_writer_templates.start_run.assert_not_called()
+    mock_s3_writer_templates.load_fingerprints.assert_not_called()
+
+
+def test_templates_probe_triggers_download_when_something_moved(
+    mock_credly_client_templates, mock_s3_writer_templates, mock_ssm_client
+):
+    mock_ssm_client.get_parameter.return_value = {
+        "record_count": 1,
+        "max_updated_at": "2024-05-01T10:00:00",
+    }
+    mock_s3_writer_templates.states[("badges_templates", "page_validators", None)] = {
+        "1": {"etag": '"abc"'}
+    }
+    mock_credly_client_templates.probe_templates.return_value = {
+        "total_count": 1,
+        "max_updated_at": "2024-05-02T08:00:00",
+    }
+    mock_credly_client_templates.iter_templates.side_effect = lambda *a, **k: iter(
+        [[{"id": 1, "updated_at": "2024-05-02T08:00:00"}]]
+    )
+
+    result = CredlyTemplatesService().process("daily")
+
+    assert result["records_processed"] == 1
+    # The probe already answered; no per-page conditional requests
+    mock_credly_client_templates.templates_not_modified.assert_not_called()
+    state = mock_ssm_client.put_parameter.call_args.args[1]
+    assert state["record_count"] == 1
+    assert state["max_updated_at"] == "2024-05-02T08:00:00"
+
+
+def test_templates_persist_page_validators(
+    mock_credly_client_templates, mock_s3_writer_templates, mock_ssm_client
+):
+    mock_ssm_client.get_parameter.return_value = {}
+
+    def fake_iter(params, page_limit=None, validators=None, **kwargs):
+        validators["1"] = {"etag": '"abc"'}
+        return iter([[{"id": 1, "updated_at": "2024-01-01"}]])
+
+    mock_credly_client_templates.iter_templates.side_effect = fake_iter
+
+    CredlyTemplatesService().process("daily")
+
+    # In S3 next to the fingerprints: one entry per page outgrows SSM
+    assert mock_s3_writer_templates.states[
+        ("badges_templates", "page_validators", None)
+    ] == {"1": {"etag": '"abc"'}}
+    state = mock_ssm_client.put_parameter.call_args.args[1]
+    assert "page_validators" not in state
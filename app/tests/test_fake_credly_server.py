@@ -0,0 +1,99 @@
+import os
+import sys
+
+import pytest
+
+# The fake server lives in scripts/, next to the other local tooling
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from scripts.fake_credly_server import FakeCredlyConfig, FakeCredlyServer
+from src.clients.credly_client import CredlyClient
+from src.clients.http_client import http_client
+from src.clients.throttler import AdaptiveThrottler
+
+
+@pytest.fixture
+def fake_credly():
+    config = FakeCredlyConfig(badges=2_500, templates=230, page_size=1000)
+    with FakeCredlyServer(config) as server:
+        yield server
+
+
+@pytest.fixture
+def client(fake_credly, monkeypatch, mocker):
+    monkeypatch.setenv("CREDLY_BASE_URL", fake_credly.base_url)
+    monkeypatch.setenv("CREDLY_ORG_ID", "org-00001")
+    provider = mocker.patch("src.clients.credly_client.get_token_provider")
+    provider.return_value.get_auth_headers.side_effect = lambda: {}
+    # Fresh, fast throttler so injected 429s do not slow down other tests
+    mocker.patch.object(
+        http_client,
+        "throttler",
+        AdaptiveThrottler(
+            initial_rate=500, min_rate=100, max_rate=1000, max_concurrency=4
+        ),
+    )
+    return CredlyClient()
+
+
+def test_badges_cursor_walks_every_record(client):
+    items, next_page = client.get_badges({"start_date": "2000-01-01 00:00:00"})
+    total = len(items)
+    pages = 1
+    while next_page:
+        assert "badge_format=minimal" in next_page
+        items, next_page = client.get_badges(page_url=next_page)
+        total += len(items)
+        pages += 1
+
+    assert total == 2_500
+    assert pages == 3
+
+
+def test_badge_date_windows_partition_the_records(client):
+    windows = [
+        ("2015-01-01 00:00:00", "2019-12-31 23:59:59"),
+        ("2020-01-01 00:00:00", "2025-01-01 00:00:00"),
+    ]
+    counts = client.count_badges(
+        [{"start_date": start, "end_date": end} for start, end in windows]
+    )
+
+    assert sum(counts) == 2_500
+    # Badges get denser over time
+    assert counts[1] > counts[0]
+
+
+def test_templates_pages_and_conditional_requests(client, fake_credly):
+    validators = {}
+    pages = list(client.iter_templates({"page_size": 100}, validators=validators))
+
+    assert [len(page) for page in pages] == [100, 100, 30]
+    assert set(validators) == {"1", "2", "3"}
+    assert client.templates_not_modified({"page_size": 100}, validators) is True
+
+    fake_credly.data.touch_template(150)
+    assert client.templates_not_modified({"page_size": 100}, validators) is False
+
+
+def test_templates_probe_sees_an_edit(client, fake_credly):
+    before = client.probe_templates()
+    assert before["total_count"] == 230
+
+    # The fake's edits add an hour; the newest template stays the newest
+    fake_credly.data.touch_template(229)
+    after = client.probe_templates()
+
+    assert after["total_count"] == 230
+    assert after["max_updated_at"] > before["max_updated_at"]
+
+
+def test_injected_rate_limits_are_retried(client, fake_credly, monkeypatch):
+    monkeypatch.setenv("MAX_RETRIES", "10")
+    fake_credly.config.error_rate_429 = 0.3
+    fake_credly.config.retry_after = 0
+
+    pages = list(client.iter_templates({"page_size": 10}))
+
+    assert sum(len(page) for page in pages) == 230
+    assert fake_credly.counters.get("429", 0) > 0
@@ -0,0 +1,107 @@
+import pytest
+from src.utils.field_mapping import FieldMapping
+
+ITEMS = [
+    {
+        "id": 1,
+        "name": "Cloud",
+        "owner": {"id": 9, "name": "Acme"},
+        "skills": [{"name": "AWS"}, "Python"],
+        "reporting_tags": ["t1"],
+        "updated_at": "2024-05-01T10:00:00",
+        "activities": [{"id": "a1"}, {"id": "a2"}],
+    },
+    {"id": 2, "owner": None, "activities": None},
+]
+
+
+def test_rows_follow_nested_paths_and_defaults():
+    mapping = FieldMapping(
+        "badges_templates",
+        [
+            ("badge_template_id", "id", "str", ""),
+            ("name", "name", None, "n/a"),
+            ("organization_id", "owner.id", "str", ""),
+            ("skills", "skills", "names", []),
+            ("reporting_tags", "reporting_tags", "list", ""),
+        ],
+    )
+
+    assert mapping.rows(ITEMS, 1) == [
+        {
+            "badge_template_id": "1",
+            "name": "Cloud",
+            "organization_id": "9",
+            "skills": "AWS;Python",
+            "reporting_tags": "['t1']",
+        },
+        {
+            "badge_template_id": "2",
+            "name": "n/a",
+            "organization_id": "",
+            "skills": "",
+            "reporting_tags": "",
+        },
+    ]
+    # Typed columns keep list items whole
+    assert [row["skills"] for row in mapping.rows(ITEMS, 2)] == [["AWS", "Python"], []]
+
+
+def test_record_batch_matches_rows_and_fills_missing_columns():
+    from src.utils.parquet_schemas import to_record_batch
+
+    mapping = FieldMapping(
+        "badges_templates",
+        [
+            ("badge_template_id", "id", "str", ""),
+            ("skills", "skills", "names", []),
+            ("updated_at", "updated_at", None, ""),
+        ],
+    )
+
+    for version in (1, 2):
+        batch = mapping.record_batch(ITEMS, version)
+        expected = to_record_batch(
+            "badges_templates", mapping.rows(ITEMS, version), version
+        )
+        assert batch.equals(expected)
+        assert batch.column("name").null_count == 2
+
+
+def test_explode_maps_one_row_per_element_with_parent_fields():
+    mapping = FieldMapping(
+        "badges_templates_activities",
+        [
+            ("badge_template_id", "parent.id", "str", ""),
+            ("badge_template_activity_id", "id", "str", ""),
+        ],
+        explode="activities",
+    )
+
+    assert mapping.rows(ITEMS, 1) == [
+        {"badge_template_id": "1", "badge_template_activity_id": "a1"},
+        {"badge_template_id": "1", "badge_template_activity_id": "a2"},
+    ]
+    assert mapping.record_batch(ITEMS[1:], 1).num_rows == 0
+
+
+def test_list_positions_in_paths():
+    mapping = FieldMapping(
+        "badges_emitidas", [("organization_name", "issuer.entities.0.name", None, "")]
+    )
+    items = [
+        {"issuer": {"entities": [{"name": "Acme"}, {"name": "Other"}]}},
+        {"issuer": {"entities": []}},
+        {},
+    ]
+
+    assert [row["organization_name"] for row in mapping.rows(items, 1)] == [
+        "Acme",
+        "",
+        "",
+    ]
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        FieldMapping("badges_emitidas", [("badge_id", "id", "int", "")])
@@ -28,7 +28,7 @@ def test_lambda_handler_badges_success(mock_badges_service):
     assert result["body"]["records_processed"] == 100
     assert result["body"]["next_page"] is None
     mock_badges_service.process.assert_called_once_with(
-        "daily", page=None, is_first_page=True
+        "daily", page=None, is_first_page=True, time_budget=None
     )
 
 
@@ -45,7 +45,7 @@ def test_lambda_handler_badges_with_page(mock_badges_service):
     assert result["statusCode"] == 200
     assert result["body"]["next_page"] == "http://next-page"
     mock_badges_service.process.assert_called_once_with(
-        "historical", page="http://current-page", is_first_page=False
+        "historical", page="http://current-page", is_first_page=False, time_budget=None
     )
 
 
@@ -61,7 +61,9 @@ def test_lambda_handler_templates_success(mock_templates_service):
 
     assert result["statusCode"] == 200
     assert result["body"]["records_processed"] == 25
-    mock_templates_service.process.assert_called_once_with("daily")
+    mock_templates_service.process.assert_called_once_with(
+        "daily", page=None, time_budget=None
+    )
 
 
 def test_lambda_handler_missing_load_type():
@@ -88,3 +90,89 @@ def test_lambda_handler_service_exception(mock_badges_service):
 
     with pytest.raises(RuntimeError, match="API Error"):
         lambda_handler(event, None)
+
+
+def test_lambda_handler_badges_plan_shards(mock_badges_service):
+    """Test that a shard count plans shards instead of fetching a page"""
+    mock_badges_service.plan_shards.return_value = {
+        "records_processed": 0,
+        "next_page": None,
+        "shards": [{"shard_id": "000"}],
+    }
+
+    event = {"load_type": "badges", "mode": "historical", "shards": 4}
+    result = lambda_handler(event, None)
+
+    assert result["body"]["shards"] == [{"shard_id": "000"}]
+    mock_badges_service.plan_shards.assert_called_once_with("historical", 4)
+    mock_badges_service.process.assert_not_called()
+
+
+def test_lambda_handler_badges_shard_page(mock_badges_service):
+    """Test that a shard descriptor routes to shard processing"""
+    mock_badges_service.process_shard.return_value = {
+        "records_processed": 10,
+        "next_page": "http://next-page",
+    }
+    shard = {"shard_id": "001"}
+
+    event = {"load_type": "badges", "mode": "historical", "shard": shard}
+    result = lambda_handler(event, None)
+
+    assert result["body"]["next_page"] == "http://next-page"
+    assert "shards" not in result["body"]
+    mock_badges_service.process_shard.assert_called_once_with(
+        "historical", shard, page=None, time_budget=None
+    )
+
+
+def test_lambda_handler_badges_time_budget(mock_badges_service):
+    """Test that a Lambda context with a budget ratio enables multi-page runs"""
+    mock_badges_service.process.return_value = {
+        "records_processed": 300,
+        "next_page": "http://next-page",
+    }
+    context = MagicMock()
+    context.get_remaining_time_in_millis.return_value = 900_000
+
+    event = {"load_type": "badges", "mode": "daily", "time_budget_ratio": 0.8}
+    result = lambda_handler(event, context)
+
+    assert result["body"]["next_page"] == "http://next-page"
+    time_budget = mock_badges_service.process.call_args.kwargs["time_budget"]
+    assert time_budget is not None
+
+
+def test_lambda_handler_compaction(mocker):
+    import datetime
+
+    service = mocker.patch("lambda_function.compaction_service")
+    service.compact.return_value = {
+        "records_processed": 10,
+        "duplicates_removed": 2,
+        "files_before": 40,
+        "files_after": 1,
+    }
+
+    result = lambda_handler(
+        {"load_type": "compaction", "partition_date": "2024-05-01"}, None
+    )
+
+    service.compact.assert_called_once_with(
+        "badges_emitidas", datetime.date(2024, 5, 1)
+    )
+    assert result["body"]["records_processed"] == 10
+    assert result["body"]["duplicates_removed"] == 2
+    assert result["body"]["files_after"] == 1
+    assert result["body"]["skipped"] is False
+
+    # An empty partition is reported as skipped
+    service.compact.return_value = {
+        "records_processed": 0,
+        "duplicates_removed": 0,
+        "files_before": 0,
+        "files_after": 0,
+        "skipped": True,
+    }
+    result = lambda_handler({"load_type": "compaction"}, None)
+    assert result["body"]["skipped"] is True
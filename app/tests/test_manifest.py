@@ -0,0 +1,67 @@
+import pyarrow as pa
+
+from src.utils.manifest import batch_stats, files_in_range, merge_stats
+
+
+def test_batch_stats_ignore_empty_and_missing_values():
+    batch = pa.RecordBatch.from_pydict(
+        {
+            "badge_id": ["b", "", "a", None],
+            "updated_at": ["2024-01-02", "2024-01-01", "", "2024-03-01"],
+            "state": ["accepted", "", "", ""],
+        }
+    )
+
+    assert batch_stats(batch) == {
+        "badge_id": {"min": "a", "max": "b"},
+        "updated_at": {"min": "2024-01-01", "max": "2024-03-01"},
+    }
+
+
+def test_batch_stats_serialise_typed_timestamps():
+    import datetime
+
+    batch = pa.RecordBatch.from_pydict(
+        {"issued_at": pa.array([datetime.datetime(2024, 1, 1)], pa.timestamp("us"))}
+    )
+
+    assert batch_stats(batch) == {
+        "issued_at": {"min": "2024-01-01T00:00:00", "max": "2024-01-01T00:00:00"}
+    }
+
+
+def test_merge_stats():
+    merged = merge_stats(
+        [
+            {"badge_id": {"min": "b", "max": "c"}},
+            None,
+            {
+                "badge_id": {"min": "a", "max": "b"},
+                "issued_at": {"min": "x", "max": "y"},
+            },
+        ]
+    )
+
+    assert merged == {
+        "badge_id": {"min": "a", "max": "c"},
+        "issued_at": {"min": "x", "max": "y"},
+    }
+
+
+def test_files_in_range_prunes_by_min_max():
+    manifest = {
+        "files": [
+            {
+                "key": "old",
+                "stats": {"updated_at": {"min": "2023-01", "max": "2023-12"}},
+            },
+            {
+                "key": "new",
+                "stats": {"updated_at": {"min": "2024-01", "max": "2024-06"}},
+            },
+            {"key": "unknown", "stats": {}},
+        ]
+    }
+
+    assert files_in_range(manifest, "updated_at", low="2024-02") == ["new", "unknown"]
+    assert files_in_range(manifest, "updated_at", high="2023-06") == ["old", "unknown"]
@@ -0,0 +1,103 @@
+import datetime
+import io
+
+import pyarrow.parquet as pq
+import pytest
+from botocore.exceptions import ClientError
+
+from src.clients.object_stores import (
+    InMemoryObjectStore,
+    LocalObjectStore,
+    get_object_store,
+    reset_object_stores,
+)
+from src.utils.s3_multipart import MIN_PART_SIZE, S3MultipartSink
+from src.utils.s3_writer import S3Writer
+
+PARTITION = datetime.date(2024, 5, 1)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stores():
+    reset_object_stores()
+    yield
+    reset_object_stores()
+
+
+def test_output_sink_setting_selects_the_store(monkeypatch, tmp_path, mocker):
+    get_client = mocker.patch("src.clients.aws.get_client")
+
+    monkeypatch.setenv("OUTPUT_SINK", "memory")
+    memory = get_object_store()
+    monkeypatch.setenv("OUTPUT_SINK", "local")
+    monkeypatch.setenv("OUTPUT_LOCAL_DIR", str(tmp_path))
+    local = get_object_store()
+    monkeypatch.setenv("OUTPUT_SINK", "s3")
+    s3 = get_object_store()
+
+    assert isinstance(memory, InMemoryObjectStore)
+    assert get_object_store() is s3 is get_client.return_value
+    assert isinstance(local, LocalObjectStore) and local.root == str(tmp_path)
+    monkeypatch.setenv("OUTPUT_SINK", "ftp")
+    with pytest.raises(ValueError):
+        get_object_store()
+
+
+def test_local_store_keeps_the_partition_layout(monkeypatch, tmp_path):
+    monkeypatch.setenv("S3_BUCKET_NAME", "bucket")
+    writer = object.__new__(S3Writer)
+    writer._setup(LocalObjectStore(str(tmp_path)))
+
+    run_id = writer.start_run("badges_emitidas", PARTITION)
+    writer.write_parquet(
+        "badges_emitidas", [{"badge_id": "1"}], PARTITION, 1, run_id=run_id
+    )
+    manifest = writer.commit_run("badges_emitidas", PARTITION, run_id)
+
+    partition = tmp_path / "bucket" / "raw" / "badges_emitidas" / "anomesdia=20240501"
+    assert (partition / "_manifest.json").is_file()
+    (key,) = writer.committed_files("badges_emitidas", PARTITION)
+    assert key == manifest["files"][0]["key"]
+    table = pq.read_table(tmp_path / "bucket" / key)
+    assert table.column("badge_id").to_pylist() == ["1"]
+    # Staging (run marker, stats) is cleaned up after the commit
+    assert not (tmp_path / "bucket" / "staging").exists()
+
+
+@pytest.mark.parametrize("make_store", ["memory", "local"])
+def test_stores_answer_like_s3(make_store, tmp_path):
+    store = (
+        InMemoryObjectStore()
+        if make_store == "memory"
+        else LocalObjectStore(str(tmp_path))
+    )
+    for key in ("a/1.txt", "a/b/2.txt", "c.txt"):
+        store.put_object(Bucket="bucket", Key=key, Body=b"data")
+
+    listing = store.list_objects_v2(Bucket="bucket", Prefix="a/", Delimiter="/")
+    assert [o["Key"] for o in listing["Contents"]] == ["a/1.txt"]
+    assert listing["CommonPrefixes"] == [{"Prefix": "a/b/"}]
+
+    store.copy_object(
+        Bucket="bucket",
+        Key="d/1.txt",
+        CopySource={"Bucket": "bucket", "Key": "a/1.txt"},
+    )
+    assert store.get_object(Bucket="bucket", Key="d/1.txt")["Body"].read() == b"data"
+
+    with S3MultipartSink(store, "bucket", "big.bin", part_size=MIN_PART_SIZE) as sink:
+        for _ in range(3):
+            sink.write(b"x" * MIN_PART_SIZE)
+    body = store.get_object(Bucket="bucket", Key="big.bin")["Body"].read()
+    assert len(body) == 3 * MIN_PART_SIZE
+
+    store.delete_objects(Bucket="bucket", Delete={"Objects": [{"Key": "c.txt"}]})
+    with pytest.raises(ClientError) as error:
+        store.get_object(Bucket="bucket", Key="c.txt")
+    assert error.value.response["Error"]["Code"] == "NoSuchKey"
+    assert (
+        store.get_object(Bucket="bucket", Key="a/1.txt", Range="bytes=1-2")[
+            "Body"
+        ].read()
+        == b"at"
+    )
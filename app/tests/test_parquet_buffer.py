@@ -0,0 +1,216 @@
+import datetime
+import io
+import re
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils.parquet_buffer import BufferedParquetWriter
+from src.utils.parquet_schemas import get_schema
+
+PARTITION = datetime.date(2024, 5, 1)
+
+
+@pytest.fixture(autouse=True)
+def buffer_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("PARQUET_SPILL_DIR", str(tmp_path))
+    monkeypatch.setenv("PARQUET_ROW_GROUP_ROWS", "10")
+
+
+def _rows(start, count):
+    return [
+        {"badge_id": str(i), "state": "accepted"} for i in range(start, start + count)
+    ]
+
+
+def _parquet_files(s3):
+    return {
+        key: pq.read_table(io.BytesIO(body))
+        for (_, key), body in s3.objects.items()
+        if key.endswith(".parquet")
+    }
+
+
+def test_buffers_pages_into_files_of_target_rows(writer, s3, monkeypatch):
+    monkeypatch.setenv("PARQUET_TARGET_FILE_ROWS", "25")
+    buffer = BufferedParquetWriter(writer, "badges_emitidas", PARTITION)
+
+    for page in range(6):
+        buffer.add(_rows(page * 10, 10))
+    buffer.close()
+
+    files = _parquet_files(s3)
+    assert sorted(t.num_rows for t in files.values()) == [30, 30]
+    table = next(iter(files.values()))
+    assert table.schema.equals(get_schema("badges_emitidas"))
+    # One row group per PARQUET_ROW_GROUP_ROWS rows
+    key = next(iter(files))
+    metadata = pq.ParquetFile(io.BytesIO(s3.objects[("bucket", key)])).metadata
+    assert metadata.num_row_groups == 3
+
+
+def test_spills_to_disk_and_keeps_row_order(writer, s3, monkeypatch, tmp_path):
+    monkeypatch.setenv("PARQUET_BUFFER_MEMORY_MB", "0")
+    buffer = BufferedParquetWriter(writer, "badges_emitidas", PARTITION)
+
+    buffer.add(_rows(0, 5))
+    buffer.add(_rows(5, 5))
+    assert buffer._spill is not None
+    buffer.close()
+
+    (table,) = _parquet_files(s3).values()
+    assert table.column("badge_id").to_pylist() == [str(i) for i in range(10)]
+
+
+def _pending_parts(s3):
+    return sorted(
+        key
+        for _, key in s3.objects
+        if key.startswith("staging/badges_emitidas/anomesdia=20240501/pending-001/")
+    )
+
+
+def test_carries_pending_rows_across_invocations(writer, s3, mocker):
+    first = BufferedParquetWriter(writer, "badges_emitidas", PARTITION, "001")
+    first.add(_rows(0, 3))
+    first.close(final=False)
+
+    assert _parquet_files(s3) == {}
+    (part,) = _pending_parts(s3)
+    assert re.search(r"/part-\d+-\w+-3r-\d+b\.arrow$", part)
+
+    # The next invocation uploads only its own rows, not the carried ones
+    save_pending = mocker.spy(writer, "save_pending")
+    second = BufferedParquetWriter(writer, "badges_emitidas", PARTITION, "001")
+    second.restore()
+    assert second.pending_rows == 3
+    second.add(_rows(3, 2))
+    second.close(final=False)
+    assert save_pending.call_args.args[4] == 2
+    assert len(_pending_parts(s3)) == 2
+
+    third = BufferedParquetWriter(writer, "badges_emitidas", PARTITION, "001")
+    third.restore()
+    third.add(_rows(5, 1))
+    third.close()
+
+    ((key, table),) = _parquet_files(s3).items()
+    assert key.startswith("raw/badges_emitidas/anomesdia=20240501/part-001-")
+    assert table.column("badge_id").to_pylist() == ["0", "1", "2", "3", "4", "5"]
+    # Restored rows are in the file now and must not be restored again
+    assert not [k for _, k in s3.objects if k.startswith("staging/")]
+
+
+def test_commit_publishes_manifest_and_removes_older_runs(writer, s3):
+    s3.put_object(
+        Bucket="bucket", Key="raw/badges_emitidas/anomesdia=20240501/part-1.parquet"
+    )
+    old_run = writer.start_run("badges_emitidas", PARTITION)
+    writer.write_parquet("badges_emitidas", _rows(0, 2), PARTITION, 1, run_id=old_run)
+    writer.commit_run("badges_emitidas", PARTITION, old_run)
+
+    # The cleanup of the commit closed the run; no new one is opened silently
+    with pytest.raises(ValueError):
+        writer.current_run("badges_emitidas", PARTITION)
+    run_id = writer.start_run("badges_emitidas", PARTITION)
+    assert writer.current_run("badges_emitidas", PARTITION) == run_id
+    buffer = BufferedParquetWriter(writer, "badges_emitidas", PARTITION, run_id=run_id)
+    buffer.add(_rows(0, 3))
+    buffer.close(final=False)
+
+    # Until the commit, readers still get the previous run, and nothing of
+    # the new one is in the table's location
+    assert writer.read_manifest("badges_emitidas", PARTITION)["run_id"] == old_run
+    assert not [k for _, k in s3.objects if k.startswith("raw/") and run_id in k]
+
+    buffer = BufferedParquetWriter(writer, "badges_emitidas", PARTITION, run_id=run_id)
+    buffer.restore()
+    buffer.close()
+    manifest = writer.commit_run("badges_emitidas", PARTITION, run_id)
+
+    assert manifest["run_id"] == run_id
+    assert manifest["record_count"] == 3
+    assert manifest["stats"]["badge_id"] == {"min": "0", "max": "2"}
+    (entry,) = manifest["files"]
+    assert entry["rows"] == 3
+    assert entry["size"] == len(s3.objects[("bucket", entry["key"])])
+    # Flat in the partition, so no run=... directory looks like a partition key
+    assert entry["key"].startswith(
+        f"raw/badges_emitidas/anomesdia=20240501/{run_id}-part-"
+    )
+    assert writer.read_manifest("badges_emitidas", PARTITION) == manifest
+    # Committing the run again changes nothing
+    assert writer.commit_run("badges_emitidas", PARTITION, run_id) == manifest
+    # Legacy files, the older run and staging objects are gone
+    assert sorted(k for _, k in s3.objects) == sorted(
+        [entry["key"], "raw/badges_emitidas/anomesdia=20240501/_manifest.json"]
+    )
+
+
+def test_commit_keeps_the_staging_of_a_run_opened_after_it(writer, s3):
+    committed = writer.start_run("badges_emitidas", PARTITION)
+    writer.write_parquet("badges_emitidas", _rows(0, 2), PARTITION, 1, run_id=committed)
+    # A sharded load opens its run and stages rows before the commit lands
+    open_run = writer.start_run("badges_emitidas", PARTITION)
+    buffer = BufferedParquetWriter(
+        writer, "badges_emitidas", PARTITION, "001", run_id=open_run
+    )
+    buffer.add(_rows(2, 3))
+    buffer.close(final=False)
+
+    writer.commit_run("badges_emitidas", PARTITION, committed)
+
+    assert writer.current_run("badges_emitidas", PARTITION) == open_run
+    staged = [k for _, k in s3.objects if k.startswith("staging/")]
+    assert staged and all(
+        k.startswith(f"staging/badges_emitidas/anomesdia=20240501/run={open_run}/")
+        or k.endswith("/_run.json")
+        for k in staged
+    )
+    assert not [k for k in staged if f"run={committed}/" in k]
+    buffer = BufferedParquetWriter(
+        writer, "badges_emitidas", PARTITION, "001", run_id=open_run
+    )
+    buffer.restore()
+    assert buffer.pending_rows == 3
+
+
+def test_run_state_is_staged_and_dropped_with_the_run(writer, s3):
+    validators = {str(n): {"etag": f'"v{n}"'} for n in range(1, 500)}
+    run_id = writer.start_run("badges_templates", PARTITION)
+    writer.save_state(
+        "badges_templates", "page_validators", validators, PARTITION, run_id
+    )
+    writer.save_state("badges_templates", "page_validators", {"1": {}})
+
+    assert (
+        writer.load_state("badges_templates", "page_validators", PARTITION, run_id)
+        == validators
+    )
+    assert writer.load_state("badges_templates", "page_validators") == {"1": {}}
+    assert writer.load_state("badges_templates", "fingerprints") is None
+
+    writer.discard_run("badges_templates", PARTITION, run_id)
+    assert (
+        writer.load_state("badges_templates", "page_validators", PARTITION, run_id)
+        is None
+    )
+    assert ("bucket", "state/badges_templates/page_validators.json.gz") in s3.objects
+
+
+def test_buffers_record_batches_and_spills_them(writer, s3, monkeypatch):
+    from src.utils.parquet_schemas import to_record_batch
+
+    monkeypatch.setenv("PARQUET_BUFFER_MEMORY_MB", "0")
+    buffer = BufferedParquetWriter(writer, "badges_emitidas", PARTITION)
+
+    # Pages of 7 rows, some already mapped to Arrow, regrouped by 10
+    for page in range(4):
+        rows = _rows(page * 7, 7)
+        buffer.add(to_record_batch("badges_emitidas", rows) if page % 2 else rows)
+    buffer.close()
+
+    ((key, table),) = _parquet_files(s3).items()
+    assert table.column("badge_id").to_pylist() == [str(i) for i in range(28)]
+    metadata = pq.ParquetFile(io.BytesIO(s3.objects[("bucket", key)])).metadata
+    assert [metadata.row_group(i).num_rows for i in range(3)] == [10, 10, 8]
@@ -0,0 +1,187 @@
+import datetime
+import io
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils.parquet_schemas import (
+    TABLE_COLUMNS,
+    conform_table,
+    dictionary_columns,
+    get_schema,
+    schema_version_of,
+    to_record_batch,
+    writer_options,
+)
+from src.utils.s3_writer import S3Writer
+
+
+@pytest.fixture
+def writer():
+    writer = object.__new__(S3Writer)
+    writer._setup(MagicMock())
+    writer.uploaded = {}
+    writer._client.put_object.side_effect = lambda Key, Body, **kw: (
+        writer.uploaded.__setitem__(Key, bytes(Body))
+    )
+    return writer
+
+
+def test_schemas_cover_mapped_columns():
+    from src.services.credly_badges_service import CredlyBadgesService
+    from src.services.credly_templates_service import CredlyTemplatesService
+
+    badge = CredlyBadgesService()._map_badge({})
+    template = CredlyTemplatesService()._map_template({})
+    activities = CredlyTemplatesService()._extract_activities(
+        {"id": 1, "badge_template_activities": [{"id": 2}]}
+    )
+
+    assert get_schema("badges_emitidas").names == list(badge)
+    assert get_schema("badges_templates").names == list(template)
+    assert get_schema("badges_templates_activities").names == list(activities[0])
+
+
+def test_record_batch_uses_explicit_schema_and_fills_missing_columns():
+    batch = to_record_batch("badges_emitidas", [{"badge_id": "1", "public": True}])
+
+    assert batch.schema.equals(get_schema("badges_emitidas"))
+    assert batch.column("public").to_pylist() == ["True"]
+    assert batch.column("state").to_pylist() == [None]
+
+
+def test_low_cardinality_columns_are_dictionary_encoded(writer):
+    rows = [{"badge_id": str(i), "state": "accepted"} for i in range(100)]
+
+    writer.write_parquet("badges_emitidas", rows, datetime.date(2024, 5, 1), 1)
+
+    (body,) = writer.uploaded.values()
+    row_group = pq.ParquetFile(io.BytesIO(body)).metadata.row_group(0)
+    names = [name for name, *_ in TABLE_COLUMNS["badges_emitidas"]]
+    encodings = {name: row_group.column(i).encodings for i, name in enumerate(names)}
+    assert "RLE_DICTIONARY" in encodings["state"]
+    assert "RLE_DICTIONARY" not in encodings["badge_id"]
+
+
+def test_unknown_tables_fall_back_to_inferred_schema(writer):
+    writer.write_parquet(
+        "other_table", [{"a": 1, "b": None}], datetime.date(2024, 5, 1), 1
+    )
+
+    (body,) = writer.uploaded.values()
+    table = pq.read_table(io.BytesIO(body))
+    assert table.schema.field("a").type == pa.int64()
+    assert table.schema.field("b").type == pa.string()
+
+
+def test_typed_schema_version_maps_real_types():
+    from src.services.credly_badges_service import CredlyBadgesService
+    from src.services.credly_templates_service import CredlyTemplatesService
+
+    badge = CredlyBadgesService()._map_badge(
+        {"id": "b1", "public": True, "issued_at": "2024-05-01T10:00:00.000Z"}, 2
+    )
+    template = CredlyTemplatesService()._map_template(
+        {
+            "id": "t1",
+            "badges_count": 7,
+            "skills": [{"name": "Python;3"}, "AWS"],
+            "reporting_tags": ["tag"],
+        },
+        2,
+    )
+
+    assert badge["badge_id"] == "b1"
+    assert badge["public"] is True
+    assert badge["issued_at"] == datetime.datetime(
+        2024, 5, 1, 10, tzinfo=datetime.timezone.utc
+    )
+    assert badge["expires_at"] is None
+    assert template["badges_count"] == 7
+    assert template["variants_allowed"] is None
+    assert template["skills"] == ["Python;3", "AWS"]
+    assert template["reporting_tags"] == ["tag"]
+
+
+def test_typed_files_record_their_schema_version(writer):
+    rows = [
+        {"badge_id": "1", "public": True, "updated_at": "2024-05-01T10:00:00Z"},
+        {"badge_id": "2", "public": "False", "updated_at": ""},
+    ]
+
+    writer.write_parquet(
+        "badges_emitidas", [dict(row) for row in rows], datetime.date(2024, 5, 1), 1
+    )
+    writer._client.put_object.reset_mock()
+    writer.uploaded.clear()
+    writer.write_parquet_batches(
+        "badges_emitidas", [rows], datetime.date(2024, 5, 1), 2, schema_version=2
+    )
+
+    (body,) = writer.uploaded.values()
+    table = pq.read_table(io.BytesIO(body))
+    assert schema_version_of(table.schema) == 2
+    assert table.schema.field("updated_at").type == pa.timestamp("us", tz="UTC")
+    assert table.column("public").to_pylist() == [True, False]
+    assert table.column("updated_at").to_pylist()[1] is None
+    assert "public" not in dictionary_columns("badges_emitidas", 2)
+
+
+def test_conform_table_upgrades_string_files():
+    legacy = to_record_batch(
+        "badges_templates",
+        [{"badge_template_id": "t1", "badges_count": "3", "skills": "a;b"}],
+        1,
+    )
+
+    table = conform_table(pa.Table.from_batches([legacy]), "badges_templates", 2)
+
+    assert table.schema.equals(get_schema("badges_templates", 2))
+    assert table.column("badges_count").to_pylist() == [3]
+    assert table.column("skills").to_pylist() == [["a", "b"]]
+    assert table.column("public").to_pylist() == [None]
+
+
+def test_writer_options_follow_settings_with_per_table_overrides(monkeypatch):
+    monkeypatch.setenv("PARQUET_COMPRESSION", "zstd")
+    monkeypatch.setenv("PARQUET_COMPRESSION_LEVEL", "9")
+    monkeypatch.setenv("PARQUET_COMPRESSION_BADGES_TEMPLATES", "snappy")
+    monkeypatch.setenv("PARQUET_DICTIONARY_BADGES_TEMPLATES", "false")
+    monkeypatch.setenv("PARQUET_WRITE_STATISTICS", "updated_at, issued_at")
+
+    badges = writer_options("badges_emitidas")
+    templates = writer_options("badges_templates")
+
+    assert badges["compression"] == "zstd"
+    assert badges["compression_level"] == 9
+    assert badges["use_dictionary"] == dictionary_columns("badges_emitidas")
+    assert badges["write_statistics"] == ["updated_at", "issued_at"]
+    assert templates["compression"] == "snappy"
+    assert templates["use_dictionary"] is False
+    assert writer_options("other_table")["use_dictionary"] is True
+
+
+def test_files_are_written_with_the_table_writer_options(writer, monkeypatch):
+    monkeypatch.setenv("PARQUET_COMPRESSION_BADGES_EMITIDAS", "zstd")
+    monkeypatch.setenv("PARQUET_ROW_GROUP_ROWS_BADGES_EMITIDAS", "40")
+    monkeypatch.setenv("PARQUET_WRITE_STATISTICS", "updated_at")
+    rows = [
+        {"badge_id": str(i), "updated_at": f"2024-05-01 10:{i % 60:02d}:00"}
+        for i in range(100)
+    ]
+
+    writer.write_parquet("badges_emitidas", rows, datetime.date(2024, 5, 1), 1)
+
+    (body,) = writer.uploaded.values()
+    metadata = pq.ParquetFile(io.BytesIO(body)).metadata
+    assert [metadata.row_group(i).num_rows for i in range(3)] == [40, 40, 20]
+    row_group = metadata.row_group(0)
+    columns = {
+        row_group.column(i).path_in_schema: row_group.column(i)
+        for i in range(row_group.num_columns)
+    }
+    assert columns["badge_id"].compression == "ZSTD"
+    assert columns["updated_at"].is_stats_set
+    assert not columns["badge_id"].is_stats_set
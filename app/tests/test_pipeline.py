@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+from src.utils.pipeline import PipelineStage
+
+
+def test_stage_consumes_in_order():
+    consumed = []
+
+    with PipelineStage(consumed.append, max_pending=2) as stage:
+        for i in range(10):
+            stage.submit(i)
+
+    assert consumed == list(range(10))
+
+
+def test_stage_overlaps_producer_and_consumer():
+    """The producer keeps going while the consumer is busy"""
+    consumer_started = threading.Event()
+    produced_while_busy = []
+
+    def slow_consumer(item):
+        consumer_started.set()
+        time.sleep(0.05)
+
+    with PipelineStage(slow_consumer, max_pending=2) as stage:
+        stage.submit(0)
+        consumer_started.wait(1)
+        stage.submit(1)
+        produced_while_busy.append(1)
+
+    assert produced_while_busy == [1]
+
+
+def test_stage_applies_back_pressure():
+    release = threading.Event()
+    submitted = []
+
+    def blocked_consumer(item):
+        release.wait(1)
+
+    stage = PipelineStage(blocked_consumer, max_pending=1)
+
+    def producer():
+        for i in range(4):
+            stage.submit(i)
+            submitted.append(i)
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    time.sleep(0.2)
+    # One item in the consumer, one queued, the producer waits on the third
+    assert len(submitted) == 2
+
+    release.set()
+    thread.join(1)
+    stage.close()
+    assert submitted == [0, 1, 2, 3]
+
+
+def test_stage_reraises_consumer_error():
+    def failing_consumer(item):
+        raise RuntimeError("S3 down")
+
+    with pytest.raises(RuntimeError, match="S3 down"):
+        with PipelineStage(failing_consumer) as stage:
+            stage.submit(1)
@@ -0,0 +1,94 @@
+import datetime
+import io
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.services.replay_service import ReplayService
+
+PARTITION = datetime.date(2024, 5, 1)
+
+
+@pytest.fixture
+def writer(writer, mocker):
+    mocker.patch("src.services.replay_service.s3_writer", writer)
+    return writer
+
+
+def _badge(badge_id, public=True):
+    return {
+        "id": badge_id,
+        "public": public,
+        "updated_at": "2024-05-01T10:00:00Z",
+        "badge_template": {"id": "t1"},
+    }
+
+
+def _load(writer, table, pages):
+    """Archives pages under a new run and commits it, as a load does."""
+    run_id = writer.start_run(table, PARTITION)
+    for page in pages:
+        writer.archive_page(table, PARTITION, run_id, page)
+    writer.commit_run(table, PARTITION, run_id)
+    return run_id
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_archived_pages_round_trip(writer, monkeypatch, compression):
+    monkeypatch.setenv("RAW_ARCHIVE_COMPRESSION", compression)
+
+    _load(writer, "badges_emitidas", [[_badge("b1")], [_badge("b2")]])
+
+    pages = writer.archived_pages("badges_emitidas", PARTITION)
+    items = [item for key in pages for item in writer.read_archive_page(key)]
+    assert sorted(items, key=lambda item: item["id"]) == [_badge("b1"), _badge("b2")]
+    assert writer.archived_partitions("badges_emitidas") == [PARTITION]
+
+
+def test_a_new_load_replaces_the_archived_run(writer):
+    _load(writer, "badges_emitidas", [[_badge("old")]])
+    run_id = _load(writer, "badges_emitidas", [[_badge("new")]])
+
+    (key,) = writer.archived_pages("badges_emitidas", PARTITION)
+    assert f"/run={run_id}/" in key
+    assert writer.read_archive_page(key) == [_badge("new")]
+
+
+def test_replay_rebuilds_the_table_and_keeps_the_archive(writer, s3, monkeypatch):
+    _load(writer, "badges_emitidas", [[_badge("b1")], [_badge("b2", False)]])
+    archived = writer.archived_pages("badges_emitidas", PARTITION)
+    monkeypatch.setenv("PARQUET_SCHEMA_VERSION", "2")
+
+    result = ReplayService().replay("badges_emitidas", PARTITION)
+
+    assert result == {"records_processed": 2, "pages": 2}
+    (key,) = writer.committed_files("badges_emitidas", PARTITION)
+    table = pq.read_table(io.BytesIO(s3.objects[("bucket", key)]))
+    assert sorted(table.column("badge_id").to_pylist()) == ["b1", "b2"]
+    assert sorted(table.column("public").to_pylist()) == [False, True]
+    # Replays do not archive, so the archive still holds the load's pages
+    assert writer.archived_pages("badges_emitidas", PARTITION) == archived
+
+
+def test_template_replay_rebuilds_both_tables(writer):
+    template = {
+        "id": "t1",
+        "name": "Template",
+        "badge_template_activities": [{"id": "a1"}, {"id": "a2"}],
+    }
+    _load(writer, "badges_templates", [[template]])
+
+    result = ReplayService().replay("badges_templates", PARTITION)
+
+    assert result["records_processed"] == 1
+    manifest = writer.read_manifest("badges_templates_activities", PARTITION)
+    assert manifest["record_count"] == 2
+    assert writer.read_manifest("badges_templates", PARTITION)["record_count"] == 1
+
+
+def test_nothing_archived_replays_nothing(writer):
+    assert ReplayService().replay("badges_emitidas", PARTITION) == {
+        "records_processed": 0,
+        "pages": 0,
+    }
+    assert writer.read_manifest("badges_emitidas", PARTITION) is None
@@ -0,0 +1,62 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.utils.s3_multipart import MIN_PART_SIZE, S3MultipartSink
+
+CHUNK = b"x" * (1024 * 1024)
+
+
+def test_small_objects_use_a_single_put(s3, mocker):
+    create = mocker.spy(s3, "create_multipart_upload")
+
+    with S3MultipartSink(s3, "bucket", "key") as sink:
+        sink.write(b"hello")
+
+    assert s3.objects[("bucket", "key")] == b"hello"
+    create.assert_not_called()
+
+
+def test_large_objects_stream_in_bounded_parts(s3, mocker):
+    upload_part = mocker.spy(s3, "upload_part")
+
+    with S3MultipartSink(
+        s3, "bucket", "key", part_size=MIN_PART_SIZE, max_pending_parts=1
+    ) as sink:
+        for _ in range(12):
+            sink.write(CHUNK)
+            # Never more than one full part buffered locally
+            assert len(sink._buffer) < MIN_PART_SIZE
+        assert sink.tell() == 12 * len(CHUNK)
+
+    assert s3.objects[("bucket", "key")] == CHUNK * 12
+    assert upload_part.call_count == 3
+    assert [c.kwargs["PartNumber"] for c in upload_part.call_args_list] == [1, 2, 3]
+
+
+def test_failure_aborts_the_upload(s3, mocker):
+    abort = mocker.spy(s3, "abort_multipart_upload")
+
+    with pytest.raises(RuntimeError):
+        with S3MultipartSink(s3, "bucket", "key", part_size=MIN_PART_SIZE) as sink:
+            for _ in range(6):
+                sink.write(CHUNK)
+            raise RuntimeError("encoder failed")
+
+    abort.assert_called_once()
+    assert ("bucket", "key") not in s3.objects
+
+
+def test_failed_part_is_raised_and_aborted():
+    client = MagicMock()
+    client.create_multipart_upload.return_value = {"UploadId": "1"}
+    client.upload_part.side_effect = ConnectionError("reset")
+
+    sink = S3MultipartSink(client, "bucket", "key", part_size=MIN_PART_SIZE)
+    for _ in range(6):
+        sink.write(CHUNK)
+
+    with pytest.raises(ConnectionError):
+        sink.close()
+    client.abort_multipart_upload.assert_called_once()
+    client.complete_multipart_upload.assert_not_called()
@@ -0,0 +1,45 @@
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.clients.object_stores import InMemoryObjectStore
+from src.utils.s3_range_reader import S3RangeReader
+
+
+def test_reads_ranges_of_the_object():
+    store = InMemoryObjectStore()
+    store.put_object(Bucket="bucket", Key="data.bin", Body=b"0123456789")
+    reader = S3RangeReader(store, "bucket", "data.bin")
+
+    assert reader.read(3) == b"012"
+    reader.seek(-2, io.SEEK_END)
+    assert reader.read() == b"89"
+    assert reader.read(5) == b""
+    reader.seek(4)
+    assert reader.read(100) == b"456789"
+
+
+def test_parquet_row_groups_are_fetched_without_the_whole_file(mocker):
+    store = InMemoryObjectStore()
+    sink = io.BytesIO()
+    table = pa.table({"id": [str(i) for i in range(100_000)], "n": range(100_000)})
+    pq.write_table(table, sink, row_group_size=10_000)
+    body = sink.getvalue()
+    store.put_object(Bucket="bucket", Key="t.parquet", Body=body)
+    get_object = mocker.spy(store, "get_object")
+
+    parquet_file = pq.ParquetFile(
+        S3RangeReader(store, "bucket", "t.parquet", len(body))
+    )
+    group = parquet_file.read_row_group(3, columns=["id"])
+
+    assert group.column("id").to_pylist() == [str(i) for i in range(30_000, 40_000)]
+    fetched = sum(
+        int(end) - int(start) + 1
+        for start, end in (
+            c.kwargs["Range"].replace("bytes=", "").split("-")
+            for c in get_object.call_args_list
+        )
+    )
+    assert fetched < len(body) / 2
@@ -0,0 +1,80 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from src.clients.http_client import HttpClient
+from src.clients.throttler import AdaptiveThrottler
+
+
+@pytest.fixture
+def throttler():
+    return AdaptiveThrottler(
+        initial_rate=10, min_rate=1, max_rate=20, max_concurrency=4
+    )
+
+
+def test_success_increases_rate_up_to_max(throttler):
+    for _ in range(100):
+        throttler.observe(200, {})
+
+    assert throttler.rate == 20
+    assert throttler.concurrency == 4
+
+
+def test_throttle_decreases_rate_and_concurrency(throttler):
+    pause = throttler.observe(429, {"Retry-After": "3"})
+
+    assert pause == 3
+    assert throttler.rate == 5
+    assert throttler.concurrency == 2
+
+
+def test_throttle_without_retry_after_backs_off_exponentially(throttler):
+    assert throttler.observe(429, {}) == 2
+    assert throttler.observe(429, {}) == 4
+    assert throttler.rate == 2.5
+
+
+def test_concurrency_recovers_after_successes(throttler):
+    throttler.observe(429, {"Retry-After": "0"})
+    for _ in range(throttler.concurrency_step):
+        throttler.observe(200, {})
+
+    assert throttler.concurrency == 3
+
+
+def test_quota_headers_cap_rate(throttler):
+    throttler.observe(200, {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "5"})
+
+    assert throttler.rate == 2
+
+
+def test_throttle_reports_rate_gauge(throttler, mocker):
+    mock_observability = mocker.patch("src.clients.throttler.observability")
+
+    throttler.observe(429, {"Retry-After": "0"})
+
+    mock_observability.record_gauge.assert_any_call("http_throttle_rate", 5)
+
+
+def test_slot_waits_for_pause(throttler):
+    throttler.observe(429, {"Retry-After": "0.2"})
+
+    start = time.monotonic()
+    with throttler.slot():
+        pass
+
+    assert time.monotonic() - start >= 0.15
+
+
+def test_http_client_retries_rate_limited_request(monkeypatch):
+    monkeypatch.setenv("MAX_RETRIES", "2")
+    client = HttpClient()
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+    ok = MagicMock(status_code=200, headers={})
+    client.session.request = MagicMock(side_effect=[throttled, ok])
+
+    response = client.get("http://api/test")
+
+    assert response is ok
+    assert client.session.request.call_count == 2
@@ -12,13 +12,14 @@ locals {
   step_function_name = "${var.project_name}-orchestrator-${var.environment}"
 
   lambda_env_vars = {
-    ENV                   = upper(var.environment)
-    AWS_REGION            = var.aws_region
-    S3_BUCKET_NAME        = var.s3_bucket_name
-    CREDLY_ORG_ID         = var.credly_org_id
-    CREDLY_BASE_URL       = "https://api.credly.com/v1"
-    SECRETS_MANAGER_KEY   = var.secrets_manager_key
-    WATERMARK_OVERLAP_MIN = var.watermark_overlap_minutes
+    ENV                      = upper(var.environment)
+    AWS_REGION               = var.aws_region
+    S3_BUCKET_NAME           = var.s3_bucket_name
+    CREDLY_ORG_ID            = var.credly_org_id
+    CREDLY_BASE_URL          = "https://api.credly.com/v1"
+    SECRETS_MANAGER_KEY      = var.secrets_manager_key
+    WATERMARK_OVERLAP_MIN    = var.watermark_overlap_minutes
+    LAMBDA_TIME_BUDGET_RATIO = var.lambda_time_budget_ratio
   }
 
   localstack_endpoint = var.localstack_endpoint
@@ -55,6 +55,12 @@ variable "watermark_overlap_minutes" {
   default     = 15
 }
 
+variable "lambda_time_budget_ratio" {
+  description = "Share of the Lambda remaining time spent pulling pages per invocation before returning next_page to the state machine (0 = one page)"
+  type        = number
+  default     = 0.8
+}
+
 variable "enable_compute" {
   description = "Enable creation of compute resources (Lambda, Step Functions). Set to false for local dev if Docker is not available."
   type        = bool
@@ -0,0 +1,71 @@
+"""
+In-memory stand-ins for the boto3 clients the Lambda uses (S3, SSM and
+Secrets Manager), for offline benchmarks and local runs without LocalStack.
+
+Only the calls made by the app are implemented. install() makes every
+boto3 client created afterwards come from here:
+
+    stand_ins = install()
+    from lambda_function import lambda_handler
+    ...
+    print(stand_ins.s3.bytes_written)
+"""
+
+import json
+from dataclasses import dataclass, field
+
+import boto3
+import boto3.session
+
+from src.clients.object_stores import InMemoryObjectStore
+
+# The app's own in-memory object store (OUTPUT_SINK=memory) doubles as S3
+InMemoryS3 = InMemoryObjectStore
+
+
+class InMemorySSM:
+    class exceptions:
+        class ParameterNotFound(Exception):
+            pass
+
+    def __init__(self):
+        self.parameters = {}
+
+    def get_parameter(self, Name, WithDecryption=False):
+        if Name not in self.parameters:
+            raise self.exceptions.ParameterNotFound(Name)
+        return {"Parameter": {"Name": Name, "Value": self.parameters[Name]}}
+
+    def put_parameter(self, Name, Value, Overwrite=False, **kwargs):
+        self.parameters[Name] = Value
+        return {"Version": 1}
+
+
+class InMemorySecretsManager:
+    def __init__(self, secrets: dict = None):
+        self.secrets = secrets or {}
+
+    def get_secret_value(self, SecretId):
+        return {"SecretString": json.dumps(self.secrets.get(SecretId, {}))}
+
+
+@dataclass
+class AwsStandIns:
+    s3: InMemoryS3 = field(default_factory=InMemoryS3)
+    ssm: InMemorySSM = field(default_factory=InMemorySSM)
+    secretsmanager: InMemorySecretsManager = field(
+        default_factory=InMemorySecretsManager
+    )
+
+    def client(self, service_name, *args, **kwargs):
+        return getattr(self, service_name)
+
+
+def install(stand_ins: AwsStandIns = None) -> AwsStandIns:
+    """Routes boto3.client and Session.client to the in-memory stand-ins."""
+    stand_ins = stand_ins or AwsStandIns()
+    boto3.client = stand_ins.client
+    boto3.session.Session.client = lambda self, service_name, *a, **k: (
+        stand_ins.client(service_name)
+    )
+    return stand_ins
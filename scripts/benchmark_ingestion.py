@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+End-to-end ingestion benchmark.
+
+Drives lambda_handler through full badges/templates loads against the fake
+Credly API (scripts/fake_credly_server.py) and in-memory S3/SSM/Secrets
+Manager stand-ins (scripts/aws_stand_ins.py), then reports throughput,
+p50/p95 page latency, bytes written and peak memory per scenario.
+
+Each scenario runs in a fresh process, so peak RSS and import (cold start)
+time are measured per scenario. Results can be saved as a baseline and later
+runs compared against it; every run is checked against the Lambda envelope
+(memory size and timeout) configured in infra/variables.tf.
+
+Usage:
+    uv run python scripts/benchmark_ingestion.py --badges 200000 --latency-ms 50
+    uv run python scripts/benchmark_ingestion.py --save-baseline
+    uv run python scripts/benchmark_ingestion.py --fail-on-regression
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, "app"))
+
+from scripts.fake_credly_server import FakeCredlyConfig, FakeCredlyServer
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+
+# Lambda envelope (infra/variables.tf: lambda_memory_size / lambda_timeout)
+LAMBDA_MEMORY_MB = 512
+LAMBDA_TIMEOUT_SECONDS = 900
+
+# A metric is a regression when it is this much worse than the baseline
+REGRESSION_TOLERANCE = 0.10
+
+SCENARIOS = {
+    "badges-historical": {"load_type": "badges", "mode": "historical"},
+    "badges-daily": {
+        "load_type": "badges",
+        "mode": "daily",
+        "watermark": "2024-10-01 00:00:00",
+    },
+    "templates-historical": {"load_type": "templates", "mode": "historical"},
+    "templates-daily-unchanged": {
+        "load_type": "templates",
+        "mode": "daily",
+        "warm_up": True,
+    },
+}
+
+
+class BenchmarkContext:
+    """Minimal Lambda context: a fresh timeout window per invocation."""
+
+    def __init__(self, timeout_seconds: float):
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int(max(self._deadline - time.monotonic(), 0) * 1000)
+
+
+def _percentile(values: list, percentile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_scenario(name: str, scenario: dict, base_url: str, results):
+    """Runs one scenario in the current (fresh) process."""
+    os.environ.update(
+        {
+            "ENV": "DEV",
+            "CREDLY_BASE_URL": base_url,
+            "CREDLY_ORG_ID": "org-00001",
+            "SECRETS_MANAGER_KEY": "benchmark/credentials",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+
+    from scripts import aws_stand_ins
+
+    stand_ins = aws_stand_ins.install()
+    stand_ins.secretsmanager.secrets["benchmark/credentials"] = {
+        "api_token": "benchmark"
+    }
+    if scenario.get("watermark"):
+        stand_ins.ssm.parameters["/credly/watermark/badges"] = json.dumps(
+            {"watermark": scenario["watermark"]}
+        )
+
+    import_started = time.perf_counter()
+    from lambda_function import lambda_handler
+    from src.clients.credly_client import credly_client
+
+    import_seconds = time.perf_counter() - import_started
+
+    page_latencies = []
+    request_page = credly_client._request_page
+
+    def timed_request_page(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return request_page(*args, **kwargs)
+        finally:
+            page_latencies.append(time.perf_counter() - started)
+
+    credly_client._request_page = timed_request_page
+
+    def run_load():
+        records, invocations, slowest = 0, 0, 0.0
+        event = {"load_type": scenario["load_type"], "mode": scenario["mode"]}
+        while True:
+            started = time.perf_counter()
+            response = lambda_handler(event, BenchmarkContext(LAMBDA_TIMEOUT_SECONDS))
+            slowest = max(slowest, time.perf_counter() - started)
+            invocations += 1
+            body = response["body"]
+            records += body.get("records_processed", 0)
+            if not body.get("next_page"):
+                return records, invocations, slowest
+            event = {**event, "page": body["next_page"]}
+
+    if scenario.get("warm_up"):
+        # First load stores state; the measured one should find nothing new
+        run_load()
+        page_latencies.clear()
+        stand_ins.s3.bytes_written = 0
+        stand_ins.s3.put_requests = 0
+
+    started = time.perf_counter()
+    records, invocations, slowest = run_load()
+    duration = time.perf_counter() - started
+
+    results.put(
+        {
+            "scenario": name,
+            "records": records,
+            "invocations": invocations,
+            "duration_s": round(duration, 3),
+            "records_per_s": round(records / duration, 1) if duration else 0.0,
+            "pages": len(page_latencies),
+            "page_p50_ms": round(_percentile(page_latencies, 50) * 1000, 2),
+            "page_p95_ms": round(_percentile(page_latencies, 95) * 1000, 2),
+            "bytes_written": stand_ins.s3.bytes_written,
+            "files_written": stand_ins.s3.put_requests,
+            "peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+            "slowest_invocation_s": round(slowest, 3),
+            "import_s": round(import_seconds, 3),
+            "parquet_loaded": "pyarrow" in sys.modules,
+        }
+    )
+
+
+def check_envelope(result: dict) -> list:
+    problems = []
+    if result["peak_rss_mb"] > LAMBDA_MEMORY_MB:
+        problems.append(
+            f"peak RSS {result['peak_rss_mb']} MB exceeds {LAMBDA_MEMORY_MB} MB"
+        )
+    if result["slowest_invocation_s"] > LAMBDA_TIMEOUT_SECONDS:
+        problems.append(
+            f"an invocation took {result['slowest_invocation_s']}s "
+            f"(timeout {LAMBDA_TIMEOUT_SECONDS}s)"
+        )
+    return problems
+
+
+def compare(result: dict, baseline: dict) -> list:
+    """Lists metrics that got worse than the baseline beyond the tolerance."""
+    regressions = []
+    # (metric, True if higher is better)
+    for metric, higher_is_better in (
+        ("records_per_s", True),
+        ("page_p95_ms", False),
+        ("peak_rss_mb", False),
+        ("bytes_written", False),
+    ):
+        old, new = baseline.get(metric), result.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        if worse > REGRESSION_TOLERANCE:
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def print_report(results: list, baseline: dict):
+    columns = [
+        ("scenario", 26),
+        ("records", 9),
+        ("records_per_s", 14),
+        ("page_p50_ms", 12),
+        ("page_p95_ms", 12),
+        ("bytes_written", 14),
+        ("files_written", 14),
+        ("peak_rss_mb", 12),
+        ("import_s", 9),
+    ]
+    print("".join(name.ljust(width) for name, width in columns))
+    for result in results:
+        print("".join(str(result[name]).ljust(width) for name, width in columns))
+        for problem in check_envelope(result):
+            print(f"  ✗ Lambda envelope: {problem}")
+        for regression in compare(result, baseline.get(result["scenario"], {})):
+            print(f"  ⚠ Regression vs baseline: {regression}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Credly ingestion.")
+    parser.add_argument("--badges", type=int, default=50_000)
+    parser.add_argument("--templates", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=10.0)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run (repeatable, default: all)",
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store results as the baseline"
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit non-zero on regressions or Lambda envelope violations",
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    config = FakeCredlyConfig(
+        badges=args.badges,
+        templates=args.templates,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+    )
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with FakeCredlyServer(config) as server:
+        for name in args.scenario or list(SCENARIOS):
+            print(f"Running {name}...", flush=True)
+            queue = context.Queue()
+            process = context.Process(
+                target=run_scenario,
+                args=(name, SCENARIOS[name], server.base_url, queue),
+            )
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"✗ {name} failed (exit code {process.exitcode})")
+                sys.exit(1)
+            results.append(queue.get())
+
+    print()
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({r["scenario"]: r for r in results}, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    failed = any(
+        check_envelope(r) or compare(r, baseline.get(r["scenario"], {}))
+        for r in results
+    )
+    if args.fail_on_regression and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
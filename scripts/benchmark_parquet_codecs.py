@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Parquet writer micro-benchmark.
+
+Maps representative badge pages (scripts/fake_credly_server.py data through
+the service's _map_badges) and encodes them with each codec/level, row group
+size and dictionary setting, reporting encode time, file size and the time
+to scan updated_at back. Use it to choose PARQUET_COMPRESSION,
+PARQUET_COMPRESSION_LEVEL, PARQUET_ROW_GROUP_ROWS and PARQUET_DICTIONARY
+(globally or per table, e.g. PARQUET_COMPRESSION_BADGES_EMITIDAS).
+
+Usage:
+    uv run python scripts/benchmark_parquet_codecs.py
+    uv run python scripts/benchmark_parquet_codecs.py --rows 200000 --schema-version 2
+    uv run python scripts/benchmark_parquet_codecs.py --codec zstd:1 --codec zstd:9 --json
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, "app"))
+
+from scripts.fake_credly_server import FakeCredlyConfig, FakeCredlyData
+
+DEFAULT_CODECS = ["none", "snappy", "lz4", "zstd:1", "zstd:3", "zstd:9", "gzip"]
+
+
+def build_batches(rows: int, page_size: int, schema_version: int) -> list:
+    """Maps fake badge pages into RecordBatches, one per page."""
+    from src.services.credly_badges_service import CredlyBadgesService
+
+    service = CredlyBadgesService()
+    data = FakeCredlyData(FakeCredlyConfig(badges=rows))
+    batches = []
+    for start in range(0, rows, page_size):
+        page = [
+            data.badge(index) for index in range(start, min(start + page_size, rows))
+        ]
+        batches.append(service._map_badges(page, schema_version))
+    return batches
+
+
+def encode(batches: list, options: dict) -> bytes:
+    import pyarrow.parquet as pq
+
+    sink = io.BytesIO()
+    writer = pq.ParquetWriter(
+        sink,
+        batches[0].schema,
+        compression=options["compression"],
+        compression_level=options["compression_level"],
+        use_dictionary=options["use_dictionary"],
+        write_statistics=options["write_statistics"],
+        data_page_size=options["data_page_size"],
+    )
+    for batch in batches:
+        writer.write_batch(batch, row_group_size=options["row_group_rows"])
+    writer.close()
+    return sink.getvalue()
+
+
+def scan(body: bytes) -> int:
+    """Reads updated_at back, as a pruned downstream query would."""
+    import pyarrow.parquet as pq
+
+    return pq.read_table(io.BytesIO(body), columns=["updated_at"]).num_rows
+
+
+def best_of(repeat: int, function, *args):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def run(args) -> list:
+    from src.utils.parquet_schemas import writer_options
+
+    batches = build_batches(args.rows, args.page_size, args.schema_version)
+    raw_bytes = sum(batch.nbytes for batch in batches)
+    base = writer_options("badges_emitidas", args.schema_version)
+
+    results = []
+    for codec in args.codec or DEFAULT_CODECS:
+        name, _, level = codec.partition(":")
+        for row_group_rows in args.row_group_rows or [base["row_group_rows"]]:
+            for dictionary in (True, False) if args.dictionary_both else (True,):
+                options = {
+                    **base,
+                    "compression": None if name == "none" else name,
+                    "compression_level": int(level) if level else None,
+                    "row_group_rows": row_group_rows,
+                    "use_dictionary": base["use_dictionary"] if dictionary else False,
+                }
+                encode_s, body = best_of(args.repeat, encode, batches, options)
+                scan_s, _ = best_of(args.repeat, scan, body)
+                results.append(
+                    {
+                        "codec": codec,
+                        "row_group_rows": row_group_rows,
+                        "dictionary": dictionary,
+                        "bytes": len(body),
+                        "ratio": round(raw_bytes / len(body), 2),
+                        "encode_ms": round(encode_s * 1000, 1),
+                        "encode_mb_per_s": round(raw_bytes / 1e6 / encode_s, 1),
+                        "scan_ms": round(scan_s * 1000, 1),
+                    }
+                )
+    return results
+
+
+def print_table(results: list, rows: int):
+    print(f"\n{rows} badges (ratio: in-memory Arrow size / file size)\n")
+    header = (
+        f"{'codec':<10} {'row group':>9} {'dict':>5} {'bytes':>12} {'ratio':>6} "
+        f"{'encode ms':>10} {'MB/s':>7} {'scan ms':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in sorted(results, key=lambda r: r["bytes"]):
+        print(
+            f"{r['codec']:<10} {r['row_group_rows']:>9} {str(r['dictionary']):>5} "
+            f"{r['bytes']:>12} {r['ratio']:>6} {r['encode_ms']:>10} "
+            f"{r['encode_mb_per_s']:>7} {r['scan_ms']:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parquet codec benchmark.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--schema-version", type=int, default=None)
+    parser.add_argument(
+        "--codec", action="append", help="codec[:level], repeatable (e.g. zstd:3)"
+    )
+    parser.add_argument(
+        "--row-group-rows", type=int, action="append", help="Repeatable"
+    )
+    parser.add_argument(
+        "--dictionary-both",
+        action="store_true",
+        help="Also measure with dictionary encoding disabled",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results, args.rows)
+
+
+if __name__ == "__main__":
+    main()
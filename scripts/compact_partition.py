@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compacts table partitions: merges their small Parquet files into a few
+sorted, right-sized ones, drops duplicate rows (badge_id / template id,
+keeping the latest updated_at) and publishes the result atomically through
+the partition manifest. Same code path as the Lambda's "compaction" mode.
+
+Usage (against LocalStack, or real AWS with LOCALSTACK_ENDPOINT unset):
+    uv run python scripts/compact_partition.py --date 2024-05-01
+    uv run python scripts/compact_partition.py --from 2024-05-01 --to 2024-05-31
+    uv run python scripts/compact_partition.py --table badges_templates --date 2024-05-01
+"""
+
+import argparse
+import datetime
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, "app"))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+os.environ.setdefault("S3_BUCKET_NAME", "my-datalake-bucket")
+
+
+def partition_dates(args) -> list:
+    if args.date:
+        return [datetime.date.fromisoformat(d) for d in args.date]
+
+    start = datetime.date.fromisoformat(args.start)
+    end = datetime.date.fromisoformat(args.end) if args.end else start
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact table partitions.")
+    parser.add_argument(
+        "--table",
+        default="badges_emitidas",
+        choices=["badges_emitidas", "badges_templates", "badges_templates_activities"],
+    )
+    parser.add_argument("--date", action="append", help="YYYY-MM-DD (repeatable)")
+    parser.add_argument("--from", dest="start", help="First YYYY-MM-DD of a range")
+    parser.add_argument("--to", dest="end", help="Last YYYY-MM-DD of a range")
+    args = parser.parse_args()
+
+    if not args.date and not args.start:
+        parser.error("Pass --date or --from/--to")
+
+    # Import after the environment is loaded so settings pick it up
+    from src.services.compaction_service import compaction_service
+
+    for partition_date in partition_dates(args):
+        result = compaction_service.compact(args.table, partition_date)
+        if result.get("skipped"):
+            print(f"{args.table} {partition_date}: no committed files, skipped")
+            continue
+        print(
+            f"{args.table} {partition_date}: {result['files_before']} -> "
+            f"{result['files_after']} files, {result['records_processed']} records, "
+            f"{result['duplicates_removed']} duplicates removed"
+        )
+
+
+if __name__ == "__main__":
+    main()
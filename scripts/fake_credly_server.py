@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Credly API, for load and performance testing.
+
+Serves synthetic badges and templates following the real response contract
+({"data": [...], "metadata": {"next_page_url": ...}}):
+
+- high_volume_issued_badge_search: cursor pagination, start_date/end_date
+  filtering, total_count. Badges get denser towards the present, like a
+  growing organisation, so date-window sharding has something to balance.
+- badge_templates: page-numbered pagination (current_page/total_pages),
+  ETag + If-None-Match (304), sort=updated_at/-updated_at.
+
+Records are generated from their index on demand, so millions of badges cost
+no memory. Latency and 429/5xx responses can be injected.
+
+Usage:
+    uv run python scripts/fake_credly_server.py --badges 2000000 --latency-ms 80
+    CREDLY_BASE_URL=http://localhost:8765/v1 uv run python scripts/simulate_step_function.py
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+@dataclass
+class FakeCredlyConfig:
+    badges: int = 10_000
+    templates: int = 200
+    page_size: int = 1000
+    max_page_size: int = 5000
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate_429: float = 0.0
+    error_rate_5xx: float = 0.0
+    retry_after: float = 1.0
+    seed: int = 42
+    start: datetime.datetime = datetime.datetime(2015, 1, 1)
+    end: datetime.datetime = datetime.datetime(2025, 1, 1)
+
+
+class FakeCredlyData:
+    """Deterministic synthetic records, addressed by index."""
+
+    SKILLS = ["Python", "AWS", "Data", "Security", "Cloud", "Leadership", "SQL"]
+    STATES = ["accepted", "pending", "revoked"]
+
+    def __init__(self, config: FakeCredlyConfig):
+        self.config = config
+        self.span = (config.end - config.start).total_seconds()
+        self.template_revisions = {}
+
+    # Badges: the i-th badge is issued at start + span * sqrt(i / N)
+    def badge_time(self, index: int) -> datetime.datetime:
+        fraction = math.sqrt(index / max(self.config.badges, 1))
+        return self.config.start + datetime.timedelta(seconds=self.span * fraction)
+
+    def badge_index_at(self, moment: datetime.datetime) -> int:
+        """First badge index issued at or after 'moment'."""
+        fraction = (moment - self.config.start).total_seconds() / self.span
+        fraction = min(max(fraction, 0.0), 1.0)
+        return min(self.config.badges, math.ceil(self.config.badges * fraction**2))
+
+    def badge(self, index: int) -> dict:
+        issued_at = self.badge_time(index).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        template = index % max(self.config.templates, 1)
+        return {
+            "id": f"badge-{index:09d}",
+            "issued_to": f"User {index}",
+            "issued_to_first_name": "User",
+            "issued_to_middle_name": "",
+            "issued_to_last_name": str(index),
+            "recipient_email": f"user{index}@example.com",
+            "user": {"id": f"user-{index % 250_000:07d}"},
+            "badge_template": {
+                "id": f"template-{template:05d}",
+                "name": f"Template {template}",
+                "image_url": f"https://images.example.com/{template}.png",
+            },
+            "issuer": {"entities": [{"id": "org-00001", "name": "Fake Credly Org"}]},
+            "locale": "en",
+            "public": index % 3 != 0,
+            "state": self.STATES[index % len(self.STATES)],
+            "issued_at": issued_at,
+            "expires_at": None,
+            "created_at": issued_at,
+            "updated_at": issued_at,
+            "state_updated_at": issued_at,
+        }
+
+    # Templates
+    def template(self, index: int) -> dict:
+        revision = self.template_revisions.get(index, 0)
+        updated_at = self.config.start + datetime.timedelta(days=index, hours=revision)
+        return {
+            "id": f"template-{index:05d}",
+            "primary_badge_template_id": None,
+            "variant_name": None,
+            "name": f"Template {index}",
+            "description": f"Synthetic template {index}. " * 20,
+            "state": "active",
+            "public": True,
+            "badges_count": self.config.badges // max(self.config.templates, 1),
+            "image_url": f"https://images.example.com/{index}.png",
+            "url": f"https://www.credly.com/org/fake/badge/template-{index}",
+            "vanity_slug": f"template-{index}",
+            "variants_allowed": False,
+            "variant_type": None,
+            "level": ["Foundational", "Intermediate", "Advanced"][index % 3],
+            "type_category": "Certification",
+            "skills": [
+                {"name": self.SKILLS[(index + k) % len(self.SKILLS)]} for k in range(3)
+            ],
+            "reporting_tags": [f"tag-{index % 10}"],
+            "state_updated_at": updated_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "created_at": self.config.start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "updated_at": updated_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "owner": {
+                "id": "org-00001",
+                "name": "Fake Credly Org",
+                "vanity_url": "https://www.credly.com/org/fake",
+            },
+            "badge_template_activities": [
+                {
+                    "id": f"activity-{index:05d}-{k}",
+                    "title": f"Activity {k}",
+                    "activity_type": "Course",
+                    "url": f"https://learn.example.com/{index}/{k}",
+                }
+                for k in range(index % 4)
+            ],
+        }
+
+    def touch_template(self, index: int):
+        """Bumps a template's updated_at, as an edit in Credly would."""
+        self.template_revisions[index] = self.template_revisions.get(index, 0) + 1
+
+
+class FakeCredlyHandler(BaseHTTPRequestHandler):
+    server: "FakeCredlyServer"
+
+    def do_GET(self):
+        config = self.server.config
+        parsed = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+
+        delay = config.latency_ms + random.uniform(0, config.latency_jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+        roll = self.server.random()
+        if roll < config.error_rate_429:
+            self.server.count("429")
+            return self._send(
+                429,
+                {"error": "rate limited"},
+                {"Retry-After": f"{config.retry_after:g}"},
+            )
+        if roll < config.error_rate_429 + config.error_rate_5xx:
+            self.server.count("5xx")
+            return self._send(503, {"error": "unavailable"})
+
+        if parsed.path.endswith("/high_volume_issued_badge_search"):
+            return self._badges(parsed.path, query)
+        if parsed.path.endswith("/badge_templates"):
+            return self._templates(parsed.path, query)
+        return self._send(404, {"error": "not found"})
+
+    def _page_size(self, query: dict) -> int:
+        config = self.server.config
+        return min(int(query.get("page_size", config.page_size)), config.max_page_size)
+
+    def _badges(self, path: str, query: dict):
+        data = self.server.data
+        page_size = self._page_size(query)
+
+        first = 0
+        last = self.server.config.badges
+        if query.get("start_date"):
+            moment = datetime.datetime.strptime(query["start_date"], DATE_FORMAT)
+            first = data.badge_index_at(moment)
+        if query.get("end_date"):
+            moment = datetime.datetime.strptime(query["end_date"], DATE_FORMAT)
+            last = data.badge_index_at(moment + datetime.timedelta(seconds=1))
+
+        cursor = max(int(query.get("cursor", first)), first)
+        stop = min(cursor + page_size, last)
+        items = [data.badge(i) for i in range(cursor, stop)]
+
+        next_page_url = None
+        if stop < last:
+            next_query = {**query, "cursor": stop, "badge_format": "default"}
+            next_page_url = f"{self.server.url}{path}?{urlencode(next_query)}"
+
+        self.server.count("badge_pages")
+        self._send(
+            200,
+            {
+                "data": items,
+                "metadata": {
+                    "total_count": max(last - first, 0),
+                    "next_page_url": next_page_url,
+                },
+            },
+        )
+
+    def _templates(self, path: str, query: dict):
+        data = self.server.data
+        total = self.server.config.templates
+        page_size = self._page_size(query)
+        page = max(int(query.get("page", 1)), 1)
+        total_pages = max(math.ceil(total / page_size), 1)
+
+        order = range(total)
+        if query.get("sort") in ("updated_at", "-updated_at"):
+            order = sorted(
+                order,
+                key=lambda i: data.template(i)["updated_at"],
+                reverse=query["sort"].startswith("-"),
+            )
+        indexes = list(order)[(page - 1) * page_size : page * page_size]
+
+        next_page_url = None
+        if page < total_pages:
+            next_page_url = (
+                f"{self.server.url}{path}?{urlencode({**query, 'page': page + 1})}"
+            )
+
+        payload = {
+            "data": [data.template(i) for i in indexes],
+            "metadata": {
+                "count": len(indexes),
+                "current_page": page,
+                "total_count": total,
+                "total_pages": total_pages,
+                "per": page_size,
+                "next_page_url": next_page_url,
+            },
+        }
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.count("not_modified")
+            return self._send(304, None, {"ETag": etag})
+
+        self.server.count("template_pages")
+        self._send(200, body, {"ETag": etag})
+
+    def _send(self, status: int, payload, headers: dict = None):
+        body = b""
+        if payload is not None:
+            body = (
+                payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+            )
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeCredlyServer(ThreadingHTTPServer):
+    """
+    Threaded fake Credly server.
+
+    Usage:
+        with FakeCredlyServer(FakeCredlyConfig(badges=100_000)) as server:
+            os.environ["CREDLY_BASE_URL"] = server.base_url
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config: FakeCredlyConfig = None, port: int = 0):
+        super().__init__(("127.0.0.1", port), FakeCredlyHandler)
+        self.config = config or FakeCredlyConfig()
+        self.data = FakeCredlyData(self.config)
+        self.counters = {}
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """Value for CREDLY_BASE_URL."""
+        return f"{self.url}/v1"
+
+    def random(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def count(self, name: str):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def start(self) -> "FakeCredlyServer":
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "FakeCredlyServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Credly API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--badges", type=int, default=FakeCredlyConfig.badges)
+    parser.add_argument("--templates", type=int, default=FakeCredlyConfig.templates)
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=FakeCredlyConfig.page_size,
+        help="Default page size when the request does not set one",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--error-rate-429", type=float, default=0.0, help="Share of 429 responses"
+    )
+    parser.add_argument(
+        "--error-rate-5xx", type=float, default=0.0, help="Share of 503 responses"
+    )
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = FakeCredlyConfig(
+        badges=args.badges,
+        templates=args.templates,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate_429=args.error_rate_429,
+        error_rate_5xx=args.error_rate_5xx,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    server = FakeCredlyServer(config, port=args.port)
+    print(f"Fake Credly API listening on {server.base_url}")
+    print(f"Badges: {config.badges:,} | Templates: {config.templates:,}")
+    print("Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Requests served: {server.counters}")
+
+
+if __name__ == "__main__":
+    main()
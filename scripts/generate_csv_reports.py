@@ -1,4 +1,5 @@
 import os
+import sys
 
 import boto3
 from dotenv import load_dotenv
@@ -9,13 +10,20 @@ ENDPOINT_URL = os.getenv("LOCALSTACK_ENDPOINT", "http://localhost:4566")
 BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "my-datalake-bucket")
 REPORTS_DIR = os.path.join(os.path.dirname(__file__), "..", "reports")
 
-s3 = boto3.client(
-    "s3",
-    endpoint_url=ENDPOINT_URL,
-    aws_access_key_id="test",
-    aws_secret_access_key="test",
-    region_name="us-east-1",
-)
+if os.getenv("OUTPUT_SINK", "s3").lower() == "local":
+    # Reports from a local backfill (OUTPUT_SINK=local), no LocalStack needed
+    sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app"))
+    from src.clients.object_stores import LocalObjectStore
+
+    s3 = LocalObjectStore(os.getenv("OUTPUT_LOCAL_DIR", "output"))
+else:
+    s3 = boto3.client(
+        "s3",
+        endpoint_url=ENDPOINT_URL,
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        region_name="us-east-1",
+    )
 
 
 def ensure_reports_dir():
@@ -34,12 +42,54 @@ def get_all_objects(prefix):
     return objects
 
 
+def get_partitions(table_name):
+    """Lists the table's partition prefixes without listing their files."""
+    paginator = s3.get_paginator("list_objects_v2")
+    pages = paginator.paginate(
+        Bucket=BUCKET_NAME, Prefix=f"raw/{table_name}/", Delimiter="/"
+    )
+
+    partitions = []
+    for page in pages:
+        partitions.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+    return partitions
+
+
+def get_partition_files(partition):
+    """
+    Files of the partition's committed run, taken from its _manifest.json.
+    Partitions without a manifest (written before runs existed) are listed.
+    """
+    import json
+
+    from botocore.exceptions import ClientError
+
+    try:
+        response = s3.get_object(Bucket=BUCKET_NAME, Key=f"{partition}_manifest.json")
+    except ClientError:
+        return [
+            obj["Key"]
+            for obj in get_all_objects(partition)
+            if obj["Key"].endswith(".parquet")
+        ]
+
+    manifest = json.loads(response["Body"].read())
+    print(
+        f"  {manifest['partition']}: run {manifest['run_id']}, "
+        f"{len(manifest['files'])} files, {manifest.get('record_count')} records"
+    )
+    return [f["key"] for f in manifest["files"]]
+
+
 def process_table(table_name):
     print(f"Processing table: {table_name}")
-    prefix = f"raw/{table_name}/"
-    objects = get_all_objects(prefix)
+    keys = [
+        key
+        for partition in get_partitions(table_name)
+        for key in get_partition_files(partition)
+    ]
 
-    if not objects:
+    if not keys:
         print(f"No data found for {table_name}")
         return
 
@@ -49,11 +99,7 @@ def process_table(table_name):
 
     all_dfs = []
 
-    for obj in objects:
-        key = obj["Key"]
-        if not key.endswith(".parquet"):
-            continue
-
+    for key in keys:
         response = s3.get_object(Bucket=BUCKET_NAME, Key=key)
         content = response["Body"].read()
         try:
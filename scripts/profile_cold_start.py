@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Import-time profile of the Lambda handler module.
+
+Imports lambda_function in fresh interpreters (as a cold start does) and
+reports the median import time, the slowest modules according to
+'python -X importtime', and which heavy dependencies got loaded. Clients
+and the Parquet stack are built lazily, so none of them should appear.
+
+Usage:
+    uv run python scripts/profile_cold_start.py --runs 10 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+HEAVY_MODULES = ("boto3", "botocore", "requests", "urllib3", "pandas", "pyarrow")
+
+LOADED_CHECK = (
+    "import sys, lambda_function; "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def time_import() -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import lambda_function"], cwd=APP_DIR, check=True
+    )
+    return time.perf_counter() - started
+
+
+def baseline_interpreter() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - started
+
+
+def import_profile() -> list:
+    """Returns (cumulative_us, self_us, module) sorted by cumulative time."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import lambda_function"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    return sorted(rows, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile handler import time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    interpreter = statistics.median(baseline_interpreter() for _ in range(args.runs))
+    imports = [time_import() for _ in range(args.runs)]
+    median = statistics.median(imports)
+
+    print(f"Interpreter start-up (median of {args.runs}): {interpreter * 1000:.0f} ms")
+    print(f"Start-up + import lambda_function:  {median * 1000:.0f} ms")
+    print(f"Handler import cost:                {(median - interpreter) * 1000:.0f} ms")
+
+    print("\nSlowest imports (cumulative):")
+    for cumulative_us, self_us, module in import_profile()[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {self_us / 1000:8.1f} ms  {module}")
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", LOADED_CHECK],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    print(f"\nHeavy modules loaded at import: {loaded or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Rebuilds Parquet tables from the raw page archive (archive/{table}/...)
+with the current mappers and PARQUET_SCHEMA_VERSION, without calling the
+Credly API. Each partition's pages are mapped by --workers processes into
+one run, which is committed through the partition manifest once every
+worker is done.
+
+Usage (bucket from S3_BUCKET_NAME; OUTPUT_SINK=local reads and writes the
+local tree under OUTPUT_LOCAL_DIR instead):
+    uv run python scripts/replay_archive.py --date 2024-05-01
+    uv run python scripts/replay_archive.py --source badges_templates --all
+    uv run python scripts/replay_archive.py --from 2024-05-01 --to 2024-05-31 --workers 8
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, "app"))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+os.environ.setdefault("S3_BUCKET_NAME", "my-datalake-bucket")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def partition_dates(args, s3_writer) -> list:
+    if args.all:
+        return s3_writer.archived_partitions(args.source)
+    if args.date:
+        return [datetime.date.fromisoformat(d) for d in args.date]
+
+    start = datetime.date.fromisoformat(args.start)
+    end = datetime.date.fromisoformat(args.end) if args.end else start
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def replay_slice(source, partition_date, pages, run_ids, writer_id) -> int:
+    """Worker process: maps a slice of a partition's pages."""
+    from src.services.replay_service import replay_service
+
+    return replay_service.replay_pages(
+        source, partition_date, pages, run_ids, writer_id=writer_id
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the raw page archive.")
+    parser.add_argument(
+        "--source",
+        default="badges_emitidas",
+        choices=["badges_emitidas", "badges_templates"],
+        help="badges_templates rebuilds templates and their activities",
+    )
+    parser.add_argument("--date", action="append", help="YYYY-MM-DD (repeatable)")
+    parser.add_argument("--from", dest="start", help="First YYYY-MM-DD of a range")
+    parser.add_argument("--to", dest="end", help="Last YYYY-MM-DD of a range")
+    parser.add_argument("--all", action="store_true", help="Every archived partition")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if not args.date and not args.start and not args.all:
+        parser.error("Pass --date, --from/--to or --all")
+
+    # Import after the environment is loaded so settings pick it up
+    from src.services.replay_service import replay_service
+    from src.utils.s3_writer import s3_writer
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for partition_date in partition_dates(args, s3_writer):
+            started = time.perf_counter()
+            run_ids, pages = replay_service.plan(args.source, partition_date)
+            if not pages:
+                print(f"{args.source} {partition_date}: nothing archived")
+                continue
+
+            workers = max(1, min(args.workers, len(pages)))
+            futures = [
+                pool.submit(
+                    replay_slice,
+                    args.source,
+                    partition_date,
+                    pages[i::workers],
+                    run_ids,
+                    f"replay-{i}",
+                )
+                for i in range(workers)
+            ]
+            records = sum(future.result() for future in futures)
+            replay_service.commit(args.source, partition_date, run_ids)
+            print(
+                f"{args.source} {partition_date}: {records} records from "
+                f"{len(pages)} pages in {time.perf_counter() - started:.1f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
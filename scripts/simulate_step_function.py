@@ -7,6 +7,7 @@ This script mimics the Step Functions pagination loop locally.
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from dotenv import load_dotenv
@@ -127,6 +128,52 @@ def simulate_step_function(load_type: str, mode: str, max_pages: int = 2):
             break
 
 
+def simulate_sharded_load(mode: str, shards: int, max_pages: int = 2):
+    """
+    Simulates a sharded badges load: one planning invocation, then every shard
+    paginated on its own cursor, all shards running at the same time
+    (mimics a Map state over the planned shards).
+    """
+    print(f"\n{'=' * 80}")
+    print(f"Step Functions Simulation: badges / {mode} / {shards} shards")
+    print(f"Max Pages per shard (local limit): {max_pages}")
+    print(f"{'=' * 80}\n")
+
+    plan = lambda_handler({"load_type": "badges", "mode": mode, "shards": shards}, None)
+    planned = plan["body"]["shards"]
+    for shard in planned:
+        print(
+            f"Shard {shard['shard_id']}: {shard['start_date']} -> {shard['end_date']}"
+        )
+
+    def run_shard(shard):
+        page, records = None, 0
+        for _ in range(max_pages):
+            event = {"load_type": "badges", "mode": mode, "shard": shard}
+            if page:
+                event["page"] = page
+            body = lambda_handler(event, None)["body"]
+            records += body.get("records_processed", 0)
+            page = body.get("next_page")
+            if not page:
+                break
+        return shard["shard_id"], records, page is None
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=len(planned)) as executor:
+        results = list(executor.map(run_shard, planned))
+
+    total_records = 0
+    for shard_id, records, complete in results:
+        total_records += records
+        status = "complete" if complete else "stopped at local limit"
+        print(f"✓ Shard {shard_id}: {records} records ({status})")
+
+    print(f"\n{'=' * 80}")
+    print(f"Total records: {total_records} in {time.time() - start_time:.2f}s")
+    print(f"{'=' * 80}\n")
+
+
 import argparse
 
 
@@ -150,6 +197,12 @@ def main():
         default=2,
         help="Maximum number of pages to process (default: 2)",
     )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Split a historical badges load into N date windows (default: off)",
+    )
 
     args = parser.parse_args()
 
@@ -158,7 +211,11 @@ def main():
 
     setup_local_secret()
 
-    if args.load_type in ["badges", "all"]:
+    if args.shards and args.load_type in ["badges", "all"]:
+        simulate_sharded_load(
+            mode=args.mode, shards=args.shards, max_pages=args.max_pages
+        )
+    elif args.load_type in ["badges", "all"]:
         simulate_step_function(
             load_type="badges",
             mode=args.mode,